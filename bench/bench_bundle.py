@@ -0,0 +1,102 @@
+"""
+Quiz bundle benchmark: `--quizzes` × `--questions` (default 10 000 × 100 = 1M savol).
+
+1. sintetik bundle yoziladi (BundleWriter) — fayl hajmi, savol/s;
+2. bo‘sh DB ga import (bot.bundle.import_bundle) — `--batch` ta savollik tranzaksiyalar,
+   dedup imzolari bilan (`--no-minhash` — ularsiz);
+3. DB dan qayta eksport (export_bundle) va ikkala fayl mazmuni solishtiriladi (round-trip).
+
+Har bosqich uchun vaqt, savol/s va RSS o‘sishi chiqariladi: oqimli bo‘lgani uchun RSS
+bundle hajmiga qarab o‘smaydi.
+
+    python -m bench.bench_bundle --quizzes 10000 --questions 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import bot.db as db
+from bench.harness import rss_bytes
+from bot import bundle
+
+# real savollar kabi siqilishi uchun: kichik lug‘at emas, 20k ta tasodifiy "so‘z"
+_vocab = random.Random(0)
+WORDS = ["".join(_vocab.choices("abcdefghijklmnopqrstuvwxyz", k=_vocab.randint(3, 9))) for _ in range(20_000)]
+
+
+def _synthetic(path: str, quizzes: int, questions: int, seed: int) -> None:
+    rnd = random.Random(seed)
+    with bundle.BundleWriter(path) as w:
+        for n in range(quizzes):
+            w.write({
+                "code": f"b{n:07d}",
+                "owner": 1000 + n % 500,
+                "title": f"Quiz {n}: {' '.join(rnd.choices(WORDS, k=3))}",
+                "description": None,
+                "status": "published",
+                "created_at": "2026-01-01 00:00:00",
+                "questions": [
+                    [
+                        f"Q{n}.{i} {' '.join(rnd.choices(WORDS, k=8))}?",
+                        *(str(rnd.randrange(1000)) for _ in range(4)),  # variantlar ko‘p takrorlanadi
+                        "ABCD"[rnd.randrange(4)],
+                        None if i % 4 else f"because {' '.join(rnd.choices(WORDS, k=5))}",
+                    ]
+                    for i in range(questions)
+                ],
+            })
+
+
+def _report(label: str, questions: int, elapsed: float, rss0: int, extra: str = "") -> None:
+    print(f"{label:<22s} {elapsed:>8.1f} s {questions / elapsed:>12,.0f} q/s "
+          f"{(rss_bytes() - rss0) / 2**20:>+8.1f} MB RSS  {extra}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    tmp = tempfile.mkdtemp(prefix="quiz_bundle_")
+    src, out = os.path.join(tmp, "src.jsonl.gz"), os.path.join(tmp, "out.jsonl.gz")
+    db.DB_PATH = os.path.join(tmp, "quizbot.sqlite3")
+    await db.init_db()
+    total = args.quizzes * args.questions
+    print(f"{args.quizzes:,} quizzes × {args.questions} questions = {total:,} questions · batch {args.batch}")
+
+    rss0 = rss_bytes()
+    t0 = time.perf_counter()
+    _synthetic(src, args.quizzes, args.questions, args.seed)
+    size = os.path.getsize(src)
+    _report("write (synthetic)", total, time.perf_counter() - t0, rss0,
+            f"{size / 2**20:.1f} MB, {size / total:.0f} B/question")
+
+    t0 = time.perf_counter()
+    print(bundle._inspect(src).split(": ", 1)[1])
+    _report("read + validate", total, time.perf_counter() - t0, rss0)
+
+    report = await bundle.import_bundle(src, batch=args.batch, minhash=not args.no_minhash)
+    assert report["questions"] == total
+    _report("import" + ("" if args.no_minhash else " (+minhash)"), total, report["seconds"], rss0,
+            f"db {os.path.getsize(db.DB_PATH) / 2**20:.0f} MB")
+
+    t0 = time.perf_counter()
+    await bundle.export_bundle(out)
+    _report("export", total, time.perf_counter() - t0, rss0)
+
+    for a, b in zip(bundle.read_bundle(src), bundle.read_bundle(out)):
+        assert a == b, f"round-trip differs in quiz {a['code']}"
+    print("round-trip identical: yes")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quizzes", type=int, default=10_000)
+    ap.add_argument("--questions", type=int, default=100, help="questions per quiz")
+    ap.add_argument("--batch", type=int, default=5000, help="questions per import transaction")
+    ap.add_argument("--no-minhash", action="store_true")
+    ap.add_argument("--seed", type=int, default=11)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Import dedup benchmark: MinHash imzolari + LSH, 50k savollik bank.
+
+Sintetik bank: N ta unikal savol + ularning ~30% i nusxalar. Yarmi aynan takror (katta harf,
+variantlar tartibi almashgan, qo‘shimcha bo‘sh joy/tinish belgilari) — tashlanadi, yarmi
+deyarli bir xil (ustiga 1-2 harf xatosi) — owner'ga so‘rov uchun ushlab turiladi.
+
+Ishga tushirish:
+    python -m bench.bench_dedup
+    python -m bench.bench_dedup --size 50000 --dup-ratio 0.3
+"""
+import argparse
+import random
+import string
+import time
+import resource
+
+from bot import dedup
+
+WORDS = [
+    "capital", "river", "largest", "country", "which", "what", "year", "planet", "element",
+    "number", "author", "wrote", "century", "ocean", "mountain", "city", "language", "speed",
+    "light", "energy", "formula", "chemical", "animal", "species", "continent", "border",
+    "president", "invented", "discovered", "population", "currency", "temperature", "atom",
+]
+
+
+def _sentence(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(n)) + f" {rnd.randrange(10**6)}?"
+
+
+def _make_question(rnd: random.Random) -> dict:
+    return {
+        "q_text": _sentence(rnd, rnd.randint(6, 14)),
+        "opt_a": _sentence(rnd, 2),
+        "opt_b": _sentence(rnd, 2),
+        "opt_c": _sentence(rnd, 2),
+        "opt_d": _sentence(rnd, 2),
+        "correct": "A",
+        "explanation": None,
+    }
+
+
+def _mutate(rnd: random.Random, q: dict, typos: bool) -> dict:
+    text = list(q["q_text"])
+    # 1-2 ta harf xatosi
+    for _ in range(rnd.randint(1, 2) if typos else 0):
+        i = rnd.randrange(len(text))
+        text[i] = rnd.choice(string.ascii_lowercase)
+    opts = [q["opt_a"], q["opt_b"], q["opt_c"], q["opt_d"]]
+    answer = q["opt_" + q["correct"].lower()]
+    rnd.shuffle(opts)
+    return {
+        "q_text": "  " + "".join(text).upper() + " ",
+        "opt_a": opts[0] + ".",
+        "opt_b": opts[1],
+        "opt_c": opts[2],
+        "opt_d": opts[3],
+        "correct": "ABCD"[opts.index(answer)],
+        "explanation": None,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=50_000, help="import hajmi (savollar)")
+    ap.add_argument("--dup-ratio", type=float, default=0.3)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    n_dups = int(args.size * args.dup_ratio)
+    originals = [_make_question(rnd) for _ in range(args.size - n_dups)]
+    dups = [_mutate(rnd, rnd.choice(originals), typos=i % 2 == 1) for i in range(n_dups)]
+
+    # Bank: yarmi "oldin import qilingan" (DB indeks), yarmi yangi fayl
+    half = len(originals) // 2
+    existing = originals[:half]
+    incoming = originals[half:] + dups
+    rnd.shuffle(incoming)
+    expected_exact = (n_dups + 1) // 2
+
+    t0 = time.perf_counter()
+    index = dedup.LSHIndex()
+    for i, q in enumerate(existing, start=1):
+        sig, exact = dedup.fingerprint(q)
+        index.add(i, dedup.from_blob(sig), exact)
+    t1 = time.perf_counter()
+    fresh, duplicates, near = dedup.split_duplicates(incoming, index)
+    t2 = time.perf_counter()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB (Linux)
+
+    total = len(existing) + len(incoming)
+    print(f"questions total:      {total}")
+    print(f"index build:          {len(existing)} sigs in {t1 - t0:.2f}s")
+    print(f"import dedup:         {len(incoming)} questions in {t2 - t1:.2f}s "
+          f"({len(incoming) / (t2 - t1):,.0f} q/s)")
+    print(f"exact duplicates:     {len(duplicates)} (injected: {expected_exact})")
+    print(f"near (held back):     {len(near)} (injected: {n_dups - expected_exact})")
+    print(f"fresh questions:      {len(fresh)} (expected: {len(incoming) - n_dups})")
+    print(f"peak RSS:             {peak_rss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
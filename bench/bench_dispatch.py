@@ -0,0 +1,90 @@
+"""
+Dispatch overhead benchmark: aiogram filter walk vs bot.dispatch_index.
+
+Bitta Dispatcher (barcha routerlar, admin ham) avval oddiy holatda, keyin
+dispatch_index.install() dan so‘ng o‘lchanadi. Update'lar arzon handlerlarga yoki
+hech qaysi handlerga tushmaydigan qilib tanlangan (DB siz) — farq filtrlarni
+aylanib chiqish narxini ko‘rsatadi.
+
+    python -m bench.bench_dispatch --n 5000 --repeat 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from bench.harness import FAKE_TOKEN, FakeSession, make_callback_update, make_command_update
+from bot import dispatch_index
+from bot.handlers import setup_routers
+
+CHAT_ID = 777
+USER_ID = 555
+
+
+def _workload(bot: Bot) -> List[Tuple[str, Callable[[], Update]]]:
+    msg = lambda text: lambda: make_command_update(CHAT_ID, USER_ID, text, chat_type="private", bot=bot)  # noqa: E731
+    cb = lambda data: lambda: make_callback_update(CHAT_ID, USER_ID, data, bot=bot)  # noqa: E731
+    return [
+        ("/stop_quiz (hit, 5th router)", msg("/stop_quiz")),
+        ("/unknown (miss, full walk)", msg("/unknown_cmd")),
+        ("plain text (miss)", msg("hello there")),
+        ("cb close_message (hit)", cb("close_message")),
+        ("cb set_close_settings (hit)", cb("set_close_settings")),
+        ("cb unknown:1 (miss)", cb("unknown:1")),
+    ]
+
+
+async def _measure(dp: Dispatcher, bot: Bot, make: Callable[[], Update], n: int, repeat: int) -> float:
+    """Return: bitta update uchun eng yaxshi (min) µs."""
+    best = []
+    for _ in range(repeat):
+        updates = [make() for _ in range(n)]
+        t0 = time.perf_counter()
+        for upd in updates:
+            await dp.feed_update(bot, upd)
+        best.append((time.perf_counter() - t0) / n * 1e6)
+    return min(best)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    bot = Bot(token=FAKE_TOKEN, session=FakeSession())
+    dp = Dispatcher()
+    setup_routers(dp, admin=True)
+    workload = _workload(bot)
+
+    for problem in dispatch_index.audit(dp):
+        print(f"audit: {problem}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, make in workload:
+        await _measure(dp, bot, make, 200, 1)  # isitish (bot.me, kesh)
+        results[name] = {"walk": await _measure(dp, bot, make, args.n, args.repeat)}
+
+    indexed = dispatch_index.install(dp)
+    for name, make in workload:
+        await _measure(dp, bot, make, 200, 1)
+        results[name]["index"] = await _measure(dp, bot, make, args.n, args.repeat)
+
+    print(f"\nindexed observers: {indexed}")
+    print(f"{'update':32s} {'walk µs':>9s} {'index µs':>9s} {'saved':>7s}")
+    for name, r in results.items():
+        print(f"{name:32s} {r['walk']:9.1f} {r['index']:9.1f} {1 - r['index'] / r['walk']:7.0%}")
+    walk = statistics.mean(r["walk"] for r in results.values())
+    idx = statistics.mean(r["index"] for r in results.values())
+    print(f"{'mean':32s} {walk:9.1f} {idx:9.1f} {1 - idx / walk:7.0%}")
+    await bot.session.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+/export benchmark: natijalar bazasiga `--games` ta o‘yin × `--players` × `--questions` javob
+yoziladi, keyin har bir eksport turi uchun:
+
+- "stream": bot.export — kursor chunk'lari vaqtinchalik faylga;
+- "fetchall": hamma qatorlarni fetchall qilib, butun faylni xotirada qurish (oddiy usul).
+
+Python heap'ining eng katta qiymati (tracemalloc) va vaqt chiqariladi: stream usulida xotira
+qatorlar soniga bog‘liq emas.
+
+    python -m bench.bench_export --games 50 --players 100 --questions 30
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import bot.db as db
+from bot import export
+
+
+async def _prepare(games: int, players: int, questions: int, seed: int) -> int:
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="quiz_export_"), "quizbot.sqlite3")
+    await db.init_db()
+    quiz_id = await db.create_quiz_draft(1, "Export bench")
+    rnd = random.Random(seed)
+    for g in range(games):
+        board, answers = [], []
+        for uid in range(players):
+            correct = 0
+            for step in range(1, questions + 1):
+                ok = rnd.random() < 0.6
+                correct += ok
+                answers.append((uid, step, step, "ABCD"[rnd.randrange(4)], int(ok)))
+            board.append((uid, f"@user{uid}", correct, questions, rnd.uniform(30, 600)))
+        attempt = {
+            "quiz_id": quiz_id, "chat_id": -1000 - g, "tournament": None, "started_at": 1_700_000_000 + g,
+            "finished_at": 1_700_000_900 + g, "questions": questions, "stopped": 0,
+        }
+        await db.save_attempt(attempt, board, answers)
+    return quiz_id
+
+
+async def _fetchall(quiz_id: int, kind: str) -> int:
+    columns, sql = db.EXPORT_KINDS[kind]
+    async with db._connect() as conn:
+        rows = await (await conn.execute(sql, (quiz_id,))).fetchall()
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(columns)
+    w.writerows(rows)
+    data = buf.getvalue().encode("utf-8")
+    return len(data)
+
+
+async def _measure(coro):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    quiz_id = await _prepare(args.games, args.players, args.questions, args.seed)
+    print(f"{args.games} games × {args.players} players × {args.questions} questions")
+    print(f"{'kind':>8s} {'method':>9s} {'rows':>10s} {'size KB':>9s} {'time ms':>9s} {'peak KB':>9s}")
+    for kind in export.KINDS:
+        rows = await db.count_export_rows(quiz_id, kind)
+        out, elapsed, peak = await _measure(export.export_results(quiz_id, kind, "csv"))
+        os.remove(out.path)
+        assert out.rows == rows
+        print(f"{kind:>8s} {'stream':>9s} {rows:>10,d} {out.bytes / 1024:>9.0f} {elapsed * 1000:>9.0f} {peak / 1024:>9.0f}")
+
+        size, elapsed, peak = await _measure(_fetchall(quiz_id, kind))
+        print(f"{kind:>8s} {'fetchall':>9s} {rows:>10,d} {size / 1024:>9.0f} {elapsed * 1000:>9.0f} {peak / 1024:>9.0f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--games", type=int, default=50)
+    ap.add_argument("--players", type=int, default=100)
+    ap.add_argument("--questions", type=int, default=30)
+    ap.add_argument("--seed", type=int, default=5)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
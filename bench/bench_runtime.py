@@ -0,0 +1,157 @@
+"""
+Default (asyncio + json) va fast runtime (uvloop + orjson) rejimlarida update'larni qayta ishlash
+throughput'ini solishtiradi.
+
+Har bir rejim alohida subprocess'da ishlaydi (loop policy va codec process-global):
+- update'lar getUpdates javobi kabi JSON matndan session.json_loads orqali o‘qiladi;
+- FakeSession(wire=True): so‘rovlar json_dumps bilan serializatsiya qilinadi,
+  javoblar JSON matndan check_response orqali o‘qiladi;
+- yuklama: guruh quizlariga poll_answer'lar + private /start (DB + klaviaturali xabar).
+
+    python -m bench.bench_runtime --groups 50 --updates 20000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+OWNER_ID = 1
+
+
+def _raw_updates(polls: List[Any], n: int, start_every: int) -> List[bytes]:
+    """getUpdates dagi kabi tayyor JSON (bytes) — o‘qish ham o‘lchovga kiradi."""
+    ids = itertools.count(1)
+    out = []
+    for i in range(n):
+        uid = 100_000 + i
+        user = {"id": uid, "is_bot": False, "first_name": f"User{uid}", "username": f"user{uid}"}
+        if start_every and i % start_every == 0:
+            upd = {"update_id": next(ids), "message": {
+                "message_id": i + 1, "date": int(time.time()),
+                "chat": {"id": uid, "type": "private"}, "from": user, "text": "/start",
+            }}
+        else:
+            p = polls[i % len(polls)]
+            upd = {"update_id": next(ids), "poll_answer": {
+                "poll_id": p.poll_id, "user": user, "option_ids": [i % 4], "option_persistent_ids": [str(i % 4)],
+            }}
+        out.append(json.dumps(upd).encode())
+    return out
+
+
+async def _run_mode(args: argparse.Namespace) -> Dict[str, Any]:
+    from aiogram import Bot, Dispatcher
+    from aiogram.types import Update
+
+    import bot.db as db
+    from bot import jsoncodec
+    from bot.handlers import poll_quiz, setup_routers
+    from bench.harness import FAKE_TOKEN, FakeSession, make_command_update
+
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="quiz_rt_"), "quizbot.sqlite3")
+    await db.init_db()
+    quiz_id = await db.create_quiz_draft(OWNER_ID, "Runtime bench")
+    for i in range(3):
+        await db.add_question(quiz_id, f"Question {i + 1}?", "one", "two", "three", "four", "B", "because")
+    await db.publish_quiz(quiz_id, OWNER_ID)
+    await db.set_user_time_limit(OWNER_ID, 300)  # taymerlar benchmark davomida ishlamaydi
+    code = (await db.get_quiz_brief(quiz_id, OWNER_ID))[2]
+
+    session = FakeSession(wire=True, json_loads=jsoncodec.loads, json_dumps=jsoncodec.dumps)
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    dp = Dispatcher()
+    setup_routers(dp)
+
+    for g in range(args.groups):
+        await dp.feed_update(bot, make_command_update(-3_000_000_000 - g, OWNER_ID, f"/quiz {code}", bot=bot))
+
+    raw = _raw_updates(session.polls, args.updates, args.start_every)
+    loads = bot.session.json_loads
+
+    t0 = time.perf_counter()
+    for chunk_start in range(0, len(raw), args.concurrency):
+        chunk = raw[chunk_start:chunk_start + args.concurrency]
+        await asyncio.gather(*(
+            dp.feed_update(bot, Update.model_validate(loads(r), context={"bot": bot})) for r in chunk
+        ))
+    elapsed = time.perf_counter() - t0
+
+    for t in list(poll_quiz.PENDING_TIMERS):
+        t.cancel()
+    await bot.session.close()
+
+    loop = type(asyncio.get_running_loop())
+    return {
+        "loop": f"{loop.__module__}.{loop.__name__}",
+        "codec": jsoncodec.BACKEND,
+        "updates": len(raw),
+        "seconds": elapsed,
+        "calls": dict(session.calls),
+    }
+
+
+def _child(args: argparse.Namespace) -> None:
+    from bot import fastruntime
+
+    profile = fastruntime.apply(args.mode == "fast")
+    result = asyncio.run(_run_mode(args))
+    result["profile"] = profile
+    print(json.dumps(result))
+
+
+def _spawn(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    cmd = [
+        sys.executable, "-m", "bench.bench_runtime", "--mode", mode,
+        "--groups", str(args.groups), "--updates", str(args.updates),
+        "--start-every", str(args.start_every), "--concurrency", str(args.concurrency),
+    ]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _codec_micro(n: int) -> None:
+    from bot import jsoncodec
+
+    settings = {"time_limit": 30, "shuffle": True, "language": "uz", "negative": False}
+    hist = list(range(16))
+    for fast in (False, True):
+        backend = jsoncodec.configure(fast)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            jsoncodec.loads(jsoncodec.dumps(settings))
+            jsoncodec.loads(jsoncodec.dumps(hist))
+        dt = time.perf_counter() - t0
+        print(f"codec {backend:7s} settings+hist round trip: {dt / n * 1e6:.2f} µs")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=("default", "fast"), default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--groups", type=int, default=50)
+    ap.add_argument("--updates", type=int, default=20000)
+    ap.add_argument("--start-every", type=int, default=20, help="every Nth update is a private /start")
+    ap.add_argument("--concurrency", type=int, default=20)
+    args = ap.parse_args()
+
+    if args.mode:
+        _child(args)
+        return
+
+    _codec_micro(50_000)
+    results = {mode: _spawn(mode, args) for mode in ("default", "fast")}
+    for mode, r in results.items():
+        print(f"{mode:8s} {r['profile']:18s} {r['updates'] / r['seconds']:>9,.0f} updates/s "
+              f"({r['seconds']:.2f}s, loop {r['loop']})")
+    base = results["default"]["updates"] / results["default"]["seconds"]
+    fast = results["fast"]["updates"] / results["fast"]["seconds"]
+    print(f"speedup: {fast / base:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
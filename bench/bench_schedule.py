@@ -0,0 +1,104 @@
+"""
+/schedule fan-out benchmark: `--groups` ta guruhda bir vaqtga (09:00) qo‘yilgan quizlar.
+
+Har bir Bot API chaqiruvi `--rtt` ms "tarmoq" kutadi (request middleware). Har bir
+concurrency uchun: hamma quizlar boshlanishiga ketgan vaqt, bir vaqtda ochiq Bot API
+so‘rovlarining eng ko‘pi (stampede) va jadvalning keyingi holati (daily -> ertaga).
+
+    python -m bench.bench_schedule --groups 500 --rtt 50 --concurrency 1 8 32 0
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from zoneinfo import ZoneInfo
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+import bot.db as db
+from bench.harness import FAKE_TOKEN, FakeSession
+from bot import quiz_scheduler
+from bot.handlers import poll_quiz
+
+OWNER_ID = 1
+
+
+class SlowApi(BaseRequestMiddleware):
+    def __init__(self, rtt: float) -> None:
+        self.rtt = rtt
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, make_request, bot, method):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.rtt)
+            return await make_request(bot, method)
+        finally:
+            self.in_flight -= 1
+
+
+async def _prepare(groups: int) -> str:
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="quiz_sched_"), "quizbot.sqlite3")
+    await db.init_db()
+    quiz_id = await db.create_quiz_draft(OWNER_ID, "Quiz of the day")
+    for i in range(5):
+        await db.add_question(quiz_id, f"Question {i + 1}?", "a", "b", "c", "d", "A", None)
+    await db.publish_quiz(quiz_id, OWNER_ID)
+    return (await db.get_quiz_brief(quiz_id, OWNER_ID))[2]
+
+
+async def _round(code: str, groups: int, concurrency: int, rtt: float) -> None:
+    due = int(time.time())
+    for g in range(groups):
+        await db.add_quiz_job(-5_000_000 - g, "supergroup", OWNER_ID, code, due, "daily")
+
+    api = SlowApi(rtt)
+    session = FakeSession()
+    session.middleware(api)
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    slots = asyncio.Semaphore(concurrency or groups)
+
+    t0 = time.perf_counter()
+    n = await quiz_scheduler.run_due(bot, ZoneInfo("UTC"), slots)
+    elapsed = time.perf_counter() - t0
+
+    started = len(poll_quiz.SESSIONS)
+    next_run = await db.next_quiz_job_run()
+    label = str(concurrency) if concurrency else "unbounded"
+    print(f"{label:>10s} {n:>6d} {started:>8d} {elapsed * 1000:>10.0f} {api.peak:>10d}   "
+          f"next run +{(next_run - due) / 3600:.0f} h")
+
+    # tozalash: sessiyalar, taymerlar va vazifalar
+    for t in list(poll_quiz.PENDING_TIMERS):
+        t.cancel()
+    for s in poll_quiz.SESSIONS.values():
+        s.source.close()
+    poll_quiz.SESSIONS.clear()
+    poll_quiz.POLL_INDEX.clear()
+    for g in range(groups):
+        await db.delete_chat_quiz_jobs(-5_000_000 - g)
+    await bot.session.close()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    code = await _prepare(args.groups)
+    print(f"{args.groups} groups due at the same second · Bot API RTT {args.rtt:.0f} ms")
+    print(f"{'slots':>10s} {'jobs':>6s} {'started':>8s} {'drain ms':>10s} {'peak API':>10s}")
+    for c in args.concurrency:
+        await _round(code, args.groups, c, args.rtt / 1000)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", type=int, default=500)
+    ap.add_argument("--rtt", type=float, default=50.0, help="simulated Bot API round trip, ms")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 0], help="0 = unbounded")
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Katta quiz xotira benchmark'i: 2000 savollik bank 200 guruhda.
+
+"eager": har bir sessiya uchun get_questions_for_quiz (avvalgi Session.questions) —
+butun quiz xotirada. "windowed": haqiqiy /quiz orqali boshlangan sessiyalar
+(QuestionSource: faqat prefetch oynasi). Ikkalasi tracemalloc bilan o‘lchanadi.
+
+    python -m bench.bench_session_memory --groups 200 --questions 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+
+from aiogram import Bot, Dispatcher
+
+import bot.db as db
+from bench.harness import FAKE_TOKEN, FakeSession, make_command_update
+from bot.handlers import poll_quiz, setup_routers
+
+OWNER_ID = 1
+
+
+async def _prepare(n_questions: int) -> tuple:
+    await db.init_db()
+    quiz_id = await db.create_quiz_draft(OWNER_ID, "Big bank")
+    explanation = "Because " + "the explanation is rather long and detailed. " * 4
+    items = [
+        ({
+            "q_text": f"Question number {i + 1}: which of the following statements is correct?",
+            "opt_a": "first option", "opt_b": "second option", "opt_c": "third option", "opt_d": "fourth option",
+            "correct": "B", "explanation": explanation,
+        }, b"\0" * 256, None)
+        for i in range(n_questions)
+    ]
+    await db.add_questions_bulk(quiz_id, OWNER_ID, items)
+    await db.publish_quiz(quiz_id, OWNER_ID)
+    await db.set_user_time_limit(OWNER_ID, 300)
+    return quiz_id, (await db.get_quiz_brief(quiz_id, OWNER_ID))[2]
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:,.1f} KB"
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="quiz_mem_"), "quizbot.sqlite3")
+    quiz_id, code = await _prepare(args.questions)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    eager = [await db.get_questions_for_quiz(quiz_id) for _ in range(args.groups)]
+    eager_bytes = tracemalloc.get_traced_memory()[0] - base
+    rows = sum(len(x) for x in eager)
+    del eager
+
+    bot = Bot(token=FAKE_TOKEN, session=FakeSession())
+    dp = Dispatcher()
+    setup_routers(dp)
+    await dp.feed_update(bot, make_command_update(-1, OWNER_ID, f"/quiz {code}", bot=bot))  # isitish
+    await asyncio.sleep(0.05)
+
+    base = tracemalloc.get_traced_memory()[0]
+    for g in range(args.groups):
+        await dp.feed_update(bot, make_command_update(-10_000 - g, OWNER_ID, f"/quiz {code}", bot=bot))
+    await asyncio.sleep(0.2)  # prefetch'lar tugasin
+    windowed_bytes = tracemalloc.get_traced_memory()[0] - base
+    buffered = sum(s.source.buffered for s in poll_quiz.SESSIONS.values())
+    tracemalloc.stop()
+
+    print(f"quiz: {args.questions} questions · groups: {args.groups}")
+    print(f"eager    {rows:>9,} rows resident   {_kb(eager_bytes):>12}  ({_kb(eager_bytes / args.groups)} / session)")
+    print(f"windowed {buffered:>9,} rows resident   {_kb(windowed_bytes):>12}  "
+          f"({_kb(windowed_bytes / args.groups)} / session, incl. session + timer)")
+
+    for t in list(poll_quiz.PENDING_TIMERS):
+        t.cancel()
+    await bot.session.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", type=int, default=200)
+    ap.add_argument("--questions", type=int, default=2000)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Startup / import-cost benchmark.
+
+1) `python -X importtime -c "import bot.main"` ni bir necha marta ishga tushiradi
+   (birinchisi .pyc keshni isitadi) va modul bo‘yicha cumulative vaqtni ko‘rsatadi:
+   bot.* modullari alohida, third-party (aiogram, aiohttp, pydantic) alohida.
+2) "time to ready": import + init_db + Dispatcher/setup_routers (tarmoqsiz),
+   yangi DB (migrationlar) va joriy DB (user_version tekshiruvi) uchun.
+
+    python -m bench.bench_startup --runs 5 --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_READY_SCRIPT = r"""
+import asyncio, json, os, sys, time
+t0 = time.perf_counter()
+import bot.main  # noqa: F401
+from aiogram import Dispatcher
+import bot.db as db
+from bot.handlers import setup_routers
+t_import = time.perf_counter()
+
+async def boot():
+    t = time.perf_counter()
+    await db.init_db()
+    return time.perf_counter() - t
+
+db.DB_PATH = sys.argv[1]
+fresh = asyncio.run(boot())
+current = asyncio.run(boot())
+t = time.perf_counter()
+dp = Dispatcher()
+setup_routers(dp, admin=False)
+t_routers = time.perf_counter() - t
+print(json.dumps({
+    "import": t_import - t0,
+    "init_db_fresh": fresh,
+    "init_db_current": current,
+    "routers": t_routers,
+    "ready_current": (t_import - t0) + current + t_routers,
+}))
+"""
+
+
+def _importtime() -> List[Tuple[str, int, int, int]]:
+    """[(module, self_us, cumulative_us, depth)]"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bot.main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def _ready() -> Dict[str, float]:
+    path = os.path.join(tempfile.mkdtemp(prefix="quiz_startup_"), "quizbot.sqlite3")
+    out = subprocess.run([sys.executable, "-c", _READY_SCRIPT, path], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _ms(us: float) -> str:
+    return f"{us / 1000:8.1f} ms"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=0.0, help="fail if median ready time exceeds this")
+    args = ap.parse_args()
+
+    _importtime()  # .pyc keshni isitish
+    runs = [_importtime() for _ in range(args.runs)]
+
+    cumulative: Dict[str, List[int]] = {}
+    own: Dict[str, List[int]] = {}
+    for rows in runs:
+        for name, self_us, cum_us, _depth in rows:
+            cumulative.setdefault(name, []).append(cum_us)
+            if name == "bot" or name.startswith("bot."):
+                own.setdefault(name, []).append(self_us)
+
+    med = {name: statistics.median(v) for name, v in cumulative.items()}
+    total = med.get("bot.main", 0)
+    own_total = sum(statistics.median(v) for v in own.values())
+    top_level = {n: v for n, v in med.items() if "." not in n}
+
+    print(f"import bot.main (median of {args.runs}): {_ms(total)}")
+    print(f"  bot.* modules (self time):        {_ms(own_total)}")
+    for name in ("aiogram", "aiohttp", "pydantic", "aiosqlite", "orjson"):
+        if name in top_level:
+            print(f"  {name:32s} {_ms(top_level[name])}")
+    print()
+    print("Top cumulative imports:")
+    for name, us in sorted(med.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"  {_ms(us)}  {name}")
+    print()
+    print("Slowest bot.* modules (self):")
+    for name, v in sorted(own.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)[:8]:
+        print(f"  {_ms(statistics.median(v))}  {name}")
+
+    ready = [_ready() for _ in range(args.runs)]
+    r = {k: statistics.median(x[k] for x in ready) for k in ready[0]}
+    print()
+    print(f"import (in-process):      {r['import'] * 1000:8.1f} ms")
+    print(f"init_db fresh DB:         {r['init_db_fresh'] * 1000:8.1f} ms (migrations)")
+    print(f"init_db current DB:       {r['init_db_current'] * 1000:8.1f} ms (user_version check)")
+    print(f"setup_routers:            {r['routers'] * 1000:8.1f} ms")
+    print(f"ready (current DB):       {r['ready_current'] * 1000:8.1f} ms")
+
+    if args.budget_ms and r["ready_current"] * 1000 > args.budget_ms:
+        print(f"FAIL: ready time over {args.budget_ms:.0f} ms budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
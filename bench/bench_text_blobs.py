@@ -0,0 +1,180 @@
+"""
+Content-addressed matnlar (text_blobs) benchmark'i: disk va xotira tejami.
+
+Sintetik, lekin real holatga yaqin dataset: bitta mashhur bank (`--bank` savol) ni
+`--teachers` ta o‘qituvchi import qiladi (har biri ~70% qismini, ba’zilari bir nechta
+savolni tahrirlab), ustiga har bir o‘qituvchining o‘z unikal savollari.
+
+- disk: v3 sxema (matn har savol qatorida) vs v4 (text_blobs), ikkalasi VACUUM dan keyin;
+- xotira: `--sessions` ta sessiya butun quizni yuklaydi (take_quiz kabi) — eski usulda
+  (har qatorda yangi str) va get_questions_for_quiz orqali (intern qilingan), tracemalloc bilan.
+
+    python -m bench.bench_text_blobs --bank 500 --teachers 40 --sessions 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import bot.db as db
+
+WORDS = [
+    "capital", "river", "largest", "country", "which", "what", "year", "planet", "element",
+    "number", "author", "wrote", "century", "ocean", "mountain", "city", "language", "speed",
+    "light", "energy", "formula", "chemical", "animal", "species", "continent", "border",
+]
+
+
+def _sentence(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(n)) + f" {rnd.randrange(10**6)}"
+
+
+def _question(rnd: random.Random) -> Dict[str, str]:
+    return {
+        "q_text": _sentence(rnd, rnd.randint(10, 25)) + "?",
+        "opt_a": _sentence(rnd, 3), "opt_b": _sentence(rnd, 3),
+        "opt_c": _sentence(rnd, 3), "opt_d": _sentence(rnd, 3),
+        "correct": rnd.choice("ABCD"),
+        "explanation": _sentence(rnd, rnd.randint(15, 40)) if rnd.random() < 0.6 else None,
+    }
+
+
+def _dataset(args: argparse.Namespace) -> List[List[Dict[str, str]]]:
+    """Return: har o‘qituvchi uchun bitta quiz (savollar ro‘yxati)."""
+    rnd = random.Random(args.seed)
+    bank = [_question(rnd) for _ in range(args.bank)]
+    quizzes = []
+    for _ in range(args.teachers):
+        picked = [dict(q) for q in bank if rnd.random() < 0.7]
+        for q in picked:
+            if rnd.random() < 0.03:
+                q["q_text"] = q["q_text"].replace("?", " (edited)?")
+        picked.extend(_question(rnd) for _ in range(args.unique))
+        quizzes.append(picked)
+    return quizzes
+
+
+def _fill_legacy(path: str, quizzes: List[List[Dict[str, str]]]) -> List[int]:
+    """v3 sxema: migrations 1..3 (asinxron), keyin qatorlar to‘g‘ridan-to‘g‘ri."""
+    async def schema() -> None:
+        db.DB_PATH = path
+        async with db._connect() as conn:
+            for v in (1, 2, 3):
+                await db._MIGRATIONS[v](conn)
+                await conn.execute(f"PRAGMA user_version = {v}")
+                await conn.commit()
+
+    asyncio.run(schema())
+    conn = sqlite3.connect(path)
+    ids = []
+    for t, quiz in enumerate(quizzes):
+        cur = conn.execute("INSERT INTO quizzes(owner_tg_id, title, status) VALUES (?, 'bank', 'published')", (t,))
+        ids.append(cur.lastrowid)
+        conn.executemany(
+            """
+            INSERT INTO questions(quiz_id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(cur.lastrowid, q["q_text"], q["opt_a"], q["opt_b"], q["opt_c"], q["opt_d"], q["correct"],
+              q["explanation"]) for q in quizzes[t]],
+        )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return ids
+
+
+async def _fill_blobs(path: str, quizzes: List[List[Dict[str, str]]]) -> List[int]:
+    db.DB_PATH = path
+    await db.init_db()
+    ids = []
+    for t, quiz in enumerate(quizzes):
+        quiz_id = await db.create_quiz_draft(t, "bank")
+        await db.add_questions_bulk(quiz_id, t, [(q, b"\0", None) for q in quiz])
+        ids.append(quiz_id)
+    # bench uchun imzolar kerak emas — v3 bilan teng solishtirish
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM question_minhash")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return ids
+
+
+def _mb(n: float) -> str:
+    return f"{n / (1024 * 1024):8.2f} MB"
+
+
+def _load_legacy(path: str, quiz_ids: List[int], sessions: int) -> Tuple[int, list]:
+    conn = sqlite3.connect(path)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    held = [
+        conn.execute(
+            "SELECT id, q_text, opt_a, opt_b, opt_c, opt_d, correct, COALESCE(explanation,'') "
+            "FROM questions WHERE quiz_id=? ORDER BY id",
+            (quiz_ids[i % len(quiz_ids)],),
+        ).fetchall()
+        for i in range(sessions)
+    ]
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    conn.close()
+    return size, held
+
+
+async def _load_interned(quiz_ids: List[int], sessions: int) -> Tuple[int, list]:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    held = [await db.get_questions_for_quiz(quiz_ids[i % len(quiz_ids)]) for i in range(sessions)]
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return size, held
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bank", type=int, default=500)
+    ap.add_argument("--teachers", type=int, default=40)
+    ap.add_argument("--unique", type=int, default=30, help="unique questions per teacher")
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    quizzes = _dataset(args)
+    rows = sum(len(q) for q in quizzes)
+    tmp = tempfile.mkdtemp(prefix="quiz_blobs_")
+    legacy_path = os.path.join(tmp, "legacy.sqlite3")
+    blobs_path = os.path.join(tmp, "blobs.sqlite3")
+
+    legacy_ids = _fill_legacy(legacy_path, quizzes)
+    blob_ids = asyncio.run(_fill_blobs(blobs_path, quizzes))
+
+    legacy_size = os.path.getsize(legacy_path)
+    blobs_size = os.path.getsize(blobs_path)
+    conn = sqlite3.connect(blobs_path)
+    blobs, refs = conn.execute("SELECT COUNT(*), SUM(refs) FROM text_blobs").fetchone()
+    conn.close()
+
+    print(f"dataset: {args.teachers} teachers · bank {args.bank} · {rows:,} question rows")
+    print(f"texts:   {refs:,} references -> {blobs:,} unique blobs ({refs / blobs:.1f}x sharing)")
+    print(f"disk     v3 {_mb(legacy_size)}   v4 {_mb(blobs_size)}   saved {1 - blobs_size / legacy_size:.0%}")
+
+    legacy_mem, held_a = _load_legacy(legacy_path, legacy_ids, args.sessions)
+
+    async def load() -> Tuple[int, list]:
+        db.DB_PATH = blobs_path
+        return await _load_interned(blob_ids, args.sessions)
+
+    interned_mem, held_b = asyncio.run(load())
+    print(f"memory   {args.sessions} sessions · per-row str {_mb(legacy_mem)}   interned {_mb(interned_mem)}   "
+          f"saved {1 - interned_mem / legacy_mem:.0%}")
+    del held_a, held_b
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Turnir reytingi benchmark'i: `--groups` ta guruh × `--players` ta o‘yinchi (bir qismi bir
+nechta guruhda), `--questions` ta savol.
+
+- "rescan": /tournament har safar barcha sessiyalarning answers[step][user] ini qayta sanaydi
+  (_build_leaderboard_text usuli) va butun ro‘yxatni saralaydi;
+- "top-K merge": bot.tournament — har savoldan keyin sessiya top-K ni push qiladi,
+  /tournament sessiyalarning top-K larini heapq.merge qiladi.
+
+Ikkala natija solishtiriladi (aniqlik), keyin vaqtlar chiqariladi.
+
+    python -m bench.bench_tournament --groups 400 --players 100 --questions 20
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from bot import tournament
+
+SHOW = 15
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.answers: Dict[int, Dict[int, int]] = {}
+        self.correct_by_step: Dict[int, int] = {}
+        self.score: Dict[int, int] = {}
+        self.first_seen: Dict[int, float] = {}
+        self.last_seen: Dict[int, float] = {}
+        self.display: Dict[int, str] = {}
+
+
+def _rescan(sessions: List[FakeSession], k: int) -> List[tournament.Entry]:
+    best: Dict[int, Tuple[int, float, int, str]] = {}
+    for s in sessions:
+        score: Dict[int, int] = {}
+        for step_id, user_map in s.answers.items():
+            correct_idx = s.correct_by_step[step_id]
+            for uid, chosen in user_map.items():
+                score[uid] = score.get(uid, 0) + (chosen == correct_idx)
+        for uid, correct in score.items():
+            entry = (-correct, s.last_seen[uid] - s.first_seen[uid], uid, s.display[uid])
+            if uid not in best or entry < best[uid]:
+                best[uid] = entry
+    return sorted(best.values())[:k]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", type=int, default=400)
+    ap.add_argument("--players", type=int, default=100, help="players per group")
+    ap.add_argument("--questions", type=int, default=20)
+    ap.add_argument("--views", type=int, default=20, help="/tournament calls per question")
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    pool = int(args.groups * args.players * 0.9)  # ~10% o‘yinchi ikki guruhda
+    sessions = [FakeSession() for _ in range(args.groups)]
+    for s in sessions:
+        for uid in rnd.sample(range(pool), args.players):
+            s.display[uid] = f"@user{uid}"
+
+    cup = tournament.Tournament(id="bench", quiz_id=1, title="Bench")
+    boards = [cup.add_board(-1000 - g) for g in range(len(sessions))]
+
+    push_time = view_time = rescan_time = 0.0
+    now = 0.0
+    for step in range(1, args.questions + 1):
+        for s in sessions:
+            correct = rnd.randrange(4)
+            s.correct_by_step[step] = correct
+            user_map = s.answers.setdefault(step, {})
+            for uid in s.display:
+                now += 0.001
+                chosen = correct if rnd.random() < 0.6 else rnd.randrange(4)
+                user_map[uid] = chosen
+                s.score[uid] = s.score.get(uid, 0) + (chosen == correct)
+                s.first_seen.setdefault(uid, now)
+                s.last_seen[uid] = now
+
+        t0 = time.perf_counter()
+        for s, board in zip(sessions, boards):
+            cup.push(board, tournament.session_top(s.score, s.first_seen, s.last_seen, s.display),
+                     len(s.score), finished=step == args.questions)
+        push_time += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(args.views):
+            merged = cup.standings(SHOW)
+            cup._version += 1  # keshsiz (eng yomon holat): har view qayta birlashtiradi
+        view_time += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        expected = _rescan(sessions, SHOW)
+        rescan_time += time.perf_counter() - t0
+
+        assert merged == expected, f"step {step}: top-K merge differs from a full rescan"
+
+    views = args.questions * args.views
+    print(f"tournament: {args.groups} groups · {cup.participants:,} players · {args.questions} questions")
+    print(f"push (top-K per session, per question)  {push_time / args.questions * 1000:9.2f} ms / question")
+    print(f"/tournament via top-K merge             {view_time / views * 1000:9.3f} ms / view (uncached)")
+    print(f"/tournament via full rescan             {rescan_time / args.questions * 1000:9.2f} ms / view")
+    print("standings identical: yes")
+
+
+if __name__ == "__main__":
+    main()
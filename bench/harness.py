@@ -0,0 +1,347 @@
+"""
+Offline Telegram harness: Bot API chaqiruvlari tarmoqsiz "javob" qaytaradi,
+update'lar esa haqiqiy Dispatcher + setup_routers orqali o‘tadi.
+
+    session = FakeSession()
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    dp = Dispatcher()
+    setup_routers(dp)
+    await dp.feed_update(bot, make_command_update(chat_id, user_id, "/quiz CODE", bot=bot))
+"""
+import datetime
+import itertools
+import resource
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import (
+    AnswerCallbackQuery,
+    AnswerInlineQuery,
+    DeleteMessage,
+    EditMessageReplyMarkup,
+    GetFile,
+    GetMe,
+    SendMessage,
+    SendPoll,
+    StopPoll,
+    TelegramMethod,
+)
+from aiogram.types import (
+    Chat,
+    File,
+    Message,
+    Poll,
+    PollOption,
+    Update,
+    User,
+)
+
+FAKE_TOKEN = "42:TEST_TOKEN_FOR_OFFLINE_HARNESS"
+BOT_USER = User(id=42, is_bot=True, first_name="QuizBot", username="quiz_test_bot")
+
+_update_ids = itertools.count(1)
+
+
+@dataclass
+class SentPoll:
+    chat_id: int
+    poll_id: str
+    message_id: int
+    correct_option_id: Optional[int]
+    open_period: Optional[int]
+    sent_at: float  # time.monotonic()
+
+
+class FakeSession(BaseSession):
+    """
+    Har bir chaqiruvni yozib boradi va mos obyektni qaytaradi.
+    on_poll: yangi poll yuborilganda chaqiriladi (virtual userlar shunga javob beradi).
+    wire=True: haqiqiy session kabi so‘rov json_dumps bilan serializatsiya qilinadi,
+    javob esa JSON matndan json_loads + check_response orqali o‘qiladi (codec benchmark uchun).
+    """
+
+    def __init__(
+        self,
+        on_poll: Optional[Callable[[SentPoll], Any]] = None,
+        keep_messages: bool = False,
+        wire: bool = False,
+        **session_kwargs: Any,
+    ) -> None:
+        super().__init__(**session_kwargs)
+        self.on_poll = on_poll
+        self.keep_messages = keep_messages
+        self.wire = wire
+        self.calls: Dict[str, int] = {}
+        self.polls: List[SentPoll] = []
+        self.messages: List[SendMessage] = []
+        # file_path -> content (GetFile / download_file uchun)
+        self.files: Dict[str, bytes] = {}
+        self._message_ids = itertools.count(1)
+        self._poll_ids = itertools.count(1)
+        self._chats: Dict[int, Chat] = {}
+        # Shablonlar: model_copy to‘liq konstruktsiyadan ancha arzon (simulyatsiyada muhim)
+        self._message_tpl = Message(
+            message_id=0,
+            date=datetime.datetime.now(),
+            chat=Chat(id=0, type="private"),
+            from_user=BOT_USER,
+        )
+        # model_construct: Bot API versiyalari orasida yangi majburiy maydonlar qo‘shilib turadi
+        self._option_tpl = PollOption.model_construct(text="", voter_count=0)
+        self._poll_tpl = Poll.model_construct(
+            id="",
+            question="",
+            options=[],
+            total_voter_count=0,
+            is_closed=False,
+            is_anonymous=False,
+            type="quiz",
+            allows_multiple_answers=False,
+        )
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        for path, content in self.files.items():
+            if url.endswith("/" + path):
+                for i in range(0, len(content), chunk_size):
+                    yield content[i:i + chunk_size]
+                return
+        raise FileNotFoundError(url)
+
+    def _message(self, chat_id: int, **kwargs: Any) -> Message:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = Chat(id=chat_id, type="supergroup" if chat_id < 0 else "private")
+            self._chats[chat_id] = chat
+        return self._message_tpl.model_copy(
+            update={"message_id": next(self._message_ids), "chat": chat, **kwargs}
+        )
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: Optional[int] = None) -> Any:
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+        if self.wire:
+            return self._wire_request(bot, method)
+
+        if isinstance(method, SendPoll):
+            poll_id = str(next(self._poll_ids))
+            options = [
+                self._option_tpl.model_copy(update={"text": str(getattr(o, "text", o))})
+                for o in method.options
+            ]
+            poll = self._poll_tpl.model_copy(
+                update={
+                    "id": poll_id,
+                    "question": method.question,
+                    "options": options,
+                    "is_anonymous": bool(method.is_anonymous),
+                    "correct_option_id": method.correct_option_id,
+                }
+            )
+            msg = self._message(int(method.chat_id), poll=poll)
+            sent = SentPoll(
+                chat_id=int(method.chat_id),
+                poll_id=poll_id,
+                message_id=msg.message_id,
+                correct_option_id=method.correct_option_id,
+                open_period=method.open_period,
+                sent_at=time.monotonic(),
+            )
+            self.polls.append(sent)
+            if self.on_poll is not None:
+                self.on_poll(sent)
+            return msg
+
+        if isinstance(method, SendMessage):
+            if self.keep_messages:
+                self.messages.append(method)
+            return self._message(int(method.chat_id), text=method.text)
+
+        if isinstance(method, GetMe):
+            return BOT_USER
+
+        if isinstance(method, GetFile):
+            content = self.files.get(method.file_id)
+            return File(file_id=method.file_id, file_unique_id=method.file_id, file_path=method.file_id,
+                        file_size=None if content is None else len(content))
+
+        if isinstance(method, (AnswerCallbackQuery, AnswerInlineQuery, DeleteMessage, EditMessageReplyMarkup)):
+            return True
+
+        if isinstance(method, StopPoll):
+            return None
+
+        raise NotImplementedError(f"FakeSession: {name} is not simulated")
+
+
+    # -------------------- wire mode --------------------
+
+    def _message_payload(self, chat_id: int, **extra: Any) -> Dict[str, Any]:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+            "from": {"id": BOT_USER.id, "is_bot": True, "first_name": BOT_USER.first_name,
+                     "username": BOT_USER.username},
+            **extra,
+        }
+
+    def _wire_request(self, bot: Bot, method: TelegramMethod[Any]) -> Any:
+        files: Dict[str, Any] = {}
+        form = {}
+        for key, value in method.model_dump(warnings=False).items():
+            value = self.prepare_value(value, bot=bot, files=files)
+            if value:
+                form[key] = value
+
+        sent = None
+        if isinstance(method, SendPoll):
+            poll_id = str(next(self._poll_ids))
+            options = [
+                # persistent_id / allows_revoting / members_only: yangi Bot API maydonlari
+                {"text": str(getattr(o, "text", o)), "voter_count": 0, "persistent_id": str(i)}
+                for i, o in enumerate(method.options)
+            ]
+            result = self._message_payload(int(method.chat_id), poll={
+                "id": poll_id,
+                "question": method.question,
+                "options": options,
+                "total_voter_count": 0,
+                "is_closed": False,
+                "is_anonymous": bool(method.is_anonymous),
+                "type": "quiz",
+                "allows_multiple_answers": False,
+                "allows_revoting": False,
+                "members_only": False,
+                "correct_option_id": method.correct_option_id,
+            })
+            sent = SentPoll(
+                chat_id=int(method.chat_id),
+                poll_id=poll_id,
+                message_id=result["message_id"],
+                correct_option_id=method.correct_option_id,
+                open_period=method.open_period,
+                sent_at=time.monotonic(),
+            )
+        elif isinstance(method, SendMessage):
+            if self.keep_messages:
+                self.messages.append(method)
+            result = self._message_payload(int(method.chat_id), text=method.text)
+        elif isinstance(method, GetMe):
+            result = {"id": BOT_USER.id, "is_bot": True, "first_name": BOT_USER.first_name,
+                      "username": BOT_USER.username}
+        elif isinstance(method, (AnswerCallbackQuery, AnswerInlineQuery, DeleteMessage, EditMessageReplyMarkup)):
+            result = True
+        else:
+            raise NotImplementedError(f"FakeSession: {type(method).__name__} is not simulated")
+
+        content = self.json_dumps({"ok": True, "result": result})
+        response = self.check_response(bot=bot, method=method, status_code=200, content=content)
+        if sent is not None:
+            self.polls.append(sent)
+            if self.on_poll is not None:
+                self.on_poll(sent)
+        return response.result
+
+
+def _user_payload(user_id: int) -> Dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}"}
+
+
+def make_user(user_id: int) -> User:
+    return User(**_user_payload(user_id))
+
+
+def _update(payload: Dict[str, Any], bot: Optional[Bot]) -> Update:
+    # bot berilsa update shu botga "mount" qilinadi: feed_update uni JSON orqali qayta yaratmaydi
+    return Update.model_validate(payload, context={"bot": bot} if bot is not None else None)
+
+
+def make_command_update(
+    chat_id: int,
+    user_id: int,
+    text: str,
+    chat_type: str = "supergroup",
+    bot: Optional[Bot] = None,
+) -> Update:
+    return _update(
+        {
+            "update_id": next(_update_ids),
+            "message": {
+                "message_id": next(_update_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": chat_type},
+                "from": _user_payload(user_id),
+                "text": text,
+            },
+        },
+        bot,
+    )
+
+
+def make_callback_update(
+    chat_id: int,
+    user_id: int,
+    data: str,
+    chat_type: str = "private",
+    bot: Optional[Bot] = None,
+) -> Update:
+    return _update(
+        {
+            "update_id": next(_update_ids),
+            "callback_query": {
+                "id": str(next(_update_ids)),
+                "from": _user_payload(user_id),
+                "chat_instance": str(chat_id),
+                "data": data,
+                "message": {
+                    "message_id": next(_update_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": chat_type},
+                    "from": _user_payload(BOT_USER.id),
+                    "text": "menu",
+                },
+            },
+        },
+        bot,
+    )
+
+
+def make_poll_answer_update(poll_id: str, user_id: int, option: int, bot: Optional[Bot] = None) -> Update:
+    # option_persistent_ids: yangi Bot API maydoni (eski aiogram uni extra sifatida qabul qiladi)
+    return _update(
+        {
+            "update_id": next(_update_ids),
+            "poll_answer": {
+                "poll_id": poll_id,
+                "user": _user_payload(user_id),
+                "option_ids": [option],
+                "option_persistent_ids": [str(option)],
+            },
+        },
+        bot,
+    )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def rss_bytes() -> int:
+    """Joriy RSS (Linux /proc). Boshqa OS larda 0."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+    return pages * resource.getpagesize()
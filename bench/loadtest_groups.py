@@ -0,0 +1,163 @@
+"""
+End-to-end load test: ko‘p guruhda bir vaqtda quiz, minglab virtual userlar.
+
+Tarmoq yo‘q: FakeSession Bot API ni simulyatsiya qiladi, update'lar esa haqiqiy
+Dispatcher + setup_routers + poll_quiz.py orqali o‘tadi (vaqtinchalik SQLite bilan).
+
+Natija: handler latency (p50/p99), savollar orasidagi timer drift,
+bitta sessiyaga to‘g‘ri keladigan xotira.
+Chegaralar oshsa exit code 1 (CI uchun):
+
+    python -m bench.loadtest_groups --groups 200 --users 25 --questions 3
+    python -m bench.loadtest_groups --max-p99-ms 50 --max-drift-ms 250
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from aiogram import Bot, Dispatcher
+
+import bot.db as db
+from bot.handlers import setup_routers
+from bot.handlers import poll_quiz
+from bench.harness import (
+    FAKE_TOKEN,
+    FakeSession,
+    SentPoll,
+    make_command_update,
+    make_poll_answer_update,
+    percentile,
+    rss_bytes,
+)
+
+OWNER_ID = 1
+
+
+async def _prepare_quiz(n_questions: int, seconds: int) -> str:
+    await db.init_db()
+    quiz_id = await db.create_quiz_draft(OWNER_ID, "Load test quiz")
+    for i in range(n_questions):
+        await db.add_question(quiz_id, f"Question {i + 1}?", "one", "two", "three", "four", "B", "because")
+    await db.publish_quiz(quiz_id, OWNER_ID)
+    await db.set_user_time_limit(OWNER_ID, seconds)
+    brief = await db.get_quiz_brief(quiz_id, OWNER_ID)
+    return brief[2]
+
+
+async def run(args: argparse.Namespace) -> int:
+    rnd = random.Random(args.seed)
+    tmp = tempfile.mkdtemp(prefix="quiz_loadtest_")
+    db.DB_PATH = os.path.join(tmp, "quizbot.sqlite3")
+    code = await _prepare_quiz(args.questions, args.seconds)
+
+    command_lat: List[float] = []
+    answer_lat: List[float] = []
+    pending: List[asyncio.Task] = []
+    users_by_chat: Dict[int, List[int]] = {}
+
+    async def answer_later(sent: SentPoll, user_id: int) -> None:
+        period = sent.open_period or args.seconds
+        await asyncio.sleep(rnd.uniform(0.05, period * 0.8))
+        upd = make_poll_answer_update(sent.poll_id, user_id, rnd.randrange(4), bot=bot)
+        t0 = time.perf_counter()
+        await dp.feed_update(bot, upd)
+        answer_lat.append(time.perf_counter() - t0)
+
+    def on_poll(sent: SentPoll) -> None:
+        for uid in users_by_chat.get(sent.chat_id, ()):
+            pending.append(asyncio.create_task(answer_later(sent, uid)))
+
+    session = FakeSession(on_poll=on_poll)
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    dp = Dispatcher()
+    setup_routers(dp)
+
+    chats = [-1_000_000_000 - g for g in range(args.groups)]
+    for g, chat_id in enumerate(chats):
+        base = 10_000 + g * args.users
+        users_by_chat[chat_id] = [base + u for u in range(args.users)]
+
+    rss0 = rss_bytes()
+    started = time.perf_counter()
+    for chat_id in chats:
+        upd = make_command_update(chat_id, OWNER_ID, f"/quiz {code}", bot=bot)
+        t0 = time.perf_counter()
+        await dp.feed_update(bot, upd)
+        command_lat.append(time.perf_counter() - t0)
+
+    active_sessions = len(poll_quiz.SESSIONS)
+    rss_peak = rss_bytes()
+    while poll_quiz.SESSIONS:
+        await asyncio.sleep(0.2)
+        rss_peak = max(rss_peak, rss_bytes())
+    results = await asyncio.gather(*pending, return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    elapsed = time.perf_counter() - started
+
+    # timer drift: ketma-ket savollar orasidagi haqiqiy interval - open_period
+    drift: List[float] = []
+    by_chat: Dict[int, List[SentPoll]] = {}
+    for p in session.polls:
+        by_chat.setdefault(p.chat_id, []).append(p)
+    for polls in by_chat.values():
+        for prev, cur in zip(polls, polls[1:]):
+            drift.append(cur.sent_at - prev.sent_at - (prev.open_period or args.seconds))
+
+    per_session = (rss_peak - rss0) / max(1, active_sessions)
+
+    ms = 1000.0
+    print(f"groups / users:        {args.groups} / {args.groups * args.users}")
+    print(f"sessions started:      {active_sessions} (chats with polls: {len(by_chat)})")
+    print(f"updates handled:       {len(command_lat) + len(answer_lat)} in {elapsed:.1f}s")
+    print(f"Bot API calls:         {dict(sorted(session.calls.items()))}")
+    print(f"/quiz latency:         p50 {percentile(command_lat, 50) * ms:.2f} ms · "
+          f"p99 {percentile(command_lat, 99) * ms:.2f} ms")
+    print(f"poll_answer latency:   p50 {percentile(answer_lat, 50) * ms:.3f} ms · "
+          f"p99 {percentile(answer_lat, 99) * ms:.3f} ms")
+    print(f"timer drift:           p50 {percentile(drift, 50) * ms:.1f} ms · "
+          f"p99 {percentile(drift, 99) * ms:.1f} ms · max {max(drift or [0]) * ms:.1f} ms")
+    for path in ("prepared", "inline"):
+        n = poll_quiz.QUESTION_GAP.count(path)
+        if n:
+            print(f"question gap ({path + '):':10s} {n} polls · mean "
+                  f"{poll_quiz.QUESTION_GAP.total(path) / n * ms:.2f} ms")
+    print(f"memory per session:    {per_session / 1024:.1f} KB (RSS delta)")
+    if errors:
+        print(f"handler errors:        {len(errors)} (first: {errors[0]!r})")
+
+    await bot.session.close()
+
+    failed = []
+    if errors:
+        failed.append(f"{len(errors)} poll_answer updates raised")
+    if active_sessions != args.groups:
+        failed.append(f"only {active_sessions}/{args.groups} sessions started")
+    if args.max_p99_ms and percentile(answer_lat, 99) * ms > args.max_p99_ms:
+        failed.append("poll_answer p99 latency over limit")
+    if args.max_drift_ms and percentile(drift, 99) * ms > args.max_drift_ms:
+        failed.append("timer drift p99 over limit")
+    for reason in failed:
+        print(f"FAIL: {reason}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", type=int, default=200)
+    ap.add_argument("--users", type=int, default=25, help="virtual users per group")
+    ap.add_argument("--questions", type=int, default=3)
+    ap.add_argument("--seconds", type=int, default=5, help="open_period (5..300)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--max-p99-ms", type=float, default=0.0)
+    ap.add_argument("--max-drift-ms", type=float, default=0.0)
+    args = ap.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Virtual-clock simulyatsiya: minglab to‘liq quiz (start -> javoblar -> keyingi savol -> leaderboard)
+real kutishsiz, bir necha soniyada.
+
+Har bir guruh uchun kutilgan natija alohida hisoblanadi va leaderboard matni bilan solishtiriladi
+(to‘g‘rilik testi), oxirida scheduler throughput chiqariladi.
+
+    python -m bench.simulate_quizzes --quizzes 1000 --questions 50 --seconds 30 --users 3
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from aiogram import Bot, Dispatcher
+
+import bot.db as db
+from bot.clock import VirtualClock, set_clock
+from bot.handlers import setup_routers
+from bot.handlers import poll_quiz
+from bench.harness import (
+    FAKE_TOKEN,
+    FakeSession,
+    SentPoll,
+    make_command_update,
+    make_poll_answer_update,
+)
+
+OWNER_ID = 1
+_LINE_RE = re.compile(r"^(?:🥇|🥈|🥉|\d+\.) (@\S+) — (\d+) \(")
+
+
+async def _prepare_quiz(n_questions: int, seconds: int) -> str:
+    await db.init_db()
+    quiz_id = await db.create_quiz_draft(OWNER_ID, "Simulated quiz")
+    for i in range(n_questions):
+        await db.add_question(quiz_id, f"Question {i + 1}?", "a", "b", "c", "d", "ABCD"[i % 4], None)
+    await db.publish_quiz(quiz_id, OWNER_ID)
+    await db.set_user_time_limit(OWNER_ID, seconds)
+    return (await db.get_quiz_brief(quiz_id, OWNER_ID))[2]
+
+
+async def run(args: argparse.Namespace) -> int:
+    rnd = random.Random(args.seed)
+    clock = VirtualClock()
+    set_clock(clock)
+
+    tmp = tempfile.mkdtemp(prefix="quiz_sim_")
+    db.DB_PATH = os.path.join(tmp, "quizbot.sqlite3")
+    code = await _prepare_quiz(args.questions, args.seconds)
+
+    users_by_chat: Dict[int, List[int]] = {}
+    expected: Dict[int, Dict[int, int]] = {}  # chat_id -> user_id -> correct
+    errors: List[BaseException] = []
+
+    async def answer_later(sent: SentPoll, user_id: int) -> None:
+        try:
+            await clock.sleep(rnd.uniform(0.5, (sent.open_period or args.seconds) * 0.9))
+            option = rnd.randrange(4)
+            if option == sent.correct_option_id:
+                expected[sent.chat_id][user_id] = expected[sent.chat_id].get(user_id, 0) + 1
+            else:
+                expected[sent.chat_id].setdefault(user_id, 0)
+            await dp.feed_update(bot, make_poll_answer_update(sent.poll_id, user_id, option, bot=bot))
+        except Exception as e:  # simulyatsiya oxirida jamlab chiqaramiz
+            errors.append(e)
+
+    poll_index_peak = 0
+
+    def on_poll(sent: SentPoll) -> None:
+        nonlocal poll_index_peak
+        poll_index_peak = max(poll_index_peak, len(poll_quiz.POLL_INDEX))
+        for uid in users_by_chat.get(sent.chat_id, ()):
+            asyncio.create_task(answer_later(sent, uid))
+
+    session = FakeSession(on_poll=on_poll, keep_messages=True)
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    dp = Dispatcher()
+    setup_routers(dp)
+
+    chats = [-2_000_000_000 - g for g in range(args.quizzes)]
+    for g, chat_id in enumerate(chats):
+        users_by_chat[chat_id] = [100_000 + g * args.users + u for u in range(args.users)]
+        expected[chat_id] = {}
+
+    t0 = time.perf_counter()
+    v0 = clock.now()
+    for chat_id in chats:
+        await dp.feed_update(bot, make_command_update(chat_id, OWNER_ID, f"/quiz {code}", bot=bot))
+    await clock.run()
+    wall = time.perf_counter() - t0
+    virtual = clock.now() - v0
+
+    # ✅ to‘g‘rilik: har bir chatda leaderboard kutilgan natijaga mos bo‘lishi kerak
+    boards: Dict[int, str] = {}
+    for m in session.messages:
+        if (m.text or "").startswith("✅ Тест"):
+            boards[int(m.chat_id)] = m.text
+
+    mismatches = 0
+    for chat_id in chats:
+        text = boards.get(chat_id, "")
+        got = {}
+        for line in text.splitlines():
+            m = _LINE_RE.match(line)
+            if m:
+                got[int(m.group(1)[len("@user"):])] = int(m.group(2))
+        exp = expected[chat_id]
+        top = sorted(exp.values(), reverse=True)[: len(got)]
+        if not text or any(exp.get(uid) != score for uid, score in got.items()) \
+                or sorted(got.values(), reverse=True) != top:
+            mismatches += 1
+
+    steps = session.calls.get("SendPoll", 0)
+    print(f"quizzes:               {args.quizzes} x {args.questions} questions x {args.users} users")
+    print(f"virtual time:          {virtual / 60:.1f} min (per quiz)")
+    print(f"wall time:             {wall:.2f}s")
+    print(f"polls sent:            {steps} ({steps / wall:,.0f} steps/s)")
+    print(f"answers:               {args.quizzes * args.questions * args.users}")
+    print(f"timer wakeups:         {clock.wakeups}")
+    print(f"leaderboards:          {len(boards)} / {args.quizzes}, mismatches: {mismatches}")
+    print(f"sessions left:         {len(poll_quiz.SESSIONS)}")
+    print(f"POLL_INDEX:            peak {poll_index_peak} · left {len(poll_quiz.POLL_INDEX)}")
+    if errors:
+        print(f"errors:                {len(errors)} (first: {errors[0]!r})")
+
+    await bot.session.close()
+    ok = not errors and mismatches == 0 and len(boards) == args.quizzes and not poll_quiz.SESSIONS \
+        and not poll_quiz.POLL_INDEX
+    if not ok:
+        print("FAIL", file=sys.stderr)
+    return 0 if ok else 1
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quizzes", type=int, default=1000)
+    ap.add_argument("--questions", type=int, default=50)
+    ap.add_argument("--seconds", type=int, default=30)
+    ap.add_argument("--users", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+SQLite online backup va analytics snapshot.
+
+Ishlab turgan bot fayli (`quizbot.sqlite3` + WAL) oddiy nusxalansa yarim yozilgan
+(torn) nusxa chiqishi mumkin. Bu yerda SQLite backup API ishlatiladi:
+- sahifalar `step_pages` bo‘lib ko‘chiriladi, qadamlar orasida `step_sleep` pauza —
+  yozuvchi bot bloklanmaydi; hammasi alohida thread'da (event-loop ham bloklanmaydi);
+- nusxa journal_mode=DELETE ga o‘tkaziladi (bitta fayl, -wal/-shm kerak emas),
+  gzip bilan siqiladi va `quizbot-YYYYmmdd-HHMMSS-ffffff.sqlite3.gz` sifatida saqlanadi;
+- eng yangi `keep` ta snapshot qoladi, eskilari o‘chiriladi.
+
+Analytics: `use_latest()` eng yangi snapshot'ni ochib beradi va db.ANALYTICS_PATH ni
+o‘rnatadi — og‘ir hisobot/eksport so‘rovlari production fayliga tegmaydi.
+
+    python -m bot.backup --dir backups --keep 7
+    python -m bot.backup --list
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from bot import db, metrics
+
+log = logging.getLogger("quizbot.backup")
+
+PREFIX = "quizbot-"
+SUFFIX = ".sqlite3.gz"
+ANALYTICS_FILE = "analytics.sqlite3"
+
+BACKUPS = metrics.counter("quizbot_db_backups_total", "Completed online DB backups")
+LAST_BACKUP = {"time": 0.0, "bytes": 0}
+metrics.gauge("quizbot_db_backup_last", "Unix time of the last completed DB backup",
+              lambda: LAST_BACKUP["time"])
+metrics.gauge("quizbot_db_backup_bytes", "Compressed size of the last DB backup",
+              lambda: LAST_BACKUP["bytes"])
+
+
+def list_snapshots(backup_dir: str) -> List[str]:
+    """Eng yangisi oxirida (nomda vaqt bor — leksik tartib = xronologik)."""
+    try:
+        names = os.listdir(backup_dir)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(backup_dir, n) for n in sorted(names) if n.startswith(PREFIX) and n.endswith(SUFFIX)]
+
+
+def _backup_sync(src: str, dest: str, step_pages: int, step_sleep: float) -> int:
+    """Return: ko‘chirilgan sahifalar soni."""
+    pages = {"total": 0}
+
+    def progress(status, remaining, total):
+        pages["total"] = total
+
+    source = sqlite3.connect(src)
+    target = sqlite3.connect(dest)
+    try:
+        source.backup(target, pages=step_pages, progress=progress, sleep=step_sleep)
+        # snapshot o‘zi yetarli bo‘lsin: WAL rejimidan chiqaramiz
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+    return pages["total"]
+
+
+def _compress(path: str, dest: str) -> None:
+    tmp = dest + ".part"
+    with open(path, "rb") as f_in, gzip.open(tmp, "wb", compresslevel=6) as f_out:
+        shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+    os.replace(tmp, dest)
+
+
+def _rotate(backup_dir: str, keep: int) -> List[str]:
+    removed = []
+    for path in list_snapshots(backup_dir)[:-keep] if keep > 0 else []:
+        os.remove(path)
+        removed.append(path)
+    return removed
+
+
+def _snapshot_sync(backup_dir: str, keep: int, step_pages: int, step_sleep: float) -> Dict[str, object]:
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    raw = os.path.join(backup_dir, f".{PREFIX}{stamp}.sqlite3")
+    dest = os.path.join(backup_dir, f"{PREFIX}{stamp}{SUFFIX}")
+
+    t0 = time.perf_counter()
+    try:
+        pages = _backup_sync(db.DB_PATH, raw, step_pages, step_sleep)
+        raw_bytes = os.path.getsize(raw)
+        _compress(raw, dest)
+    finally:
+        if os.path.exists(raw):
+            os.remove(raw)
+    removed = _rotate(backup_dir, keep)
+    return {
+        "path": dest,
+        "pages": pages,
+        "raw_bytes": raw_bytes,
+        "bytes": os.path.getsize(dest),
+        "seconds": time.perf_counter() - t0,
+        "removed": len(removed),
+    }
+
+
+async def snapshot(backup_dir: str, keep: int = 7, step_pages: int = 1024,
+                   step_sleep: float = 0.01) -> Dict[str, object]:
+    report = await asyncio.to_thread(_snapshot_sync, backup_dir, keep, step_pages, step_sleep)
+    BACKUPS.inc()
+    LAST_BACKUP["time"] = time.time()
+    LAST_BACKUP["bytes"] = report["bytes"]
+    return report
+
+
+def _extract_latest(backup_dir: str) -> Optional[str]:
+    snaps = list_snapshots(backup_dir)
+    if not snaps:
+        return None
+    latest = snaps[-1]
+    dest = os.path.join(backup_dir, ANALYTICS_FILE)
+    # bir xil snapshot'ni qayta ochmaymiz
+    if os.path.exists(dest) and os.path.getmtime(dest) >= os.path.getmtime(latest):
+        return dest
+    tmp = dest + ".part"
+    with gzip.open(latest, "rb") as f_in, open(tmp, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+    # immutable=1 bilan ochilgan eski fayl bo‘lsa ham, os.replace yangi inode beradi
+    os.replace(tmp, dest)
+    return dest
+
+
+async def use_latest(backup_dir: str) -> Optional[str]:
+    """Eng yangi snapshot'ni analytics uchun ochadi (db.ANALYTICS_PATH). Snapshot yo‘q bo‘lsa None."""
+    path = await asyncio.to_thread(_extract_latest, backup_dir)
+    db.ANALYTICS_PATH = path
+    return path
+
+
+def format_report(report: Dict[str, object]) -> str:
+    mb = lambda n: f"{n / (1024 * 1024):.2f} MB"  # noqa: E731
+    return (
+        f"💾 DB backup: {os.path.basename(str(report['path']))}\n"
+        f"{report['pages']} pages · {mb(report['raw_bytes'])} → {mb(report['bytes'])} gz "
+        f"in {report['seconds']:.1f}s"
+        + (f"\nRotated out: {report['removed']}" if report["removed"] else "")
+    )
+
+
+async def run_scheduler(
+    backup_dir: str,
+    interval: float = 6 * 3600.0,
+    keep: int = 7,
+    step_pages: int = 1024,
+    step_sleep: float = 0.01,
+    analytics: bool = False,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            report = await snapshot(backup_dir, keep, step_pages, step_sleep)
+            log.info(format_report(report).replace("\n", " · "))
+            if analytics:
+                await use_latest(backup_dir)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("DB backup failed")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Online SQLite backup (gzip, rotating)")
+    ap.add_argument("--db", default=db.DB_PATH)
+    ap.add_argument("--dir", default="backups")
+    ap.add_argument("--keep", type=int, default=7)
+    ap.add_argument("--step-pages", type=int, default=1024)
+    ap.add_argument("--step-sleep", type=float, default=0.01)
+    ap.add_argument("--list", action="store_true", help="list snapshots and exit")
+    args = ap.parse_args()
+
+    if args.list:
+        for path in list_snapshots(args.dir):
+            print(f"{os.path.getsize(path):>12,}  {path}")
+        return
+
+    db.DB_PATH = args.db
+    print(format_report(asyncio.run(snapshot(args.dir, args.keep, args.step_pages, args.step_sleep))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Quiz bundle: quizlarni (metadata + savollar) bir instance'dan boshqasiga ko‘chirish formati.
+
+Fayl — gzip ichida JSONL (stdlib bilan ochiladi, `zcat | head` bilan ko‘rinadi):
+
+    {"format": "quizbot-bundle", "version": 1, "created": "..."}          <- header
+    {"code": "sfPlk", "owner": 1, "title": "...", "description": null,
+     "status": "published", "created_at": "...",
+     "questions": [["q", "a", "b", "c", "d", "A", "izoh yoki null"], ...]} <- har qatorda bitta quiz
+    {"end": true, "quizzes": 2, "questions": 80}                        <- trailer
+
+Savollar ro‘yxat (kalitsiz) — 1M savolda kalitlar hajmi siqishdan keyin ham sezilarli bo‘ladi.
+Trailer bo‘lmasa yoki sonlar mos kelmasa fayl kesilgan: reader BundleError beradi.
+
+Import: status va created_at saqlanadi, faqat draftlarning created_at i import vaqti bo‘ladi —
+aks holda eski instance'dagi draft keyingi draft reaper o‘tishida o‘chib ketardi
+(DRAFT_MAX_AGE_HOURS). public_code band bo‘lsa yangisi beriladi va hisobotda ko‘rsatiladi.
+
+Yozish va o‘qish oqimli (streaming): xotirada bitta DB chunk / bitta import batch turadi.
+Import `batch` ta savoldan bitta tranzaksiya qiladi (db.import_bundle_quizzes): xato bo‘lsa
+faqat shu batch qaytariladi, oldingilari qoladi (log nechta quiz o‘tganini ko‘rsatadi).
+
+    python -m bot.bundle export quizzes.jsonl.gz [--owner 123]
+    python -m bot.bundle import quizzes.jsonl.gz [--owner 456] [--batch 5000]
+    python -m bot.bundle inspect quizzes.jsonl.gz
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from bot import db, dedup, jsoncodec
+
+log = logging.getLogger("quizbot.bundle")
+
+FORMAT = "quizbot-bundle"
+VERSION = 1
+COMPRESSLEVEL = 6  # 9 ~2x sekinroq, fayl esa atigi bir necha % kichik
+
+
+class BundleError(ValueError):
+    pass
+
+
+class BundleWriter:
+    """
+    with BundleWriter(path) as w:
+        w.write(quiz)
+    Fayl avval `path.tmp` ga yoziladi va faqat muvaffaqiyatli close() da joyiga qo‘yiladi.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.quizzes = 0
+        self.questions = 0
+        self._tmp = path + ".tmp"
+        self._f = gzip.open(self._tmp, "wb", compresslevel=COMPRESSLEVEL)
+        self._line({
+            "format": FORMAT,
+            "version": VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        })
+
+    def _line(self, obj: Dict[str, Any]) -> None:
+        self._f.write(jsoncodec.dumps_bytes(obj) + b"\n")
+
+    def write(self, quiz: Dict[str, Any]) -> None:
+        self._line(quiz)
+        self.quizzes += 1
+        self.questions += len(quiz["questions"])
+
+    def close(self) -> None:
+        self._line({"end": True, "quizzes": self.quizzes, "questions": self.questions})
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        os.remove(self._tmp)
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def read_bundle(path: str) -> Iterator[Dict[str, Any]]:
+    """Quizlarni birma-bir beradi. Noto‘g‘ri/kesilgan/yangiroq versiyali fayl -> BundleError."""
+    quizzes = questions = 0
+    try:
+        with gzip.open(path, "rb") as f:
+            header = jsoncodec.loads(f.readline() or b"{}")
+            if header.get("format") != FORMAT:
+                raise BundleError(f"{path}: not a quiz bundle")
+            if header.get("version", 0) > VERSION:
+                raise BundleError(f"{path}: bundle version {header['version']} is newer than {VERSION}")
+            for line in f:
+                obj = jsoncodec.loads(line)
+                if obj.get("end"):
+                    if (obj.get("quizzes"), obj.get("questions")) != (quizzes, questions):
+                        raise BundleError(f"{path}: trailer counts do not match the content")
+                    return
+                _check_quiz(obj)
+                quizzes += 1
+                questions += len(obj["questions"])
+                yield obj
+    except (OSError, EOFError, ValueError) as e:
+        if isinstance(e, BundleError):
+            raise
+        raise BundleError(f"{path}: {e}") from e
+    raise BundleError(f"{path}: truncated (no trailer after {quizzes} quizzes)")
+
+
+def _check_quiz(quiz: Dict[str, Any]) -> None:
+    if not isinstance(quiz.get("title"), str) or not isinstance(quiz.get("questions"), list) \
+            or not isinstance(quiz.get("owner"), int):
+        raise BundleError(f"quiz {quiz.get('code')!r} without owner/title/questions")
+    for q in quiz["questions"]:
+        if len(q) != 7 or not all(isinstance(v, str) for v in q[:6]) or q[5] not in ("A", "B", "C", "D") \
+                or not (q[6] is None or isinstance(q[6], str)):
+            raise BundleError(f"bad question in quiz {quiz.get('code')!r}: {q!r}")
+
+
+# -------------------- DB <-> bundle --------------------
+
+async def export_bundle(path: str, owner_tg_id: Optional[int] = None, chunk: int = 200) -> BundleWriter:
+    """Hamma (yoki bitta owner) quizlarini bundle'ga yozadi. Return: yopilgan writer (sonlar uchun)."""
+    with BundleWriter(path) as w:
+        async for quizzes in db.iter_bundle_quizzes(owner_tg_id, chunk):
+            # gzip + JSON — CPU ishi, thread'da
+            await asyncio.to_thread(_write_all, w, quizzes)
+    return w
+
+
+def _write_all(w: BundleWriter, quizzes) -> None:
+    for quiz in quizzes:
+        w.write(quiz)
+
+
+def _signatures(quizzes):
+    return [
+        [dedup.fingerprint(dict(zip(db._DEDUP_COLUMNS, q))) for q in quiz["questions"]]
+        for quiz in quizzes
+    ]
+
+
+async def import_bundle(path: str, owner_tg_id: Optional[int] = None, batch: int = 5000,
+                        minhash: bool = True) -> Dict[str, Any]:
+    """
+    Bundle'ni `batch` ta savollik tranzaksiyalar bilan import qiladi.
+    owner_tg_id berilsa hamma quizlar shu userga o‘tadi. minhash=False — dedup imzolarisiz (tezroq).
+    Return: {"quizzes", "questions", "renamed": [(eski, yangi)], "seconds"}
+    """
+    t0 = time.perf_counter()
+    report: Dict[str, Any] = {"quizzes": 0, "questions": 0, "renamed": []}
+
+    quizzes = read_bundle(path)
+    try:
+        while True:
+            # gunzip + JSON (va MinHash) — CPU ishi, thread'da; DB ga batch bitta tranzaksiyada
+            chunk = await asyncio.to_thread(_take, quizzes, batch)
+            if not chunk:
+                break
+            if owner_tg_id is not None:
+                for quiz in chunk:
+                    quiz["owner"] = owner_tg_id
+            sigs = await asyncio.to_thread(_signatures, chunk) if minhash else None
+            added, renamed = await db.import_bundle_quizzes(chunk, sigs)
+            report["quizzes"] += len(chunk)
+            report["questions"] += added
+            report["renamed"] += renamed
+    except BaseException:
+        log.error("Import stopped: %d quizzes / %d questions were committed before the error",
+                  report["quizzes"], report["questions"])
+        raise
+    report["seconds"] = time.perf_counter() - t0
+    return report
+
+
+def _take(quizzes: Iterator[Dict[str, Any]], questions: int) -> list:
+    """Kamida `questions` ta savol yig‘ilguncha (yoki fayl tugaguncha) quizlarni oladi."""
+    out, n = [], 0
+    for quiz in quizzes:
+        out.append(quiz)
+        n += len(quiz["questions"])
+        if n >= questions:
+            break
+    return out
+
+
+# -------------------- CLI --------------------
+
+def _inspect(path: str) -> str:
+    quizzes = questions = 0
+    for quiz in read_bundle(path):
+        quizzes += 1
+        questions += len(quiz["questions"])
+    return f"{path}: {quizzes:,} quizzes · {questions:,} questions · {os.path.getsize(path):,} bytes · OK"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Quiz bundle (gzip JSONL) export/import")
+    ap.add_argument("command", choices=("export", "import", "inspect"))
+    ap.add_argument("path")
+    ap.add_argument("--db", default=db.DB_PATH)
+    ap.add_argument("--owner", type=int, help="export: only this owner; import: reassign all quizzes to this owner")
+    ap.add_argument("--batch", type=int, default=5000, help="import: questions per transaction")
+    ap.add_argument("--no-minhash", action="store_true", help="import: skip dedup signatures")
+    args = ap.parse_args()
+
+    try:
+        _run(args)
+    except BundleError as e:
+        ap.exit(1, f"error: {e}\n")
+
+
+def _run(args: argparse.Namespace) -> None:
+    if args.command == "inspect":
+        print(_inspect(args.path))
+        return
+
+    db.DB_PATH = args.db
+    t0 = time.perf_counter()
+    if args.command == "export":
+        w = asyncio.run(export_bundle(args.path, args.owner))
+        elapsed = time.perf_counter() - t0
+        print(f"exported {w.quizzes:,} quizzes · {w.questions:,} questions -> {args.path} "
+              f"({os.path.getsize(args.path):,} bytes) in {elapsed:.1f}s "
+              f"({w.questions / max(elapsed, 1e-9):,.0f} questions/s)")
+        return
+
+    async def run() -> Dict[str, Any]:
+        await db.init_db()
+        return await import_bundle(args.path, args.owner, args.batch, not args.no_minhash)
+
+    report = asyncio.run(run())
+    print(f"imported {report['quizzes']:,} quizzes · {report['questions']:,} questions in "
+          f"{report['seconds']:.1f}s ({report['questions'] / max(report['seconds'], 1e-9):,.0f} questions/s)")
+    for old, new in report["renamed"]:
+        print(f"  code {old} is taken here -> {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Quiz engine uchun vaqt manbai.
+
+Production: SystemClock (time.time + asyncio.sleep).
+Test/simulyatsiya: VirtualClock — sleep'lar real kutmaydi, vaqt "sakrab" o‘tadi,
+shuning uchun 50 savollik, 30 sekundlik quiz bir zumda o‘ynab bo‘linadi.
+
+    clock = VirtualClock()
+    set_clock(clock)
+    ...  # sessiyalarni boshlash
+    await clock.run()  # hamma taymerlar tugaguncha virtual vaqtni suradi
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(SystemClock):
+    """
+    Deterministik virtual vaqt. sleep() faqat run()/advance() vaqtni surganda uyg‘onadi.
+    Vaqt faqat hamma tasklar "bo‘sh" bo‘lganda (virtual sleep kutayotgan yoki tugagan) suriladi —
+    aiosqlite kabi thread'dagi ishlar tugashini ham kutadi.
+    """
+
+    def __init__(self, start: float = 1_700_000_000.0, stuck_timeout: float = 10.0) -> None:
+        self._now = start
+        self._start_mono = start
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        # virtual sleep kutayotgan future -> uni kutayotgan task
+        self._waiting: Dict[asyncio.Future, Optional[asyncio.Task]] = {}
+        # "band" bo‘lishi mumkin bo‘lgan tasklar: uyg‘otilganlar va yangi yaratilganlar
+        self._active: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = itertools.count()
+        self._stuck_timeout = stuck_timeout
+        self.wakeups = 0
+
+    def now(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now - self._start_mono
+
+    def _attach(self) -> None:
+        """Loopga task factory o‘rnatamiz: yangi tasklar ham _active ga tushadi."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._active.update(asyncio.all_tasks(loop))
+        previous = loop.get_task_factory()
+
+        def factory(loop, coro, **kwargs):
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            self._active.add(task)
+            return task
+
+        loop.set_task_factory(factory)
+
+    async def sleep(self, seconds: float) -> None:
+        self._attach()
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (self._now + seconds, next(self._seq), fut))
+        self._waiting[fut] = asyncio.current_task()
+        try:
+            await fut
+        finally:
+            self._waiting.pop(fut, None)
+
+    @property
+    def pending(self) -> int:
+        return len(self._waiting)
+
+    def _is_idle(self, task: asyncio.Task, depth: int = 0) -> bool:
+        if task.done():
+            return True
+        # CPython: task._fut_waiter — task hozir kutayotgan future
+        waiter = getattr(task, "_fut_waiter", None)
+        if waiter is None:
+            return False
+        if waiter in self._waiting:
+            return True
+        if isinstance(waiter, asyncio.Task) and depth < 8:
+            return self._is_idle(waiter, depth + 1)
+        return False
+
+    async def settle(self) -> None:
+        """
+        Virtual sleep'dan boshqa narsani kutayotgan tasklar qolmaguncha loopga yo‘l beramiz.
+        Faqat uyg‘otilgan/yangi tasklar tekshiriladi: virtual sleep'da yotgan task
+        biz uni uyg‘otmagunimizcha ishlay olmaydi.
+        """
+        self._attach()
+        me = asyncio.current_task()
+        deadline = time.monotonic() + self._stuck_timeout
+        spins = 0
+        while True:
+            await asyncio.sleep(0)
+            self._active = {t for t in self._active if t is not me and not self._is_idle(t)}
+            if not self._active:
+                return
+            spins += 1
+            if spins < 8:
+                continue
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"VirtualClock: {len(self._active)} tasks never became idle")
+            # thread'dagi ish (masalan aiosqlite) tugashini real vaqtda ozgina kutamiz
+            await asyncio.sleep(0.0005)
+
+    async def advance(self, seconds: float) -> None:
+        """Virtual vaqtni seconds ga suradi, yo‘lda muddati kelgan sleep'larni uyg‘otadi."""
+        target = self._now + seconds
+        await self.settle()
+        while self._heap and self._heap[0][0] <= target:
+            self._wake_next()
+            await self.settle()
+        self._now = max(self._now, target)
+
+    async def run(self, until: Optional[float] = None) -> None:
+        """Kutayotgan sleep'lar tugaguncha (yoki until vaqtigacha) simulyatsiya qiladi."""
+        await self.settle()
+        while self._heap and (until is None or self._heap[0][0] <= until):
+            self._wake_next()
+            await self.settle()
+
+    def _wake_next(self) -> None:
+        deadline = self._heap[0][0]
+        self._now = max(self._now, deadline)
+        # bir xil vaqtga to‘g‘ri kelgan hamma sleep'lar birga uyg‘onadi
+        while self._heap and self._heap[0][0] <= deadline:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():
+                fut.set_result(None)
+                self.wakeups += 1
+                task = self._waiting.get(fut)
+                if task is not None:
+                    self._active.add(task)
+
+
+_CLOCK: SystemClock = SystemClock()
+
+
+def get_clock() -> SystemClock:
+    return _CLOCK
+
+
+def set_clock(clock: SystemClock) -> None:
+    global _CLOCK
+    _CLOCK = clock
@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from typing import Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,9 +8,126 @@ load_dotenv()
 @dataclass(frozen=True)
 class Config:
     bot_token: str
+    # ✅ Bot API HTTP session (BOT_API_BASE: self-hosted server, masalan http://localhost:8081)
+    bot_api_base: str = ""
+    bot_api_local: bool = False
+    http_pool_limit: int = 100
+    http_keepalive: float = 30.0
+    http_timeout: float = 60.0
+    # ✅ .txt import uchun maksimal fayl hajmi (cloud Bot API 20 MB dan kattasini bermaydi)
+    max_import_mb: float = 20.0
+    # ✅ SQLite maintenance (MAINTENANCE_INTERVAL=0 -> o‘chirilgan)
+    maintenance_interval: float = 900.0
+    maintenance_hours: str = "3-6"
+    wal_truncate_mb: float = 64.0
+    # ✅ tashlab ketilgan draftlar (DRAFT_REAPER_INTERVAL=0 -> o‘chirilgan)
+    draft_max_age_hours: float = 24.0
+    draft_reaper_interval: float = 600.0
+    draft_reaper_batch: int = 200
+    # ✅ online backup (BACKUP_INTERVAL=0 -> o‘chirilgan); ANALYTICS_SNAPSHOT=1 — hisobotlar snapshot'dan
+    backup_dir: str = "backups"
+    backup_interval: float = 21600.0
+    backup_keep: int = 7
+    backup_step_pages: int = 1024
+    backup_step_sleep: float = 0.01
+    analytics_snapshot: bool = False
+    # ✅ kiruvchi update throttling: token/sek va burst (THROTTLE_RATE=0 -> o‘chirilgan)
+    throttle_rate: float = 1.0
+    throttle_burst: float = 5.0
+    throttle_chat_rate: float = 3.0
+    throttle_chat_burst: float = 15.0
+    # ✅ /schedule: bitta scheduler loop (SCHEDULE_CONCURRENCY=0 -> o‘chirilgan), vaqtlar SCHEDULE_TZ da
+    schedule_tz: str = "UTC"
+    schedule_concurrency: int = 8
+    schedule_misfire_grace: float = 900.0
+    # ✅ command/callback dispatch indeksi (DISPATCH_INDEX=0 -> aiogram'ning oddiy filter aylanishi)
+    dispatch_index: bool = True
+    # ✅ admin buyruqlari (/profile ...) uchun: ADMIN_IDS=123,456
+    admin_ids: Tuple[int, ...] = ()
+    # ✅ Prometheus /metrics (METRICS_PORT=0 -> o‘chirilgan)
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+    # ✅ SQLite slow-query log (DB_TRACE=1)
+    db_trace: bool = False
+    db_trace_file: str = "dbtrace.log"
+    db_trace_slow_ms: float = 50.0
+    # ✅ FAST_RUNTIME=1: uvloop + orjson (o‘rnatilgan bo‘lsa)
+    fast_runtime: bool = False
+    # ✅ event-loop lag watchdog (0 -> o‘chirilgan)
+    loop_lag_threshold_ms: float = 250.0
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default).strip() or default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(_env_str(name, str(default)))
+    except ValueError:
+        raise RuntimeError(f"{name} butun son bo‘lishi kerak.")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(_env_str(name, str(default)))
+    except ValueError:
+        raise RuntimeError(f"{name} son bo‘lishi kerak.")
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "on")
+
+
+def _env_ids(name: str) -> Tuple[int, ...]:
+    raw = os.getenv(name, "").replace(";", ",")
+    try:
+        return tuple(int(x) for x in raw.split(",") if x.strip())
+    except ValueError:
+        raise RuntimeError(f"{name} vergul bilan ajratilgan Telegram ID lar bo‘lishi kerak.")
+
 
 def load_config() -> Config:
     token = os.getenv("BOT_TOKEN", "").strip()
     if not token:
         raise RuntimeError("BOT_TOKEN topilmadi. .env faylga BOT_TOKEN=... qo‘ying.")
-    return Config(bot_token=token)
+    return Config(
+        bot_token=token,
+        bot_api_base=os.getenv("BOT_API_BASE", "").strip().rstrip("/"),
+        bot_api_local=_env_bool("BOT_API_LOCAL"),
+        http_pool_limit=_env_int("HTTP_POOL_LIMIT", 100),
+        http_keepalive=_env_float("HTTP_KEEPALIVE", 30.0),
+        http_timeout=_env_float("HTTP_TIMEOUT", 60.0),
+        max_import_mb=_env_float("MAX_IMPORT_MB", 20.0),
+        maintenance_interval=_env_float("MAINTENANCE_INTERVAL", 900.0),
+        maintenance_hours=_env_str("MAINTENANCE_HOURS", "3-6"),
+        wal_truncate_mb=_env_float("WAL_TRUNCATE_MB", 64.0),
+        draft_max_age_hours=_env_float("DRAFT_MAX_AGE_HOURS", 24.0),
+        draft_reaper_interval=_env_float("DRAFT_REAPER_INTERVAL", 600.0),
+        draft_reaper_batch=_env_int("DRAFT_REAPER_BATCH", 200),
+        backup_dir=_env_str("BACKUP_DIR", "backups"),
+        backup_interval=_env_float("BACKUP_INTERVAL", 21600.0),
+        backup_keep=_env_int("BACKUP_KEEP", 7),
+        backup_step_pages=_env_int("BACKUP_STEP_PAGES", 1024),
+        backup_step_sleep=_env_float("BACKUP_STEP_SLEEP", 0.01),
+        analytics_snapshot=_env_bool("ANALYTICS_SNAPSHOT"),
+        throttle_rate=_env_float("THROTTLE_RATE", 1.0),
+        throttle_burst=_env_float("THROTTLE_BURST", 5.0),
+        throttle_chat_rate=_env_float("THROTTLE_CHAT_RATE", 3.0),
+        throttle_chat_burst=_env_float("THROTTLE_CHAT_BURST", 15.0),
+        schedule_tz=_env_str("SCHEDULE_TZ", "UTC"),
+        schedule_concurrency=_env_int("SCHEDULE_CONCURRENCY", 8),
+        schedule_misfire_grace=_env_float("SCHEDULE_MISFIRE_GRACE", 900.0),
+        dispatch_index=_env_bool("DISPATCH_INDEX", True),
+        admin_ids=_env_ids("ADMIN_IDS"),
+        metrics_host=_env_str("METRICS_HOST", "127.0.0.1"),
+        metrics_port=_env_int("METRICS_PORT", 0),
+        db_trace=_env_bool("DB_TRACE"),
+        db_trace_file=_env_str("DB_TRACE_FILE", "dbtrace.log"),
+        db_trace_slow_ms=_env_float("DB_TRACE_SLOW_MS", 50.0),
+        fast_runtime=_env_bool("FAST_RUNTIME"),
+        loop_lag_threshold_ms=_env_float("LOOP_LAG_THRESHOLD_MS", 250.0),
+    )
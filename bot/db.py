@@ -1,9 +1,57 @@
 import aiosqlite
+import asyncio
+import hashlib
+import os
 import random
+import re
 import string
-from typing import Optional, Tuple
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bot import dbtrace, dedup, jsoncodec
+from bot.metrics import timed_query
 
 DB_PATH = "quizbot.sqlite3"
+# ✅ hisobot/eksport so‘rovlari uchun backup snapshot (bot.backup.use_latest o‘rnatadi);
+# None bo‘lsa analytics so‘rovlari ham asosiy DB ga boradi
+ANALYTICS_PATH: Optional[str] = None
+
+
+# ✅ ulanishlar hisobi (admin /runtime uchun): hozir ochiq, eng ko‘p, jami ochilgan
+CONN_STATS = {"in_flight": 0, "peak": 0, "opened": 0}
+
+
+class _TrackedConnect:
+    def __init__(self, path: Optional[str] = None, **kwargs) -> None:
+        # DB_TRACE yoqilgan bo‘lsa sqlite3 ulanishi TracedConnection bo‘ladi
+        self._conn = aiosqlite.connect(path or DB_PATH, **dbtrace.connect_kwargs(), **kwargs)
+
+    async def __aenter__(self) -> aiosqlite.Connection:
+        CONN_STATS["in_flight"] += 1
+        CONN_STATS["opened"] += 1
+        CONN_STATS["peak"] = max(CONN_STATS["peak"], CONN_STATS["in_flight"])
+        try:
+            return await self._conn.__aenter__()
+        except BaseException:
+            CONN_STATS["in_flight"] -= 1
+            raise
+
+    async def __aexit__(self, *exc) -> None:
+        try:
+            await self._conn.__aexit__(*exc)
+        finally:
+            CONN_STATS["in_flight"] -= 1
+
+
+def _connect() -> _TrackedConnect:
+    return _TrackedConnect()
+
+
+def _connect_analytics() -> _TrackedConnect:
+    """Snapshot bo‘lsa — faqat o‘qish uchun (mode=ro, immutable): production fayliga tegmaydi."""
+    if ANALYTICS_PATH is None:
+        return _TrackedConnect()
+    return _TrackedConnect(f"file:{ANALYTICS_PATH}?mode=ro&immutable=1", uri=True)
 
 SCHEMA_SQL = """
 PRAGMA journal_mode=WAL;
@@ -36,37 +84,426 @@ CREATE TABLE IF NOT EXISTS questions (
   FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE
 );
 
+-- ✅ Savollar bo‘yicha oldindan hisoblangan statistika (on_poll_answer -> taymer bilan flush)
+-- latency_hist: javob berish vaqti gistogrammasi (JSON list, bucketlar stats modulida)
+CREATE TABLE IF NOT EXISTS question_stats (
+  question_id INTEGER PRIMARY KEY,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  correct_count INTEGER NOT NULL DEFAULT 0,
+  opt_a_count INTEGER NOT NULL DEFAULT 0,
+  opt_b_count INTEGER NOT NULL DEFAULT 0,
+  opt_c_count INTEGER NOT NULL DEFAULT 0,
+  opt_d_count INTEGER NOT NULL DEFAULT 0,
+  latency_hist TEXT NOT NULL DEFAULT '[]',
+  updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+  FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+
+-- ✅ Import dedup: har savolning MinHash imzosi, owner bo‘yicha (LSH indeks shundan quriladi)
+CREATE TABLE IF NOT EXISTS question_minhash (
+  question_id INTEGER PRIMARY KEY,
+  owner_tg_id INTEGER NOT NULL,
+  sig BLOB NOT NULL,
+  FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+
 CREATE INDEX IF NOT EXISTS idx_quizzes_owner ON quizzes(owner_tg_id);
 CREATE INDEX IF NOT EXISTS idx_questions_quiz ON questions(quiz_id);
+CREATE INDEX IF NOT EXISTS idx_question_minhash_owner ON question_minhash(owner_tg_id);
+"""
+
+# ✅ Inline qidiruv uchun FTS5 indekslar (external content: matn asosiy jadvallarda qoladi)
+SEARCH_SCHEMA_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS quizzes_fts USING fts5(
+  title, description,
+  content='quizzes', content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+  q_text,
+  content='questions', content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS quizzes_fts_ai AFTER INSERT ON quizzes BEGIN
+  INSERT INTO quizzes_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quizzes_fts_ad AFTER DELETE ON quizzes BEGIN
+  INSERT INTO quizzes_fts(quizzes_fts, rowid, title, description)
+  VALUES ('delete', old.id, old.title, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quizzes_fts_au AFTER UPDATE OF title, description ON quizzes BEGIN
+  INSERT INTO quizzes_fts(quizzes_fts, rowid, title, description)
+  VALUES ('delete', old.id, old.title, old.description);
+  INSERT INTO quizzes_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN
+  INSERT INTO questions_fts(rowid, q_text) VALUES (new.id, new.q_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN
+  INSERT INTO questions_fts(questions_fts, rowid, q_text) VALUES ('delete', old.id, old.q_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE OF q_text ON questions BEGIN
+  INSERT INTO questions_fts(questions_fts, rowid, q_text) VALUES ('delete', old.id, old.q_text);
+  INSERT INTO questions_fts(rowid, q_text) VALUES (new.id, new.q_text);
+END;
 """
 
 def _gen_public_code(length: int = 5) -> str:
     alphabet = string.ascii_letters + string.digits
     return "".join(random.choice(alphabet) for _ in range(length))
 
-async def init_db() -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.executescript(SCHEMA_SQL)
+# ✅ Sxema versiyasi DB ning o‘zida (PRAGMA user_version) saqlanadi.
+# DB joriy bo‘lsa init_db bitta PRAGMA o‘qish bilan tugaydi.
+# Yangi o‘zgarish: SCHEMA_VERSION ni +1 qilib, _MIGRATIONS ga funksiya qo‘shing.
+SCHEMA_VERSION = 7
 
-        # ✅ Migration: eski DB bo‘lsa ham public_code qo‘shib yuboradi
-        try:
-            await db.execute("ALTER TABLE quizzes ADD COLUMN public_code TEXT")
-        except Exception:
-            pass
 
-        # unique index (bo‘lsa ham qayta yaratmaydi)
-        await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_public_code ON quizzes(public_code)")
+async def _migrate_v1(db) -> None:
+    """Boshlang‘ich sxema (idempotent: versiyasiz eski DB larni ham shu holatga keltiradi)."""
+    await db.executescript(SCHEMA_SQL)
+
+    # eski DB bo‘lsa ham public_code qo‘shib yuboradi
+    try:
+        await db.execute("ALTER TABLE quizzes ADD COLUMN public_code TEXT")
+    except Exception:
+        pass
+
+    # unique index (bo‘lsa ham qayta yaratmaydi)
+    await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_public_code ON quizzes(public_code)")
+
+    # FTS: indeks yangi yaratilgan bo‘lsa, eski quizlarni ham indekslab chiqamiz
+    cur = await db.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='quizzes_fts'")
+    fts_exists = await cur.fetchone() is not None
+    await db.executescript(SEARCH_SCHEMA_SQL)
+    if not fts_exists:
+        await db.execute("INSERT INTO quizzes_fts(quizzes_fts) VALUES ('rebuild')")
+        await db.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
 
+
+async def _migrate_v2(db) -> None:
+    """auto_vacuum=INCREMENTAL: o‘chirilgan ma’lumot joyini maintenance qaytarib olishi uchun."""
+    cur = await db.execute("PRAGMA auto_vacuum")
+    if (await cur.fetchone())[0] != 2:
+        # mavjud DB da rejim faqat VACUUM dan keyin kuchga kiradi (bir martalik)
+        await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        await db.execute("VACUUM")
+
+
+async def _migrate_v3(db) -> None:
+    """Draft reaper: eski draftlarni created_at bo‘yicha indeks orqali topish uchun."""
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_quizzes_status_created ON quizzes(status, created_at)")
+
+
+# ✅ v4: content-addressed matnlar. Savol matni/variantlari/izohi text_blobs da bir marta
+# (hash bo‘yicha) saqlanadi, questions esa ularning id larini saqlaydi. refs ni triggerlar
+# yuritadi: savol qayerda o‘chirilmasin (delete_quiz -> purge_orphans, draft reaper)
+# hisob to‘g‘ri qoladi, refs 0 bo‘lgan matn o‘sha zahoti o‘chadi.
+# O‘qish uchun eski ustunlar bilan questions_v view.
+_TEXT_COLUMNS = ("q_text", "opt_a", "opt_b", "opt_c", "opt_d", "explanation")
+# dedup.fingerprint uchun savol maydonlari (bundle savoli ham shu tartibda boshlanadi)
+_DEDUP_COLUMNS = ("q_text", "opt_a", "opt_b", "opt_c", "opt_d", "correct")
+
+_V4_TABLES = (
+    """
+    CREATE TABLE text_blobs (
+      id INTEGER PRIMARY KEY,
+      hash BLOB NOT NULL UNIQUE,
+      body TEXT NOT NULL,
+      refs INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE questions_new (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      quiz_id INTEGER NOT NULL,
+      q_text_id INTEGER NOT NULL,
+      opt_a_id INTEGER NOT NULL,
+      opt_b_id INTEGER NOT NULL,
+      opt_c_id INTEGER NOT NULL,
+      opt_d_id INTEGER NOT NULL,
+      correct TEXT NOT NULL,
+      explanation_id INTEGER,
+      FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE
+    )
+    """,
+)
+
+
+def _refs_sql(row: str, delta: str) -> str:
+    # har ustun alohida: bir savolda ikki variant bir xil matn bo‘lsa ikki marta sanaladi
+    return "\n".join(
+        f"  UPDATE text_blobs SET refs = refs {delta} 1 WHERE id = {row}.{col}_id;" for col in _TEXT_COLUMNS
+    )
+
+
+def _gc_sql(row: str) -> str:
+    ids = ", ".join(f"{row}.{col}_id" for col in _TEXT_COLUMNS)
+    return f"  DELETE FROM text_blobs WHERE refs <= 0 AND id IN ({ids});"
+
+
+_OLD_Q_TEXT = "(SELECT body FROM text_blobs WHERE id = old.q_text_id)"
+_NEW_Q_TEXT = "(SELECT body FROM text_blobs WHERE id = new.q_text_id)"
+
+_V4_SCHEMA = (
+    "CREATE INDEX idx_questions_quiz ON questions(quiz_id)",
+    """
+    CREATE VIEW questions_v AS
+    SELECT q.id, q.quiz_id,
+           t.body AS q_text, a.body AS opt_a, b.body AS opt_b, c.body AS opt_c, d.body AS opt_d,
+           q.correct, e.body AS explanation
+    FROM questions q
+    JOIN text_blobs t ON t.id = q.q_text_id
+    JOIN text_blobs a ON a.id = q.opt_a_id
+    JOIN text_blobs b ON b.id = q.opt_b_id
+    JOIN text_blobs c ON c.id = q.opt_c_id
+    JOIN text_blobs d ON d.id = q.opt_d_id
+    LEFT JOIN text_blobs e ON e.id = q.explanation_id
+    """,
+    # savol matni endi view da: FTS external content ham shunga qaraydi
+    """
+    CREATE VIRTUAL TABLE questions_fts USING fts5(
+      q_text,
+      content='questions_v', content_rowid='id',
+      tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # bitta trigger: FTS 'delete' matnni blob o‘chishidan oldin o‘qishi kerak
+    f"""
+    CREATE TRIGGER questions_ai AFTER INSERT ON questions BEGIN
+    {_refs_sql("new", "+")}
+      INSERT INTO questions_fts(rowid, q_text) VALUES (new.id, {_NEW_Q_TEXT});
+    END
+    """,
+    f"""
+    CREATE TRIGGER questions_ad AFTER DELETE ON questions BEGIN
+      INSERT INTO questions_fts(questions_fts, rowid, q_text) VALUES ('delete', old.id, {_OLD_Q_TEXT});
+    {_refs_sql("old", "-")}
+    {_gc_sql("old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER questions_au
+    AFTER UPDATE OF q_text_id, opt_a_id, opt_b_id, opt_c_id, opt_d_id, explanation_id ON questions BEGIN
+      INSERT INTO questions_fts(questions_fts, rowid, q_text) VALUES ('delete', old.id, {_OLD_Q_TEXT});
+    {_refs_sql("new", "+")}
+    {_refs_sql("old", "-")}
+    {_gc_sql("old")}
+      INSERT INTO questions_fts(rowid, q_text) VALUES (new.id, {_NEW_Q_TEXT});
+    END
+    """,
+)
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+async def _migrate_v4(db) -> None:
+    """questions ning matn ustunlari -> text_blobs (savol id lari saqlanadi, refs hisoblanadi)."""
+    # bitta tranzaksiya: yarim yo‘lda to‘xtasa eski sxema o‘z holicha qoladi
+    await db.execute("BEGIN IMMEDIATE")
+    for sql in _V4_TABLES:
+        await db.execute(sql)
+
+    blob_ids: Dict[bytes, int] = {}
+    refs: Dict[int, int] = {}
+    new_blobs = []
+
+    def blob(text: Optional[str]) -> Optional[int]:
+        if text is None:
+            return None
+        h = text_hash(text)
+        bid = blob_ids.get(h)
+        if bid is None:
+            bid = blob_ids[h] = len(blob_ids) + 1
+            new_blobs.append((bid, h, text))
+        refs[bid] = refs.get(bid, 0) + 1
+        return bid
+
+    last_id = 0
+    while True:
+        cur = await db.execute(
+            """
+            SELECT id, quiz_id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation
+            FROM questions WHERE id > ? ORDER BY id LIMIT 5000
+            """,
+            (last_id,),
+        )
+        rows = await cur.fetchall()
+        if not rows:
+            break
+        new_blobs.clear()
+        out = [
+            (qid, quiz_id, blob(q_text), blob(a), blob(b), blob(c), blob(d), correct, blob(expl or None))
+            for qid, quiz_id, q_text, a, b, c, d, correct, expl in rows
+        ]
+        await db.executemany("INSERT INTO text_blobs(id, hash, body) VALUES (?, ?, ?)", new_blobs)
+        await db.executemany(
+            """
+            INSERT INTO questions_new(id, quiz_id, q_text_id, opt_a_id, opt_b_id, opt_c_id, opt_d_id,
+                                      correct, explanation_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            out,
+        )
+        last_id = rows[-1][0]
+    await db.executemany("UPDATE text_blobs SET refs = ? WHERE id = ?", [(n, bid) for bid, n in refs.items()])
+
+    # AUTOINCREMENT: o‘chirilgan savollarning id lari qayta berilmasin
+    cur = await db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'questions'")
+    row = await cur.fetchone()
+    seq = row[0] if row else 0
+
+    for sql in (
+        "DROP TRIGGER IF EXISTS questions_fts_ai",
+        "DROP TRIGGER IF EXISTS questions_fts_ad",
+        "DROP TRIGGER IF EXISTS questions_fts_au",
+        "DROP TABLE IF EXISTS questions_fts",
+        "DROP TABLE questions",
+        "ALTER TABLE questions_new RENAME TO questions",
+        *_V4_SCHEMA,
+    ):
+        await db.execute(sql)
+    await db.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'questions'", (seq,))
+    if seq and not await (await db.execute("SELECT 1 FROM sqlite_sequence WHERE name = 'questions'")).fetchone():
+        await db.execute("INSERT INTO sqlite_sequence(name, seq) VALUES ('questions', ?)", (seq,))
+    await db.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+
+
+async def _migrate_v5(db) -> None:
+    """Rejalashtirilgan quizlar: bitta scheduler eng yaqin next_run ni indeks orqali topadi."""
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS quiz_jobs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          chat_id INTEGER NOT NULL,
+          chat_type TEXT NOT NULL,
+          created_by INTEGER NOT NULL,
+          public_code TEXT NOT NULL,
+          next_run INTEGER NOT NULL,  -- unix sekund
+          repeat TEXT,                -- NULL: bir martalik, 'daily' / 'weekly'
+          created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """
+    )
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_quiz_jobs_next_run ON quiz_jobs(next_run)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_quiz_jobs_chat ON quiz_jobs(chat_id)")
+
+
+async def _migrate_v6(db) -> None:
+    """Natijalar: tugagan har bir poll sessiyasi (attempt), o‘yinchilari va har bir javob."""
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS attempts (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          quiz_id INTEGER NOT NULL,
+          chat_id INTEGER NOT NULL,
+          tournament TEXT,
+          started_at INTEGER NOT NULL,
+          finished_at INTEGER NOT NULL,
+          questions INTEGER NOT NULL,         -- yuborilgan savollar
+          stopped INTEGER NOT NULL DEFAULT 0  -- /stop_quiz bilan to‘xtatilgan
+        )
+        """
+    )
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_attempts_quiz ON attempts(quiz_id, id)")
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS attempt_players (
+          attempt_id INTEGER NOT NULL,
+          user_id INTEGER NOT NULL,
+          name TEXT NOT NULL,
+          correct INTEGER NOT NULL,
+          answered INTEGER NOT NULL,
+          duration REAL NOT NULL,  -- birinchi va oxirgi javob orasidagi sekundlar
+          PRIMARY KEY (attempt_id, user_id)
+        ) WITHOUT ROWID
+        """
+    )
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS attempt_answers (
+          attempt_id INTEGER NOT NULL,
+          user_id INTEGER NOT NULL,
+          step INTEGER NOT NULL,
+          question_id INTEGER NOT NULL,
+          chosen TEXT NOT NULL,  -- asl variant (A..D), shuffle bo‘lsa ham
+          is_correct INTEGER NOT NULL,
+          PRIMARY KEY (attempt_id, user_id, step)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+async def _migrate_v7(db, batch: int = 5000) -> None:
+    """
+    Dedup: imzoga to‘g‘ri javob matni qo‘shildi va exact xesh ustuni paydo bo‘ldi — mavjud
+    imzolar questions_v dan qayta hisoblanadi (bir martalik, ~1M savol bir necha daqiqa).
+    """
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        await db.execute("ALTER TABLE question_minhash ADD COLUMN exact BLOB")
+        cur = await db.execute(
+            """
+            SELECT v.id, v.q_text, v.opt_a, v.opt_b, v.opt_c, v.opt_d, v.correct
+            FROM question_minhash m JOIN questions_v v ON v.id = m.question_id
+            """
+        )
+        while True:
+            rows = await cur.fetchmany(batch)
+            if not rows:
+                break
+            await db.executemany(
+                "UPDATE question_minhash SET sig = ?, exact = ? WHERE question_id = ?",
+                [(*dedup.fingerprint(dict(zip(_DEDUP_COLUMNS, row[1:]))), row[0]) for row in rows],
+            )
         await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+
+
+_MIGRATIONS = {
+    1: _migrate_v1,
+    2: _migrate_v2,
+    3: _migrate_v3,
+    4: _migrate_v4,
+    5: _migrate_v5,
+    6: _migrate_v6,
+    7: _migrate_v7,
+}
+
+
+@timed_query
+async def init_db() -> None:
+    async with _connect() as db:
+        cur = await db.execute("PRAGMA user_version")
+        version = (await cur.fetchone())[0]
+        if version >= SCHEMA_VERSION:
+            return
 
+        for v in range(version + 1, SCHEMA_VERSION + 1):
+            await _MIGRATIONS[v](db)
+            await db.execute(f"PRAGMA user_version = {v}")
+            await db.commit()
+
+@timed_query
 async def ensure_user(tg_id: int) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute("INSERT OR IGNORE INTO users(tg_id) VALUES (?)", (tg_id,))
         await db.commit()
 
+@timed_query
 async def create_quiz_draft(owner_tg_id: int, title: str) -> int:
     # ✅ unique code olishga urinamiz (collision bo‘lsa yana generatsiya)
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         for _ in range(10):
             code = _gen_public_code(5)
             try:
@@ -89,22 +526,60 @@ async def create_quiz_draft(owner_tg_id: int, title: str) -> int:
         await db.commit()
         return int(cur.lastrowid)
 
+@timed_query
 async def update_quiz_description(quiz_id: int, description: Optional[str]) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE quizzes SET description = ? WHERE id = ?",
             (description, quiz_id),
         )
         await db.commit()
 
+@timed_query
 async def delete_quiz(quiz_id: int, owner_tg_id: int) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "DELETE FROM quizzes WHERE id = ? AND owner_tg_id = ?",
             (quiz_id, owner_tg_id),
         )
         await db.commit()
 
+_INSERT_QUESTION_SQL = """
+INSERT INTO questions(quiz_id, q_text_id, opt_a_id, opt_b_id, opt_c_id, opt_d_id, correct, explanation_id)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+async def _blob_ids(db, texts: Iterable[Optional[str]]) -> Dict[str, int]:
+    """Matnlarni text_blobs ga (bo‘lmasa) qo‘shadi. Return: {matn: blob_id}. refs ni trigger oshiradi."""
+    by_hash = {text_hash(t): t for t in set(texts) if t is not None}
+    await db.executemany("INSERT OR IGNORE INTO text_blobs(hash, body) VALUES (?, ?)", list(by_hash.items()))
+    ids: Dict[str, int] = {}
+    hashes = list(by_hash)
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        cur = await db.execute(
+            f"SELECT hash, id FROM text_blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+        )
+        for h, bid in await cur.fetchall():
+            ids[by_hash[h]] = bid
+    return ids
+
+
+def _question_params(quiz_id: int, ids: Dict[str, int], q: Tuple) -> Tuple:
+    q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation = q
+    return (
+        quiz_id, ids[q_text], ids[opt_a], ids[opt_b], ids[opt_c], ids[opt_d], correct,
+        ids[explanation] if explanation else None,
+    )
+
+
+def _intern_rows(rows):
+    """Bir xil matnlar (mashhur banklar) barcha sessiyalarda bitta str obyekt bo‘lib turadi."""
+    return [tuple(sys.intern(v) if isinstance(v, str) else v for v in row) for row in rows]
+
+
+@timed_query
 async def add_question(
     quiz_id: int,
     q_text: str,
@@ -114,20 +589,109 @@ async def add_question(
     opt_d: str,
     correct: str,
     explanation: Optional[str],
+    minhash: Optional[bytes] = None,
+    exact: Optional[bytes] = None,
 ) -> int:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
+        ids = await _blob_ids(db, (q_text, opt_a, opt_b, opt_c, opt_d, explanation or None))
+        cur = await db.execute(_INSERT_QUESTION_SQL, _question_params(quiz_id, ids, (
+            q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation,
+        )))
+        question_id = int(cur.lastrowid)
+        if minhash is not None:
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO question_minhash(question_id, owner_tg_id, sig, exact)
+                SELECT ?, owner_tg_id, ?, ? FROM quizzes WHERE id = ?
+                """,
+                (question_id, minhash, exact, quiz_id),
+            )
+        await db.commit()
+        return question_id
+
+@timed_query
+async def add_questions_bulk(quiz_id: int, owner_tg_id: int, items) -> int:
+    """
+    Ko‘p savolni bitta tranzaksiyada qo‘shadi (import uchun).
+    items: [(question_dict, minhash_blob, exact), ...] — question_dict parse_quiz_text formatida.
+    Return: qo‘shilgan savollar soni.
+    """
+    added = 0
+    items = list(items)
+    async with _connect() as db:
+        # bank qayta import qilinsa ko‘p matn allaqachon bor: hammasi bitta batch'da
+        ids = await _blob_ids(db, (q[col] for q, *_ in items for col in _TEXT_COLUMNS[:5]))
+        ids.update(await _blob_ids(db, (q["explanation"] or None for q, *_ in items)))
+        for q, sig, exact in items:
+            cur = await db.execute(_INSERT_QUESTION_SQL, _question_params(quiz_id, ids, (
+                q["q_text"], q["opt_a"], q["opt_b"], q["opt_c"], q["opt_d"], q["correct"], q["explanation"],
+            )))
+            await db.execute(
+                "INSERT OR REPLACE INTO question_minhash(question_id, owner_tg_id, sig, exact) VALUES (?, ?, ?, ?)",
+                (int(cur.lastrowid), owner_tg_id, sig, exact),
+            )
+            added += 1
+        await db.commit()
+    return added
+
+@timed_query
+async def load_owner_minhashes(owner_tg_id: int):
+    """
+    Owner ning barcha savollari imzolari (o‘chirilgan savollarniki tashlab ketiladi).
+    Return rows: (question_id, sig_blob, exact)
+    """
+    async with _connect() as db:
         cur = await db.execute(
             """
-            INSERT INTO questions(quiz_id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            SELECT m.question_id, m.sig, m.exact
+            FROM question_minhash m
+            JOIN questions q ON q.id = m.question_id
+            JOIN quizzes z ON z.id = q.quiz_id
+            WHERE m.owner_tg_id = ?
             """,
-            (quiz_id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation),
+            (owner_tg_id,),
         )
-        await db.commit()
-        return int(cur.lastrowid)
+        return await cur.fetchall()
+
+@timed_query
+async def reap_draft_quizzes(max_age_seconds: int, batch: int = 200):
+    """
+    max_age_seconds dan eski draftlarni (savollari bilan) o‘chiradi, bir chaqiruvda ko‘pi bilan batch ta.
+    Tanlash va o‘chirish bitta qisqa IMMEDIATE tranzaksiyada: shu orada publish qilingan quizga tegmaydi.
+    Return: [(quiz_id, owner_tg_id)]
+    """
+    async with _connect() as db:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            cur = await db.execute(
+                """
+                SELECT id, owner_tg_id FROM quizzes
+                WHERE status = 'draft' AND created_at < datetime('now', ?)
+                ORDER BY created_at
+                LIMIT ?
+                """,
+                (f"-{int(max_age_seconds)} seconds", int(batch)),
+            )
+            rows = await cur.fetchall()
+            if rows:
+                ids = [r[0] for r in rows]
+                ph = ",".join("?" * len(ids))
+                for table in ("question_stats", "question_minhash"):
+                    await db.execute(
+                        f"DELETE FROM {table} WHERE question_id IN (SELECT id FROM questions WHERE quiz_id IN ({ph}))",
+                        ids,
+                    )
+                await db.execute(f"DELETE FROM questions WHERE quiz_id IN ({ph})", ids)
+                await db.execute(f"DELETE FROM quizzes WHERE id IN ({ph})", ids)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+    return [(int(r[0]), int(r[1])) for r in rows]
 
+@timed_query
 async def publish_quiz(quiz_id: int, owner_tg_id: int) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE quizzes SET status='published' WHERE id=? AND owner_tg_id=?",
             (quiz_id, owner_tg_id),
@@ -136,51 +700,164 @@ async def publish_quiz(quiz_id: int, owner_tg_id: int) -> None:
 
 # ✅ Rasmdagi menyu uchun kerak bo‘ladigan helperlar:
 
+@timed_query
 async def count_questions(quiz_id: int) -> int:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         cur = await db.execute("SELECT COUNT(*) FROM questions WHERE quiz_id=?", (quiz_id,))
         row = await cur.fetchone()
         return int(row[0]) if row else 0
 
+@timed_query
 async def get_quiz_brief(quiz_id: int, owner_tg_id: int) -> Optional[Tuple[int, str, str]]:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         cur = await db.execute(
             "SELECT id, title, COALESCE(public_code,'') FROM quizzes WHERE id=? AND owner_tg_id=?",
             (quiz_id, owner_tg_id),
         )
         row = await cur.fetchone()
         return row  # (id, title, public_code) yoki None
+@timed_query
 async def get_published_quiz_by_code(public_code: str):
     """
     public_code bo‘yicha faqat published quizni topadi.
     Return: (quiz_id, title) yoki None
     """
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         cur = await db.execute(
             "SELECT id, title FROM quizzes WHERE public_code=? AND status='published'",
             (public_code,),
         )
         return await cur.fetchone()
 
+@timed_query
 async def get_questions_for_quiz(quiz_id: int):
     """
     Quiz savollarini olib beradi.
     Return rows:
     (id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         cur = await db.execute(
             """
             SELECT id, q_text, opt_a, opt_b, opt_c, opt_d, correct, COALESCE(explanation,'')
-            FROM questions
+            FROM questions_v
             WHERE quiz_id=?
             ORDER BY id ASC
             """,
             (quiz_id,),
         )
-        return await cur.fetchall()
-import json
+        return _intern_rows(await cur.fetchall())
+
+@timed_query
+async def get_questions_window(quiz_id: int, after_id: int, limit: int):
+    """
+    Keyset sahifa: id > after_id bo‘lgan keyingi `limit` ta savol (idx_questions_quiz: (quiz_id, rowid)).
+    Return rows: get_questions_for_quiz bilan bir xil.
+    """
+    async with _connect() as db:
+        cur = await db.execute(
+            """
+            SELECT id, q_text, opt_a, opt_b, opt_c, opt_d, correct, COALESCE(explanation,'')
+            FROM questions_v
+            WHERE quiz_id=? AND id>?
+            ORDER BY id ASC
+            LIMIT ?
+            """,
+            (quiz_id, after_id, limit),
+        )
+        return _intern_rows(await cur.fetchall())
+
+@timed_query
+async def get_question_ids(quiz_id: int) -> List[int]:
+    """Shuffle uchun: quizning barcha savol id lari (id bo‘yicha)."""
+    async with _connect() as db:
+        cur = await db.execute("SELECT id FROM questions WHERE quiz_id=? ORDER BY id ASC", (quiz_id,))
+        return [int(r[0]) for r in await cur.fetchall()]
+
+@timed_query
+async def get_question_fingerprint(quiz_id: int) -> Tuple[int, int]:
+    """
+    (count, max_id): AUTOINCREMENT tufayli savol qo‘shilsa yoki o‘chirilsa albatta o‘zgaradi.
+    """
+    async with _connect() as db:
+        cur = await db.execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM questions WHERE quiz_id=?",
+            (quiz_id,),
+        )
+        row = await cur.fetchone()
+        return (int(row[0]), int(row[1])) if row else (0, 0)
+
+@timed_query
+async def get_questions_by_ids(quiz_id: int, ids: Sequence[int]):
+    """
+    Berilgan id lar bo‘yicha savollar (tartib kafolatlanmaydi — chaqiruvchi o‘zi joylaydi).
+    O‘chirilgan savollar natijada bo‘lmaydi. Return rows: get_questions_for_quiz bilan bir xil.
+    """
+    if not ids:
+        return []
+    marks = ",".join("?" * len(ids))
+    async with _connect() as db:
+        cur = await db.execute(
+            f"""
+            SELECT id, q_text, opt_a, opt_b, opt_c, opt_d, correct, COALESCE(explanation,'')
+            FROM questions_v
+            WHERE quiz_id=? AND id IN ({marks})
+            """,
+            (quiz_id, *ids),
+        )
+        return _intern_rows(await cur.fetchall())
+
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
 
+def build_fts_query(text: str) -> str:
+    """
+    Foydalanuvchi yozgan matndan xavfsiz FTS5 so‘rov yasaydi.
+    Har bir so‘z qo‘shtirnoqqa olinadi (FTS sintaksis xatolari bo‘lmasin),
+    oxirgi so‘z esa prefix (foydalanuvchi hali yozayotgan bo‘ladi).
+    Masalan: "world contin" -> '"world" "contin"*'
+    """
+    tokens = _FTS_TOKEN_RE.findall((text or "").lower())[:8]
+    if not tokens:
+        return ""
+    parts = [f'"{t}"' for t in tokens]
+    parts[-1] += "*"
+    return " ".join(parts)
+
+@timed_query
+async def search_published_quizzes(text: str, limit: int = 20, offset: int = 0):
+    """
+    Published quizlarni title/description va savol matni bo‘yicha qidiradi (bm25 reyting).
+    Title mosligi savol matnidan kuchliroq hisoblanadi.
+    Return rows: (quiz_id, title, description, public_code, questions_count)
+    """
+    match = build_fts_query(text)
+    if not match:
+        return []
+
+    async with _connect() as db:
+        cur = await db.execute(
+            """
+            WITH hits AS (
+              SELECT rowid AS quiz_id, bm25(quizzes_fts, 10.0, 4.0) AS score
+              FROM quizzes_fts WHERE quizzes_fts MATCH :m
+              UNION ALL
+              SELECT q.quiz_id, bm25(questions_fts) AS score
+              FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid
+              WHERE questions_fts MATCH :m
+            ),
+            best AS (
+              SELECT quiz_id, MIN(score) AS score FROM hits GROUP BY quiz_id
+            )
+            SELECT z.id, z.title, COALESCE(z.description,''), z.public_code,
+                   (SELECT COUNT(*) FROM questions WHERE quiz_id = z.id)
+            FROM best JOIN quizzes z ON z.id = best.quiz_id
+            WHERE z.status = 'published' AND z.public_code IS NOT NULL
+            ORDER BY best.score ASC, z.id DESC
+            LIMIT :limit OFFSET :offset
+            """,
+            {"m": match, "limit": int(limit), "offset": int(offset)},
+        )
+        return await cur.fetchall()
 DEFAULT_SETTINGS = {
     "language": "en",          # en / uz (xohlasangiz keyin ko‘paytiramiz)
     "shuffle": True,           # On/Off
@@ -188,14 +865,15 @@ DEFAULT_SETTINGS = {
     "negative_marking": False  # Yes/No
 }
 
+@timed_query
 async def get_user_settings(tg_id: int) -> dict:
     await ensure_user(tg_id)
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         cur = await db.execute("SELECT settings_json FROM users WHERE tg_id=?", (tg_id,))
         row = await cur.fetchone()
 
     try:
-        data = json.loads(row[0] or "{}") if row else {}
+        data = jsoncodec.loads(row[0] or "{}") if row else {}
     except Exception:
         data = {}
 
@@ -204,33 +882,35 @@ async def get_user_settings(tg_id: int) -> dict:
     merged.update({k: v for k, v in data.items() if k in merged})
     return merged
 
+@timed_query
 async def set_user_settings(tg_id: int, settings: dict) -> None:
     await ensure_user(tg_id)
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         await db.execute(
             "UPDATE users SET settings_json=? WHERE tg_id=?",
-            (json.dumps(settings, ensure_ascii=False), tg_id),
+            (jsoncodec.dumps(settings), tg_id),
         )
         await db.commit()
 
+@timed_query
 async def reset_user_settings(tg_id: int) -> None:
     await set_user_settings(tg_id, DEFAULT_SETTINGS.copy())
-import json
-
 DEFAULT_SETTINGS = {
     "time_limit": 30,  # seconds (5..300)
+    "shuffle": True,   # savollar va variantlar tartibi (poll quiz)
 }
 
+@timed_query
 async def get_user_settings(tg_id: int) -> dict:
     # users jadvali bor, ensure_user sizda bor
     await ensure_user(tg_id)
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
         cur = await db.execute("SELECT settings_json FROM users WHERE tg_id=?", (tg_id,))
         row = await cur.fetchone()
 
     try:
-        data = json.loads(row[0] or "{}") if row else {}
+        data = jsoncodec.loads(row[0] or "{}") if row else {}
     except Exception:
         data = {}
 
@@ -239,6 +919,7 @@ async def get_user_settings(tg_id: int) -> dict:
         merged.update({k: v for k, v in data.items() if k in merged})
     return merged
 
+@timed_query
 async def set_user_time_limit(tg_id: int, seconds: int) -> None:
     seconds = int(seconds)
     if seconds < 5:
@@ -249,9 +930,547 @@ async def set_user_time_limit(tg_id: int, seconds: int) -> None:
     s = await get_user_settings(tg_id)
     s["time_limit"] = seconds
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _connect() as db:
+        await db.execute(
+            "UPDATE users SET settings_json=? WHERE tg_id=?",
+            (jsoncodec.dumps(s), tg_id),
+        )
+        await db.commit()
+
+@timed_query
+async def set_user_shuffle(tg_id: int, enabled: bool) -> None:
+    s = await get_user_settings(tg_id)
+    s["shuffle"] = bool(enabled)
+
+    async with _connect() as db:
         await db.execute(
             "UPDATE users SET settings_json=? WHERE tg_id=?",
-            (json.dumps(s, ensure_ascii=False), tg_id),
+            (jsoncodec.dumps(s), tg_id),
+        )
+        await db.commit()
+
+@timed_query
+async def get_owned_quiz_by_code(public_code: str, owner_tg_id: int):
+    """
+    public_code bo‘yicha faqat egasiga tegishli quizni topadi (status farqi yo‘q).
+    Return: (quiz_id, title) yoki None
+    """
+    async with _connect() as db:
+        cur = await db.execute(
+            "SELECT id, title FROM quizzes WHERE public_code=? AND owner_tg_id=?",
+            (public_code, owner_tg_id),
+        )
+        return await cur.fetchone()
+
+@timed_query
+async def flush_question_stats(deltas: dict) -> None:
+    """
+    In-memory yig‘ilgan deltalarni question_stats ga qo‘shadi (bitta tranzaksiya).
+    deltas: {question_id: (attempts, correct, [a, b, c, d], [latency buckets...])}
+    """
+    if not deltas:
+        return
+
+    ids = list(deltas.keys())
+    async with _connect() as db:
+        # ✅ o‘qish-birlashtirish-yozish bitta yozuv tranzaksiyasida: bir vaqtda ikkita flush
+        # (run_flusher va /stats) bir xil eski gistogrammani o‘qib, bir-birini bosib ketmasin
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {}
+            # SQLite parametr limiti sababli bo‘laklab o‘qiymiz
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                cur = await db.execute(
+                    f"SELECT question_id, latency_hist FROM question_stats "
+                    f"WHERE question_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for qid, hist_json in await cur.fetchall():
+                    try:
+                        existing[qid] = jsoncodec.loads(hist_json or "[]")
+                    except Exception:
+                        existing[qid] = []
+
+            rows = []
+            for qid, (attempts, correct, opts, hist) in deltas.items():
+                old = existing.get(qid, [])
+                size = max(len(old), len(hist))
+                merged = [
+                    (old[i] if i < len(old) else 0) + (hist[i] if i < len(hist) else 0)
+                    for i in range(size)
+                ]
+                rows.append((qid, attempts, correct, opts[0], opts[1], opts[2], opts[3], jsoncodec.dumps(merged)))
+
+            await db.executemany(
+                """
+                INSERT INTO question_stats(
+                  question_id, attempts, correct_count,
+                  opt_a_count, opt_b_count, opt_c_count, opt_d_count, latency_hist
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(question_id) DO UPDATE SET
+                  attempts = attempts + excluded.attempts,
+                  correct_count = correct_count + excluded.correct_count,
+                  opt_a_count = opt_a_count + excluded.opt_a_count,
+                  opt_b_count = opt_b_count + excluded.opt_b_count,
+                  opt_c_count = opt_c_count + excluded.opt_c_count,
+                  opt_d_count = opt_d_count + excluded.opt_d_count,
+                  latency_hist = excluded.latency_hist,
+                  updated_at = datetime('now')
+                """,
+                rows,
+            )
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+
+@timed_query
+async def get_quiz_question_stats(quiz_id: int):
+    """
+    Quizning har bir savoli uchun tayyor statistika (bitta o‘tish, O(savollar)).
+    Return rows:
+    (question_id, q_text, correct, attempts, correct_count, a, b, c, d, latency_hist_json)
+    """
+    async with _connect() as db:
+        cur = await db.execute(
+            """
+            SELECT q.id, q.q_text, q.correct,
+                   COALESCE(s.attempts, 0), COALESCE(s.correct_count, 0),
+                   COALESCE(s.opt_a_count, 0), COALESCE(s.opt_b_count, 0),
+                   COALESCE(s.opt_c_count, 0), COALESCE(s.opt_d_count, 0),
+                   COALESCE(s.latency_hist, '[]')
+            FROM questions_v q
+            LEFT JOIN question_stats s ON s.question_id = q.id
+            WHERE q.quiz_id = ?
+            ORDER BY q.id ASC
+            """,
+            (quiz_id,),
+        )
+        return await cur.fetchall()
+
+
+# -------------------- ANALYTICS (snapshot) --------------------
+
+@timed_query
+async def top_quizzes_report(limit: int = 20):
+    """
+    Eng ko‘p javob olgan published quizlar (og‘ir aggregat — _connect_analytics orqali).
+    Return rows: (public_code, title, owner_tg_id, questions, answers, correct)
+    """
+    async with _connect_analytics() as db:
+        cur = await db.execute(
+            """
+            SELECT z.public_code, z.title, z.owner_tg_id, COUNT(q.id),
+                   COALESCE(SUM(s.attempts), 0), COALESCE(SUM(s.correct_count), 0)
+            FROM quizzes z
+            JOIN questions q ON q.quiz_id = z.id
+            LEFT JOIN question_stats s ON s.question_id = q.id
+            WHERE z.status = 'published'
+            GROUP BY z.id
+            ORDER BY 5 DESC, z.id DESC
+            LIMIT ?
+            """,
+            (limit,),
         )
+        return await cur.fetchall()
+
+
+# -------------------- MAINTENANCE --------------------
+
+@timed_query
+async def db_space() -> dict:
+    """DB va WAL hajmi, bo‘sh sahifalar (maintenance hisobotlari uchun)."""
+    async with _connect() as db:
+        page_size = (await (await db.execute("PRAGMA page_size")).fetchone())[0]
+        page_count = (await (await db.execute("PRAGMA page_count")).fetchone())[0]
+        freelist = (await (await db.execute("PRAGMA freelist_count")).fetchone())[0]
+    try:
+        wal = os.path.getsize(DB_PATH + "-wal")
+    except OSError:
+        wal = 0
+    return {
+        "page_size": page_size,
+        "db_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+        "wal_bytes": wal,
+    }
+
+
+@timed_query
+async def wal_checkpoint(mode: str = "PASSIVE") -> Tuple[int, int, int]:
+    """Return: (busy, wal_frames, checkpointed_frames)."""
+    mode = mode.upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(mode)
+    async with _connect() as db:
+        cur = await db.execute(f"PRAGMA wal_checkpoint({mode})")
+        row = await cur.fetchone()
+    return tuple(row) if row else (0, 0, 0)
+
+
+@timed_query
+async def optimize(full_analyze: bool = False) -> None:
+    async with _connect() as db:
+        if full_analyze:
+            await db.execute("ANALYZE")
+        else:
+            await db.execute("PRAGMA optimize")
         await db.commit()
+
+
+@timed_query
+async def has_analyze_stats() -> bool:
+    async with _connect() as db:
+        cur = await db.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'")
+        return await cur.fetchone() is not None
+
+
+@timed_query
+async def incremental_vacuum(max_pages: int = 0) -> None:
+    async with _connect() as db:
+        # executescript: pragma oxirigacha step qilinadi (execute faqat bitta sahifani bo‘shatadi)
+        arg = f"({int(max_pages)})" if max_pages > 0 else ""
+        await db.executescript(f"PRAGMA incremental_vacuum{arg};")
+
+
+@timed_query
+async def purge_orphans(batch: int = 5000) -> dict:
+    """
+    foreign_keys yoqilmagan, shuning uchun ON DELETE CASCADE ishlamaydi:
+    o‘chirilgan quizlarning savollari va ularning statistikasi/imzolari qolib ketadi.
+    """
+    removed = {"questions": 0, "question_stats": 0, "question_minhash": 0, "text_blobs": 0}
+    async with _connect() as db:
+        while True:
+            cur = await db.execute(
+                """
+                DELETE FROM questions WHERE id IN (
+                  SELECT q.id FROM questions q LEFT JOIN quizzes z ON z.id = q.quiz_id
+                  WHERE z.id IS NULL LIMIT ?
+                )
+                """,
+                (batch,),
+            )
+            await db.commit()
+            removed["questions"] += max(cur.rowcount, 0)
+            if cur.rowcount < batch:
+                break
+        for table in ("question_stats", "question_minhash"):
+            cur = await db.execute(
+                f"DELETE FROM {table} WHERE question_id NOT IN (SELECT id FROM questions)"
+            )
+            removed[table] = max(cur.rowcount, 0)
+        # triggerlar refs=0 matnni o‘zi o‘chiradi; bu faqat yarim qolgan yozuvlar uchun
+        cur = await db.execute("DELETE FROM text_blobs WHERE refs <= 0")
+        removed["text_blobs"] = max(cur.rowcount, 0)
+        await db.commit()
+    return removed
+
+
+# ✅ Rejalashtirilgan quizlar (/schedule): hisoblash bot.quiz_scheduler da, bu yerda faqat SQL
+
+@timed_query
+async def add_quiz_job(
+    chat_id: int, chat_type: str, created_by: int, public_code: str, next_run: int, repeat: Optional[str],
+) -> int:
+    async with _connect() as db:
+        cur = await db.execute(
+            """
+            INSERT INTO quiz_jobs(chat_id, chat_type, created_by, public_code, next_run, repeat)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (chat_id, chat_type, created_by, public_code, int(next_run), repeat),
+        )
+        await db.commit()
+        return int(cur.lastrowid)
+
+@timed_query
+async def list_quiz_jobs(chat_id: int):
+    """Return rows: (id, public_code, next_run, repeat, created_by) — next_run bo‘yicha."""
+    async with _connect() as db:
+        cur = await db.execute(
+            """
+            SELECT id, public_code, next_run, repeat, created_by FROM quiz_jobs
+            WHERE chat_id=? ORDER BY next_run, id
+            """,
+            (chat_id,),
+        )
+        return await cur.fetchall()
+
+@timed_query
+async def delete_quiz_job(job_id: int, chat_id: int) -> bool:
+    async with _connect() as db:
+        cur = await db.execute("DELETE FROM quiz_jobs WHERE id=? AND chat_id=?", (job_id, chat_id))
+        await db.commit()
+        return cur.rowcount > 0
+
+@timed_query
+async def delete_chat_quiz_jobs(chat_id: int) -> int:
+    async with _connect() as db:
+        cur = await db.execute("DELETE FROM quiz_jobs WHERE chat_id=?", (chat_id,))
+        await db.commit()
+        return max(cur.rowcount, 0)
+
+@timed_query
+async def next_quiz_job_run() -> Optional[int]:
+    async with _connect() as db:
+        cur = await db.execute("SELECT MIN(next_run) FROM quiz_jobs")
+        row = await cur.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+@timed_query
+async def get_due_quiz_jobs(now: int, limit: int = 500):
+    """Return rows: (id, chat_id, chat_type, created_by, public_code, next_run, repeat)."""
+    async with _connect() as db:
+        cur = await db.execute(
+            """
+            SELECT id, chat_id, chat_type, created_by, public_code, next_run, repeat FROM quiz_jobs
+            WHERE next_run <= ? ORDER BY next_run, id LIMIT ?
+            """,
+            (int(now), int(limit)),
+        )
+        return await cur.fetchall()
+
+@timed_query
+async def advance_quiz_jobs(rescheduled: Sequence[Tuple[int, int]], finished: Sequence[int]) -> None:
+    """Bitta tranzaksiyada: takrorlanadiganlarga yangi next_run, bir martaliklar o‘chiriladi."""
+    async with _connect() as db:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await db.executemany(
+                "UPDATE quiz_jobs SET next_run=? WHERE id=?",
+                [(int(run), job_id) for job_id, run in rescheduled],
+            )
+            await db.executemany("DELETE FROM quiz_jobs WHERE id=?", [(job_id,) for job_id in finished])
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+
+
+# ✅ Natijalar (attempts) va eksport
+
+# ✅ group commit: bir vaqtda tugagan ko‘p sessiya (turnir, scheduler, bir xil taymer) har biri
+# alohida BEGIN IMMEDIATE bilan navbat kutsa "database is locked" bo‘ladi. Yozuv navbatga
+# qo‘yiladi, lock'ni olgan chaqiruv navbatdagilarning hammasini bitta tranzaksiyada yozadi.
+_attempt_lock = asyncio.Lock()
+_pending_attempts: List[Tuple[Dict[str, object], Sequence, Sequence, "asyncio.Future[int]"]] = []
+
+
+@timed_query
+async def save_attempt(
+    attempt: Dict[str, object],
+    players: Sequence[Tuple[int, str, int, int, float]],
+    answers: Sequence[Tuple[int, int, int, str, int]],
+) -> int:
+    """
+    Tugagan sessiyani yozadi (bir vaqtda kelganlari bilan birga, bitta tranzaksiyada).
+    players: (user_id, name, correct, answered, duration); answers: (user_id, step, question_id, chosen, is_correct)
+    Return: attempt id.
+    """
+    fut: "asyncio.Future[int]" = asyncio.get_running_loop().create_future()
+    _pending_attempts.append((attempt, players, answers, fut))
+    async with _attempt_lock:
+        if not fut.done():
+            batch = _pending_attempts[:]
+            _pending_attempts.clear()
+            try:
+                try:
+                    await _write_attempts(batch)
+                except Exception:
+                    if len(batch) == 1:
+                        raise
+                    # bittasi buzuq bo‘lsa qolganlari yo‘qolmasin: alohida-alohida qayta yozamiz
+                    for item in batch:
+                        try:
+                            await _write_attempts([item])
+                        except Exception as e:
+                            item[3].set_exception(e)
+            except asyncio.CancelledError:
+                for *_, other in batch:
+                    if other is not fut and not other.done():
+                        other.cancel()
+                raise
+    return fut.result()
+
+
+async def _write_attempts(batch) -> None:
+    """Navbatdagi attempt'lar bitta tranzaksiyada; muvaffaqiyatli bo‘lsa har birining future'iga id."""
+    ids = []
+    async with _connect() as db:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            for attempt, players, answers, _ in batch:
+                cur = await db.execute(
+                    """
+                    INSERT INTO attempts(quiz_id, chat_id, tournament, started_at, finished_at, questions, stopped)
+                    VALUES (:quiz_id, :chat_id, :tournament, :started_at, :finished_at, :questions, :stopped)
+                    """,
+                    attempt,
+                )
+                attempt_id = int(cur.lastrowid)
+                await db.executemany(
+                    "INSERT INTO attempt_players VALUES (?, ?, ?, ?, ?, ?)",
+                    [(attempt_id, *p) for p in players],
+                )
+                await db.executemany(
+                    "INSERT INTO attempt_answers VALUES (?, ?, ?, ?, ?, ?)",
+                    [(attempt_id, *a) for a in answers],
+                )
+                ids.append(attempt_id)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+    for (*_, fut), attempt_id in zip(batch, ids):
+        fut.set_result(attempt_id)
+
+EXPORT_KINDS = {
+    # kind -> (ustunlar, FROM/WHERE/ORDER qismi)
+    "results": (
+        ("attempt_id", "chat_id", "tournament", "finished_at", "user_id", "name", "correct", "answered",
+         "questions", "duration_sec"),
+        """
+        SELECT a.id, a.chat_id, a.tournament, datetime(a.finished_at, 'unixepoch'),
+               p.user_id, p.name, p.correct, p.answered, a.questions, round(p.duration, 1)
+        FROM attempts a JOIN attempt_players p ON p.attempt_id = a.id
+        WHERE a.quiz_id = ?
+        ORDER BY a.id, p.correct DESC, p.duration, p.user_id
+        """,
+    ),
+    "answers": (
+        ("attempt_id", "chat_id", "user_id", "name", "step", "question_id", "chosen", "is_correct"),
+        """
+        SELECT a.id, a.chat_id, x.user_id, p.name, x.step, x.question_id, x.chosen, x.is_correct
+        FROM attempts a
+        JOIN attempt_answers x ON x.attempt_id = a.id
+        JOIN attempt_players p ON p.attempt_id = x.attempt_id AND p.user_id = x.user_id
+        WHERE a.quiz_id = ?
+        ORDER BY a.id, x.user_id, x.step
+        """,
+    ),
+}
+
+@timed_query
+async def count_export_rows(quiz_id: int, kind: str) -> int:
+    table = "attempt_players" if kind == "results" else "attempt_answers"
+    async with _connect_analytics() as db:
+        cur = await db.execute(
+            f"""
+            SELECT COUNT(*) FROM attempts a JOIN {table} t ON t.attempt_id = a.id
+            WHERE a.quiz_id = ?
+            """,
+            (quiz_id,),
+        )
+        return int((await cur.fetchone())[0])
+
+async def iter_export_rows(quiz_id: int, kind: str, chunk: int = 2000):
+    """
+    Eksport qatorlarini `chunk` talab beradi (async generator — shuning uchun @timed_query siz).
+    Kursor SQLite ichida qadam-baqadam yuradi: xotirada faqat bitta chunk turadi.
+    Snapshot sozlangan bo‘lsa undan o‘qiydi (production fayliga tegmaydi).
+    """
+    _, sql = EXPORT_KINDS[kind]
+    async with _connect_analytics() as db:
+        cur = await db.execute(sql, (quiz_id,))
+        while True:
+            rows = await cur.fetchmany(chunk)
+            if not rows:
+                break
+            yield rows
+
+# ✅ Bundle (bot.bundle): quizlarni instance'lar orasida ko‘chirish
+
+_BUNDLE_QUIZ_COLUMNS = ("code", "owner", "title", "description", "status", "created_at")
+
+async def iter_bundle_quizzes(owner_tg_id: Optional[int] = None, chunk: int = 200):
+    """
+    Quizlarni savollari bilan id tartibida beradi (async generator): har safar `chunk` ta quiz.
+    Quiz: {code, owner, title, description, status, created_at, questions: [[q, a, b, c, d, correct, expl]]}
+    Keyset (id > last) — offset yo‘q, xotirada faqat bitta chunk. Snapshot bo‘lsa undan o‘qiydi.
+    """
+    last_id = 0
+    where = "" if owner_tg_id is None else "AND owner_tg_id = ?"
+    extra = () if owner_tg_id is None else (owner_tg_id,)
+    async with _connect_analytics() as db:
+        while True:
+            cur = await db.execute(
+                f"""
+                SELECT id, public_code, owner_tg_id, title, description, status, created_at
+                FROM quizzes WHERE id > ? {where}
+                ORDER BY id LIMIT ?
+                """,
+                (last_id, *extra, chunk),
+            )
+            rows = await cur.fetchall()
+            if not rows:
+                return
+            quizzes = {}
+            for row in rows:
+                quizzes[row[0]] = dict(zip(_BUNDLE_QUIZ_COLUMNS, row[1:]), questions=[])
+            cur = await db.execute(
+                f"""
+                SELECT quiz_id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation
+                FROM questions_v WHERE quiz_id IN ({','.join('?' * len(quizzes))})
+                ORDER BY quiz_id, id
+                """,
+                tuple(quizzes),
+            )
+            for quiz_id, *q in await cur.fetchall():
+                quizzes[quiz_id]["questions"].append(q)
+            yield list(quizzes.values())
+            last_id = rows[-1][0]
+
+@timed_query
+async def import_bundle_quizzes(
+    quizzes: Sequence[Dict], signatures: Optional[Sequence[Sequence[Tuple[bytes, bytes]]]] = None,
+):
+    """
+    Bundle'dagi quizlarni bitta tranzaksiyada qo‘shadi (yarim batch qolmaydi).
+    public_code band bo‘lsa yangisi beriladi. signatures: har quiz savollari uchun
+    (MinHash, exact) juftliklari (dedup indeksi, dedup.fingerprint).
+    Return: (qo‘shilgan savollar soni, [(eski code, yangi code)])
+    """
+    added = 0
+    renamed: List[Tuple[str, str]] = []
+    async with _connect() as db:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            ids = await _blob_ids(db, (
+                text for quiz in quizzes for q in quiz["questions"] for text in (*q[:5], q[6] or None)
+            ))
+            for n, quiz in enumerate(quizzes):
+                code = quiz.get("code") or _gen_public_code(5)
+                while await (await db.execute("SELECT 1 FROM quizzes WHERE public_code = ?", (code,))).fetchone():
+                    code = _gen_public_code(8)
+                if quiz.get("code") and code != quiz["code"]:
+                    renamed.append((quiz["code"], code))
+                status = quiz.get("status") or "draft"
+                cur = await db.execute(
+                    """
+                    INSERT INTO quizzes(owner_tg_id, title, description, status, created_at, public_code)
+                    VALUES (?, ?, ?, ?, COALESCE(?, datetime('now')), ?)
+                    """,
+                    (quiz["owner"], quiz["title"], quiz.get("description"), status,
+                     # draft eski sana bilan kelsa draft reaper uni darhol o‘chirib yuboradi
+                     None if status == "draft" else quiz.get("created_at"), code),
+                )
+                quiz_id = int(cur.lastrowid)
+                params = [_question_params(quiz_id, ids, tuple(q)) for q in quiz["questions"]]
+                await db.executemany(_INSERT_QUESTION_SQL, params)
+                if signatures is not None and params:
+                    # quiz yangi: uning savollari id tartibida aynan shu params
+                    cur = await db.execute("SELECT id FROM questions WHERE quiz_id = ? ORDER BY id", (quiz_id,))
+                    await db.executemany(
+                        "INSERT INTO question_minhash(question_id, owner_tg_id, sig, exact) VALUES (?, ?, ?, ?)",
+                        [(qid, quiz["owner"], sig, exact)
+                         for (qid,), (sig, exact) in zip(await cur.fetchall(), signatures[n])],
+                    )
+                added += len(params)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+    return added, renamed
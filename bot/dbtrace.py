@@ -0,0 +1,286 @@
+"""
+SQLite layer uchun opt-in tracing (slow-query log).
+
+Yoqilganda (DB_TRACE=1) bot/db.py ulanishlari TracedConnection orqali ochiladi:
+har bir statement uchun SQL, parametrlar "shakli" (qiymatlar emas, faqat turlar),
+davomiylik va qatorlar soni o‘lchanadi. Chegaradan (DB_TRACE_SLOW_MS) sekin bo‘lganlari
+rotating JSON-lines faylga yoziladi; har bir sekin statement birinchi marta ko‘ringanda
+EXPLAIN QUERY PLAN ham qo‘shiladi.
+
+Top offenders:
+
+    python -m bot.dbtrace dbtrace.log --top 10 --sort total
+"""
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_FILE = "dbtrace.log"
+DEFAULT_SLOW_MS = 50.0
+
+_logger = logging.getLogger("quizbot.dbtrace")
+_logger.propagate = False
+
+_enabled = False
+_slow_ms = DEFAULT_SLOW_MS
+_planned: set = set()
+_lock = threading.Lock()
+
+_WS_RE = re.compile(r"\s+")
+# EXPLAIN QUERY PLAN faqat shu statementlar uchun ma’noli (DDL/PRAGMA emas)
+_PLANNABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def enable(path: str = DEFAULT_FILE, slow_ms: float = DEFAULT_SLOW_MS,
+           max_bytes: int = 5 * 1024 * 1024, backups: int = 3) -> None:
+    global _enabled, _slow_ms
+    for h in list(_logger.handlers):
+        _logger.removeHandler(h)
+        h.close()
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+    _slow_ms = float(slow_ms)
+    _enabled = True
+    logging.info("DB tracing: slow > %.1f ms -> %s", _slow_ms, path)
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def connect_kwargs() -> Dict[str, Any]:
+    """aiosqlite.connect(...) ga qo‘shimcha argumentlar (sqlite3.connect ga uzatiladi)."""
+    return {"factory": TracedConnection} if _enabled else {}
+
+
+def normalize_sql(sql: str) -> str:
+    return _WS_RE.sub(" ", sql).strip()
+
+
+def params_shape(params: Any) -> str:
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    try:
+        return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+    except TypeError:
+        return type(params).__name__
+
+
+def _explain(conn: sqlite3.Connection, sql: str, params: Any) -> Optional[List[str]]:
+    try:
+        # oddiy Cursor: EXPLAIN o‘zi trace qilinmasin
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+    except sqlite3.Error as e:
+        return [f"<explain failed: {e}>"]
+    return [str(r[-1]) for r in rows]
+
+
+def _record(conn: sqlite3.Connection, sql: str, params: Any, shape: str, seconds: float, rows: int) -> None:
+    ms = seconds * 1000.0
+    if ms < _slow_ms:
+        return
+    key = normalize_sql(sql)
+    entry: Dict[str, Any] = {
+        "ts": round(time.time(), 3),
+        "sql": key,
+        "params": shape,
+        "ms": round(ms, 3),
+        "rows": rows,
+    }
+    with _lock:
+        first = key not in _planned
+        if first:
+            _planned.add(key)
+    if first and key.upper().startswith(_PLANNABLE):
+        entry["plan"] = _explain(conn, sql, None if shape.startswith("many") else params)
+    _logger.info(json.dumps(entry, ensure_ascii=False))
+
+
+class TracedCursor(sqlite3.Cursor):
+    """
+    SELECT uchun vaqt execute + fetch'lar yig‘indisi; yozuv natija tugaganda
+    (yoki cursor yopilganda) chiqariladi. DML uchun — darhol, rowcount bilan.
+    """
+
+    _sql: Optional[str] = None
+
+    def _begin(self, sql: str, params: Any, shape: str) -> None:
+        self._sql = sql
+        self._params = params
+        self._shape = shape
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def _finish(self) -> None:
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        rows = self._rows if self.description is not None else max(self.rowcount, 0)
+        _record(self.connection, sql, self._params, self._shape, self._elapsed, rows)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._begin(sql, parameters, params_shape(parameters))
+        t0 = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except Exception:
+            self._sql = None  # xato bergan statement yozilmaydi
+            raise
+        finally:
+            self._elapsed += time.perf_counter() - t0
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        items = list(seq_of_parameters)
+        first = items[0] if items else ()
+        self._begin(sql, first, f"many x{len(items)} {params_shape(first)}")
+        t0 = time.perf_counter()
+        try:
+            super().executemany(sql, items)
+        except Exception:
+            self._sql = None  # xato bergan statement yozilmaydi
+            raise
+        finally:
+            self._elapsed += time.perf_counter() - t0
+        self._finish()
+        return self
+
+    def _timed_fetch(self, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._elapsed += time.perf_counter() - t0
+
+    def fetchone(self):
+        row = self._timed_fetch(super().fetchone)
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+        self._rows += len(rows)
+        if not rows or len(rows) < (self.arraysize if size is None else size):
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(super().fetchall)
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# -------------------- CLI --------------------
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(paths: Sequence[str]) -> List[Dict[str, Any]]:
+    stats: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        try:
+            f = open(path, encoding="utf-8")
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue
+                s = stats.setdefault(e["sql"], {"sql": e["sql"], "ms": [], "rows": 0, "plan": None, "params": set()})
+                s["ms"].append(float(e["ms"]))
+                s["rows"] += int(e.get("rows") or 0)
+                s["params"].add(e.get("params", ""))
+                if e.get("plan") and s["plan"] is None:
+                    s["plan"] = e["plan"]
+    out = []
+    for s in stats.values():
+        ms = s["ms"]
+        out.append({
+            "sql": s["sql"],
+            "count": len(ms),
+            "total_ms": sum(ms),
+            "p95_ms": _percentile(ms, 95),
+            "max_ms": max(ms),
+            "avg_rows": s["rows"] / len(ms),
+            "params": sorted(s["params"]),
+            "plan": s["plan"] or [],
+        })
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m bot.dbtrace", description="Top slow SQLite statements")
+    ap.add_argument("file", nargs="?", default=DEFAULT_FILE)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--sort", choices=("total", "count", "p95", "max"), default="total")
+    args = ap.parse_args(argv)
+
+    paths = [args.file] + [f"{args.file}.{i}" for i in range(1, 10)]
+    rows = summarize(paths)
+    key = {"total": "total_ms", "count": "count", "p95": "p95_ms", "max": "max_ms"}[args.sort]
+    rows.sort(key=lambda r: r[key], reverse=True)
+    if not rows:
+        print("Sekin so‘rovlar topilmadi.")
+        return
+    for i, r in enumerate(rows[: args.top], start=1):
+        print(f"{i}. total {r['total_ms']:.1f} ms · {r['count']}x · p95 {r['p95_ms']:.1f} ms · "
+              f"max {r['max_ms']:.1f} ms · ~{r['avg_rows']:.0f} rows")
+        print(f"   {r['sql'][:300]}")
+        print(f"   params: {' | '.join(r['params'])[:200]}")
+        for step in r["plan"]:
+            print(f"   plan: {step}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Import paytida deyarli bir xil (near-duplicate) savollarni topish.
+
+- Savol + variantlar + to‘g‘ri javob matni normallashtiriladi (kichik harf, tinish belgilarsiz,
+  variantlar tartibi farq qilmaydi)
+- aynan bir xil (exact): normallashtirilgan matnning xeshi teng — import bularni tashlab ketadi
+- deyarli bir xil (near): 5 baytli shingle'lar -> one-permutation MinHash (64 bin),
+  LSH 8 band x 8 qator, imzolar o‘xshashligi >= THRESHOLD. Bular tashlanmaydi: import ularni
+  ushlab turadi va owner'dan so‘raydi ("World War 1" / "World War 2" savollari 0.89 beradi,
+  lekin ikkalasi ham haqiqiy savol)
+
+Hammasi import hajmiga nisbatan taxminan chiziqli ishlaydi.
+Imzolar va exact xeshlar question_minhash jadvalida owner bo‘yicha saqlanadi.
+"""
+import hashlib
+import re
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+NUM_BINS = 64
+BANDS = 8
+ROWS = NUM_BINS // BANDS
+SHINGLE = 5
+THRESHOLD = 0.8
+
+_MASK32 = 0xFFFFFFFF
+_BIN_SHIFT = 32 - 6  # 2**6 == NUM_BINS
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+_EMPTY = _VALUE_MASK + 1
+_MIX = 2654435761  # Knuth multiplicative hash: crc32 bitlarini aralashtiradi
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _norm(s: Optional[str]) -> str:
+    return _NON_WORD_RE.sub(" ", (s or "").lower()).strip()
+
+
+def normalize_question(q: Dict[str, Any]) -> str:
+    opts = sorted(_norm(q.get(k)) for k in ("opt_a", "opt_b", "opt_c", "opt_d"))
+    # to‘g‘ri javob ham: bir xil variantli, lekin javobi boshqa savol — boshqa savol
+    answer = _norm(q.get("opt_" + (q.get("correct") or "").lower()))
+    return _norm(q.get("q_text")) + " | " + " | ".join(opts) + " = " + answer
+
+
+def exact_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def signature(text: str) -> array:
+    """
+    One-permutation hashing: har shingle bitta xesh, yuqori 6 bit -> bin, qolgani -> qiymat.
+    Shingle'lar to‘plamga yig‘ilmaydi: min takrorlanishga befarq.
+    """
+    mins = [_EMPTY] * NUM_BINS
+    crc32 = zlib.crc32
+    data = text.encode("utf-8")
+    for i in range(max(1, len(data) - SHINGLE + 1)):
+        h = (crc32(data[i:i + SHINGLE]) * _MIX) & _MASK32
+        b = h >> _BIN_SHIFT
+        v = h & _VALUE_MASK
+        if v < mins[b]:
+            mins[b] = v
+
+    # densification: bo‘sh binlar o‘ngdagi birinchi to‘la bin qiymatini oladi (+ masofa)
+    if _EMPTY in mins:
+        filled = list(mins)
+        for b in range(NUM_BINS):
+            if mins[b] != _EMPTY:
+                continue
+            step = 1
+            while mins[(b + step) % NUM_BINS] == _EMPTY:
+                step += 1
+            filled[b] = (mins[(b + step) % NUM_BINS] + step * _MIX) & _VALUE_MASK
+        mins = filled
+
+    return array("I", mins)
+
+
+def question_signature(q: Dict[str, Any]) -> array:
+    return signature(normalize_question(q))
+
+
+def fingerprint(q: Dict[str, Any]) -> Tuple[bytes, bytes]:
+    """(MinHash blob, exact xesh) — question_minhash ga shu juftlik yoziladi."""
+    text = normalize_question(q)
+    return to_blob(signature(text)), exact_key(text)
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Imzolar bo‘yicha taxminiy Jaccard o‘xshashligi."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+def to_blob(sig: array) -> bytes:
+    return sig.tobytes()
+
+
+def from_blob(blob: bytes) -> array:
+    sig = array("I")
+    sig.frombytes(blob)
+    return sig
+
+
+class LSHIndex:
+    """In-memory LSH: band -> {band_key: [key, ...]}, yonida exact xesh -> key."""
+
+    def __init__(self) -> None:
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._sigs: Dict[int, array] = {}
+        self._exact: Dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    @staticmethod
+    def _band_keys(sig: Sequence[int]) -> List[int]:
+        return [hash(tuple(sig[i * ROWS:(i + 1) * ROWS])) for i in range(BANDS)]
+
+    def add(self, key: int, sig: array, exact: Optional[bytes] = None) -> None:
+        self._sigs[key] = sig
+        if exact is not None:
+            self._exact.setdefault(exact, key)
+        for band, bkey in enumerate(self._band_keys(sig)):
+            self._buckets[band].setdefault(bkey, []).append(key)
+
+    def find_exact(self, exact: bytes) -> Optional[int]:
+        return self._exact.get(exact)
+
+    def find_duplicate(self, sig: array, threshold: float = THRESHOLD) -> Optional[Tuple[int, float]]:
+        """Eng o‘xshash nomzod (key, similarity) yoki None."""
+        best: Optional[Tuple[int, float]] = None
+        seen = set()
+        for band, bkey in enumerate(self._band_keys(sig)):
+            for key in self._buckets[band].get(bkey, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                sim = similarity(sig, self._sigs[key])
+                if sim >= threshold and (best is None or sim > best[1]):
+                    best = (key, sim)
+        return best
+
+
+def build_index(rows: Iterable[Tuple[int, bytes, Optional[bytes]]]) -> LSHIndex:
+    """rows: (question_id, sig_blob, exact) — DB dan o‘qilgan owner indeksi."""
+    index = LSHIndex()
+    for question_id, blob, exact in rows:
+        index.add(int(question_id), from_blob(blob), exact)
+    return index
+
+
+def split_duplicates(
+    questions: List[Dict[str, Any]],
+    index: LSHIndex,
+    threshold: float = THRESHOLD,
+) -> Tuple[
+    List[Tuple[Dict[str, Any], bytes, bytes]],
+    List[Tuple[int, Optional[int]]],
+    List[Tuple[int, Optional[int], float]],
+]:
+    """
+    Import qilinayotgan savollarni yangi, aynan takror va o‘xshash savollarga ajratadi.
+    Fayl ichidagi takrorlar ham ushlanadi (yangi savollar indeksga darhol qo‘shiladi).
+
+    Return:
+      fresh: [(question_dict, sig_blob, exact), ...] — qo‘shiladi
+      duplicates: [(position_in_file, existing_question_id | None), ...] — aynan takror, tashlanadi
+      near: [(position_in_file, existing_question_id | None, similarity), ...] — owner hal qiladi
+        existing_question_id None bo‘lsa — o‘xshashi shu faylning o‘zida.
+    """
+    fresh: List[Tuple[Dict[str, Any], bytes, bytes]] = []
+    duplicates: List[Tuple[int, Optional[int]]] = []
+    near: List[Tuple[int, Optional[int], float]] = []
+
+    for pos, q in enumerate(questions):
+        text = normalize_question(q)
+        exact = exact_key(text)
+        key = index.find_exact(exact)
+        if key is not None:
+            duplicates.append((pos, key if key > 0 else None))
+            continue
+        sig = signature(text)
+        hit = index.find_duplicate(sig, threshold)
+        if hit is not None:
+            key = hit[0]
+            near.append((pos, key if key > 0 else None, hit[1]))
+            continue
+        # hali DB id yo‘q: manfiy vaqtinchalik key
+        index.add(-(pos + 1), sig, exact)
+        fresh.append((q, to_blob(sig), exact))
+
+    return fresh, duplicates, near
@@ -0,0 +1,294 @@
+"""
+Command / callback dispatch index.
+
+aiogram har bir message/callback uchun routerlarni ketma-ket aylanib, har bir handlerning
+filtrlarini chaqiradi (Command parse, F.data.startswith ...). Bu modul startup'da handlerlarni
+ko‘rib chiqadi va indeks quradi:
+
+- message: (prefix, command.casefold()) -> shu buyruqni qabul qilishi mumkin bo‘lgan handlerlar;
+- callback_query: F.data == "x" / F.data.startswith("x") prefikslari -> handlerlar;
+- `CreateQuiz.x` kabi state filtri bo‘lgan handlerlar raw_state mos kelmasa filtrlarsiz o‘tkaziladi.
+
+Indekslab bo‘lmaydigan handlerlar (faqat FSM state, F.document, regexp buyruqlar...) "wildcard"
+sifatida har bir ro‘yxatga asl tartibida qo‘shiladi, shuning uchun natija aiogram bilan bir xil:
+nomzod handlerlarning filtrlari baribir tekshiriladi, faqat aniq mos kelmaydiganlari o‘tkazib
+yuboriladi. Router root filtrlari (masalan admin IsAdmin) va middleware'lar o‘zgarmaydi.
+
+audit() esa bir xil buyruq/prefiksni qayta ro‘yxatdan o‘tkazgan va hech qachon
+chaqirilmaydigan (oldingi shartsiz handler "yopib qo‘ygan") handlerlarni topadi.
+
+install() aiogram ichki qismlariga tayanadi (observer.trigger almashtiriladi, _resolve_middlewares,
+MagicFilter._operations ...): requirements.txt da aiogram minor versiyasi qotirilgan, startup'da
+esa check_internals() tekshiradi — mos kelmasa indeks o‘rnatilmaydi (ogohlantirish bilan),
+bot oddiy aiogram dispatch bilan ishlayveradi.
+"""
+import inspect
+import logging
+import operator
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import aiogram
+from aiogram import Dispatcher, F, Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import Command
+from aiogram.fsm.state import State
+
+
+log = logging.getLogger("quizbot.dispatch")
+
+INDEXED_EVENTS = ("message", "callback_query")
+
+# Wildcard: handler istalgan kalitga mos kelishi mumkin
+_ANY = None
+
+
+def handler_name(handler: HandlerObject) -> str:
+    callback = handler.callback
+    name = getattr(callback, "__qualname__", None) or getattr(callback, "__name__", "unknown")
+    module = getattr(callback, "__module__", "") or ""
+    return f"{module.rsplit('.', 1)[-1]}.{name}" if module else name
+
+
+# -------------------- handler -> kalitlar --------------------
+
+def _command_keys(handler: HandlerObject) -> Optional[FrozenSet[Tuple[str, str]]]:
+    keys = None
+    for f in handler.filters or ():
+        cmd = f.callback
+        if not isinstance(cmd, Command):
+            continue
+        if any(not isinstance(c, str) for c in cmd.commands):
+            return _ANY  # regexp buyruq
+        own = frozenset((p, c.casefold()) for p in cmd.prefix for c in cmd.commands)
+        keys = own if keys is None else keys & own
+    return keys
+
+
+def _data_prefix(handler: HandlerObject) -> Optional[str]:
+    """F.data == "x" va F.data.startswith("x") -> "x" (== ham "x" bilan boshlanadi)."""
+    for f in handler.filters or ():
+        ops = getattr(f.magic, "_operations", None)
+        if not ops or getattr(ops[0], "name", None) != "data":
+            continue
+        if (
+            len(ops) == 3
+            and getattr(ops[1], "name", None) == "startswith"
+            and len(getattr(ops[2], "args", ())) == 1
+            and isinstance(ops[2].args[0], str)
+        ):
+            return ops[2].args[0]
+        if len(ops) == 2 and getattr(ops[1], "comparator", None) is operator.eq and isinstance(ops[1].right, str):
+            return ops[1].right
+    return _ANY
+
+
+def _required_state(handler: HandlerObject) -> Optional[str]:
+    """Handler `SomeStates.x` filtri bilan bo‘lsa — o‘sha state (raw_state bilan arzon solishtiriladi)."""
+    for f in handler.filters or ():
+        if isinstance(f.callback, State) and f.callback.state != "*":
+            return f.callback.state
+    return None
+
+
+# -------------------- indeks --------------------
+
+class _ObserverIndex:
+    """Bitta observer uchun: kalit -> nomzod handlerlar (asl tartibda)."""
+
+    def __init__(self, event: str, observer: TelegramEventObserver) -> None:
+        self.event = event
+        self.observer = observer
+        self.build()
+
+    def build(self) -> None:
+        handlers = list(self.observer.handlers)
+        wild: List[int] = []
+        by_key: Dict[Any, List[int]] = {}
+        for pos, handler in enumerate(handlers):
+            if self.event == "message":
+                keys = _command_keys(handler)
+            else:
+                prefix = _data_prefix(handler)
+                keys = _ANY if prefix is _ANY else (prefix,)
+            if keys is _ANY:
+                wild.append(pos)
+            else:
+                for key in keys:
+                    by_key.setdefault(key, []).append(pos)
+
+        entries = [(h, _required_state(h)) for h in handlers]
+        table: Dict[Any, Tuple[Tuple[HandlerObject, Optional[str]], ...]] = {}
+        for key in by_key:
+            if self.event == "message":
+                positions = set(by_key[key])
+            else:
+                # "set_time" data "set_" prefiksiga ham mos: qisqaroq prefikslarni qo‘shamiz
+                positions = {p for other, ps in by_key.items() if key.startswith(other) for p in ps}
+            table[key] = tuple(entries[p] for p in sorted(positions.union(wild)))
+
+        self._size = len(handlers)
+        self._table = table
+        self._wild = tuple(entries[p] for p in wild)
+        self._lengths = sorted({len(k) for k in table}, reverse=True) if self.event != "message" else []
+
+    def candidates(self, event: Any) -> Sequence[Tuple[HandlerObject, Optional[str]]]:
+        if len(self.observer.handlers) != self._size:
+            self.build()  # startup'dan keyin handler qo‘shilgan
+        if self.event == "message":
+            text = event.text or event.caption
+            if not text:
+                return self._wild
+            parts = text.split(maxsplit=1)
+            if not parts:
+                return self._wild
+            head = parts[0]
+            key = (head[0], head[1:].partition("@")[0].casefold())
+            return self._table.get(key, self._wild)
+
+        data = event.data
+        if data is None:
+            return self._wild
+        for n in self._lengths:
+            found = self._table.get(data[:n])
+            if found is not None:
+                return found
+        return self._wild
+
+    async def trigger(self, event: Any, **kwargs: Any) -> Any:
+        # TelegramEventObserver.trigger bilan bir xil, faqat handlerlar ro‘yxati indeksdan
+        observer = self.observer
+        raw_state = kwargs.get("raw_state")
+        for handler, state in self.candidates(event):
+            if state is not None and state != raw_state:
+                continue
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = observer.outer_middleware.wrap_middlewares(
+                        observer._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+        return UNHANDLED
+
+
+def check_internals() -> List[str]:
+    """aiogram'ning biz tayanadigan ichki qismlari shu versiyada boricha bo‘lsa — bo‘sh ro‘yxat."""
+    problems: List[str] = []
+    try:
+        params = list(inspect.signature(TelegramEventObserver.trigger).parameters)
+        if params != ["self", "event", "kwargs"]:
+            problems.append(f"TelegramEventObserver.trigger{tuple(params)}")
+        if "observer.trigger(" not in inspect.getsource(Router._propagate_event):
+            problems.append("Router._propagate_event no longer calls observer.trigger")
+
+        # filtrlarni o‘qish (Command, MagicFilter._operations, State) — sinov routerida
+        probe = Router()
+        noop = lambda *a, **k: None  # noqa: E731
+        probe.message(Command("probe"), State("s", "G"))(noop)
+        probe.callback_query(F.data.startswith("pre:"))(noop)
+        probe.callback_query(F.data == "exact")(noop)
+        observer = probe.observers["message"]
+        for name in ("_resolve_middlewares", "_handler", "handlers"):
+            if not hasattr(observer, name):
+                problems.append(f"TelegramEventObserver.{name} is missing")
+        if not hasattr(observer.outer_middleware, "wrap_middlewares"):
+            problems.append("MiddlewareManager.wrap_middlewares is missing")
+        message = observer.handlers[0]
+        prefix, exact = probe.observers["callback_query"].handlers
+        if _command_keys(message) != frozenset({("/", "probe")}):
+            problems.append("Command filter layout changed")
+        if _required_state(message) != "G:s":
+            problems.append("State filter layout changed")
+        if (_data_prefix(prefix), _data_prefix(exact)) != ("pre:", "exact"):
+            problems.append("MagicFilter operations layout changed")
+    except Exception as e:  # AttributeError, TypeError, OSError (getsource) ...
+        problems.append(f"{type(e).__name__}: {e}")
+    return problems
+
+
+def install(dp: Dispatcher, events: Iterable[str] = INDEXED_EVENTS) -> int:
+    """
+    setup_routers dan keyin chaqiriladi. Return: indekslangan observerlar soni
+    (aiogram ichki qismlari mos kelmasa 0 — indeks o‘rnatilmaydi).
+    """
+    problems = check_internals()
+    if problems:
+        log.warning(
+            "Dispatch index disabled: aiogram %s internals do not match (%s); using plain aiogram dispatch",
+            aiogram.__version__, "; ".join(problems),
+        )
+        return 0
+
+    count = 0
+    for router in dp.chain_tail:
+        for event in events:
+            observer = router.observers[event]
+            if not observer.handlers or isinstance(getattr(observer, "_index", None), _ObserverIndex):
+                continue
+            index = _ObserverIndex(event, observer)
+            observer._index = index
+            # instance atributi: Router._propagate_event observer.trigger(...) ni chaqiradi
+            observer.trigger = index.trigger
+            count += 1
+    return count
+
+
+# -------------------- audit --------------------
+
+def _unconditional(router: Router, event: str, handler: HandlerObject) -> bool:
+    """Router root filtri yo‘q va handlerda faqat kalit filtri (Command / F.data) bor."""
+    if router.observers[event]._handler.filters:
+        return False
+    filters = handler.filters or []
+    if len(filters) != 1:
+        return False
+    cb = filters[0].callback
+    if isinstance(cb, Command):
+        return cb.magic is None and not getattr(cb, "deep_link", False)
+    return filters[0].magic is not None
+
+
+def audit(dp: Dispatcher, events: Iterable[str] = INDEXED_EVENTS) -> List[str]:
+    """Qayta ro‘yxatdan o‘tgan va yopilib qolgan (shadowed) handlerlar haqida ogohlantirishlar."""
+    problems: List[str] = []
+    for event in events:
+        seen: List[Tuple[Any, HandlerObject, bool, Router]] = []  # (key, handler, unconditional, router)
+        for router in dp.chain_tail:
+            for handler in router.observers[event].handlers:
+                if event == "message":
+                    keys = _command_keys(handler)
+                    keys = sorted(keys) if keys is not _ANY else [_ANY]
+                else:
+                    keys = [_data_prefix(handler)]
+                uncond = _unconditional(router, event, handler)
+                for key in keys:
+                    if key is _ANY:
+                        continue
+                    for prev_key, prev, prev_uncond, prev_router in seen:
+                        if event == "message":
+                            covers = prev_key == key
+                        else:
+                            covers = key.startswith(prev_key)
+                        if not covers or prev is handler:
+                            continue
+                        label = f"/{key[1]}" if event == "message" else f"data {key!r}"
+                        if prev_uncond:
+                            problems.append(
+                                f"shadowed: {handler_name(handler)} ({label}) never runs, "
+                                f"{handler_name(prev)} handles it first"
+                            )
+                            break
+                        # bitta modul ichida turli FSM state'lar uchun bir xil buyruq — odatiy hol
+                        if prev_key == key and prev_router is not router:
+                            problems.append(
+                                f"duplicate: {label} registered by {handler_name(prev)} and {handler_name(handler)}"
+                            )
+                    seen.append((key, handler, uncond, router))
+    return problems
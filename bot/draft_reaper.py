@@ -0,0 +1,74 @@
+"""
+Tashlab ketilgan draft quizlarni tozalash.
+
+/create_quiz title bosqichidan keyin darhol `quizzes` ga draft yozadi. /cancel qilmasdan
+chiqib ketganlar draftlari (va savollari) abadiy qoladi, public_code lar ham band bo‘ladi.
+Reaper har `interval` da max_age dan eski draftlarni kichik batch'larda o‘chiradi
+(write lock qisqa ushlanadi) va shu draftga bog‘langan FSM holatini tozalaydi.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot import db, metrics
+
+log = logging.getLogger("quizbot.drafts")
+
+REAPED = metrics.counter("quizbot_drafts_reaped_total", "Abandoned draft quizzes deleted")
+
+
+async def release_fsm(dp: Dispatcher, bot: Bot, reaped: Iterable[Tuple[int, int]]) -> int:
+    """draft_quiz_id si o‘chirilgan draftga teng bo‘lgan FSM kontekstlarini tozalaydi."""
+    by_id: Dict[int, int] = {quiz_id: owner for quiz_id, owner in reaped}
+    if not by_id:
+        return 0
+
+    storage = dp.storage
+    if isinstance(storage, MemoryStorage):
+        # /create_quiz istalgan chatda boshlanishi mumkin: storage'dan aniq kalitlarni topamiz
+        keys = [key for key, record in list(storage.storage.items())
+                if record.data.get("draft_quiz_id") in by_id]
+    else:
+        # boshqa storage'lar kalitlarni sanab bermaydi: odatiy holat — owner bilan private chat
+        keys = [dp.fsm.get_context(bot, chat_id=owner, user_id=owner).key for owner in set(by_id.values())]
+
+    released = 0
+    for key in keys:
+        data = await storage.get_data(key)
+        if data.get("draft_quiz_id") in by_id:
+            await storage.set_state(key, None)
+            await storage.set_data(key, {})
+            released += 1
+    return released
+
+
+async def reap_once(dp: Dispatcher, bot: Bot, max_age: float, batch: int = 200, pause: float = 0.05) -> int:
+    total = 0
+    while True:
+        reaped: List[Tuple[int, int]] = await db.reap_draft_quizzes(int(max_age), batch)
+        if not reaped:
+            break
+        total += len(reaped)
+        REAPED.inc(amount=len(reaped))
+        await release_fsm(dp, bot, reaped)
+        if len(reaped) < batch:
+            break
+        # batch'lar orasida boshqa yozuvchilarga navbat beramiz
+        await asyncio.sleep(pause)
+    return total
+
+
+async def run_reaper(dp: Dispatcher, bot: Bot, max_age: float, interval: float = 600.0, batch: int = 200) -> None:
+    while True:
+        try:
+            n = await reap_once(dp, bot, max_age, batch)
+            if n:
+                log.info("Reaped %d abandoned drafts (older than %.0f h)", n, max_age / 3600)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Draft reaper failed")
+        await asyncio.sleep(interval)
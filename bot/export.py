@@ -0,0 +1,101 @@
+"""
+Quiz natijalarini eksport qilish (CSV yoki JSONL) — faqat quiz egasi uchun, /export orqali.
+
+Xotira qatorlar soniga bog‘liq emas:
+- qatorlar DB dan `db.iter_export_rows` bilan chunk'lab olinadi (kursor SQLite ichida yuradi,
+  hamma natija Python ro‘yxatiga yig‘ilmaydi);
+- har bir chunk vaqtinchalik faylga alohida thread'da yoziladi (event-loop bloklanmaydi);
+- tayyor fayl Telegram'ga document sifatida yuboriladi va o‘chiriladi.
+
+XLSX yo‘q: u butun kitobni xotirada quradi; CSV ni Excel/Sheets o‘zi ochadi.
+"""
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from bot import db, jsoncodec, metrics
+
+FORMATS = ("csv", "jsonl")
+KINDS = tuple(db.EXPORT_KINDS)
+CHUNK = 2000
+
+EXPORTS = metrics.counter("quizbot_exports_total", "Result exports sent to quiz owners", ("kind", "format"))
+EXPORT_ROWS = metrics.counter("quizbot_export_rows_total", "Rows written by result exports")
+
+# (yozilgan qatorlar) -> None; progress xabarini yangilash uchun
+Progress = Callable[[int], Awaitable[None]]
+
+
+@dataclass
+class ExportFile:
+    path: str
+    filename: str
+    rows: int
+    bytes: int
+
+
+def _encode_csv(columns: Sequence[str], rows: List[tuple], header: bool) -> bytes:
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    if header:
+        w.writerow(columns)
+    w.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _encode_jsonl(columns: Sequence[str], rows: List[tuple], header: bool) -> bytes:
+    return b"".join(jsoncodec.dumps_bytes(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _write_chunk(f, encode, columns: Sequence[str], rows: List[tuple], header: bool) -> None:
+    # kodlash ham thread'da: 100k+ qatorda CPU ishi event-loop'ni to‘xtatmasin
+    f.write(encode(columns, rows, header))
+
+
+async def export_results(
+    quiz_id: int,
+    kind: str = "results",
+    fmt: str = "csv",
+    progress: Optional[Progress] = None,
+    progress_every: float = 3.0,
+    chunk: int = CHUNK,
+) -> ExportFile:
+    """
+    Vaqtinchalik faylga yozadi. Fayl chaqiruvchiniki: yuborgandan keyin os.remove qilinsin.
+    progress har `progress_every` sekundda (ko‘pi bilan) chaqiriladi.
+    """
+    if kind not in db.EXPORT_KINDS or fmt not in FORMATS:
+        raise ValueError(f"unknown export {kind}/{fmt}")
+    columns = db.EXPORT_KINDS[kind][0]
+    encode = _encode_csv if fmt == "csv" else _encode_jsonl
+
+    fd, path = tempfile.mkstemp(prefix=f"quiz{quiz_id}_{kind}_", suffix=f".{fmt}")
+    rows = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if fmt == "csv":
+                f.write(b"\xef\xbb\xbf")  # BOM: Excel UTF-8 (kirill/o‘zbek) matnni to‘g‘ri ochadi
+            last = time.monotonic()
+            header = True
+            async for batch in db.iter_export_rows(quiz_id, kind, chunk):
+                await asyncio.to_thread(_write_chunk, f, encode, columns, batch, header)
+                header = False
+                rows += len(batch)
+                if progress is not None and time.monotonic() - last >= progress_every:
+                    last = time.monotonic()
+                    await progress(rows)
+            if header and fmt == "csv":
+                f.write(_encode_csv(columns, [], True))  # bo‘sh bo‘lsa ham ustunlar bo‘lsin
+        size = os.path.getsize(path)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    EXPORTS.inc(kind, fmt)
+    EXPORT_ROWS.inc(amount=rows)
+    return ExportFile(path=path, filename=f"quiz{quiz_id}_{kind}.{fmt}", rows=rows, bytes=size)
@@ -0,0 +1,25 @@
+"""
+"Fast runtime" profili: uvloop (o‘rnatilgan bo‘lsa) + orjson codec.
+asyncio.run(...) dan OLDIN chaqirilishi kerak — event loop policy shu yerda o‘rnatiladi.
+"""
+import asyncio
+import logging
+
+from bot import jsoncodec
+
+
+def install_uvloop() -> bool:
+    try:
+        import uvloop
+    except ImportError:
+        logging.warning("FAST_RUNTIME: uvloop o‘rnatilmagan, oddiy asyncio loop ishlatiladi.")
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def apply(fast: bool) -> str:
+    """Return: tanlangan profil, masalan "uvloop + orjson" yoki "asyncio + json"."""
+    codec = jsoncodec.configure(fast)
+    loop = "uvloop" if fast and install_uvloop() else "asyncio"
+    return f"{loop} + {codec}"
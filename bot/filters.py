@@ -0,0 +1,15 @@
+from typing import Optional, Union
+
+from aiogram.filters import BaseFilter
+from aiogram.types import CallbackQuery, Message
+
+from bot.config import Config
+
+
+class IsAdmin(BaseFilter):
+    """Faqat ADMIN_IDS dagi userlar. Config Dispatcher(config=cfg) orqali keladi."""
+
+    async def __call__(self, event: Union[Message, CallbackQuery], config: Optional[Config] = None) -> bool:
+        if config is None or not config.admin_ids or event.from_user is None:
+            return False
+        return event.from_user.id in config.admin_ids
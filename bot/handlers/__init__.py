@@ -5,14 +5,26 @@ from .create_quiz import router as create_router
 from .common import router as common_router
 from .time_limit import router as time_router
 from .poll_quiz import router as poll_quiz_router
+from .schedule import router as schedule_router
+from .tournament import router as tournament_router
 from .settings import router as settings_router
 from .inline import router as inline_router
+from .stats import router as stats_router
+from .export import router as export_router
 
-def setup_routers(dp: Dispatcher) -> None:
+def setup_routers(dp: Dispatcher, admin: bool = True) -> None:
     dp.include_router(start_router)
     dp.include_router(create_router)
     dp.include_router(common_router)
     dp.include_router(time_router)
     dp.include_router(poll_quiz_router)
+    dp.include_router(schedule_router)
+    dp.include_router(tournament_router)
     dp.include_router(settings_router)
     dp.include_router(inline_router)
+    dp.include_router(stats_router)
+    dp.include_router(export_router)
+    if admin:
+        # ✅ kam ishlatiladigan admin buyruqlari (cProfile, tracemalloc...) faqat kerak bo‘lsa yuklanadi
+        from .admin import router as admin_router
+        dp.include_router(admin_router)
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Optional
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot.config import Config
+from bot.db import top_quizzes_report
+from bot.filters import IsAdmin
+
+router = Router()
+router.message.filter(IsAdmin())
+
+MAX_TEXT = 4000
+PROFILE_DEFAULT_SECONDS = 10
+PROFILE_MAX_SECONDS = 60
+
+
+# ✅ /profile [sekund] — ishlab turgan botni vaqt bilan cheklangan cProfile
+@router.message(Command("profile"))
+async def cmd_profile(message: Message):
+    parts = (message.text or "").split()
+    seconds = PROFILE_DEFAULT_SECONDS
+    if len(parts) > 1:
+        try:
+            seconds = int(parts[1])
+        except ValueError:
+            await message.answer("Use: /profile [seconds]\nExample: /profile 15")
+            return
+    seconds = max(1, min(PROFILE_MAX_SECONDS, seconds))
+
+    from bot import watchdog  # cProfile/pstats faqat /profile da kerak
+
+    if watchdog.profile_running():
+        await message.answer("⏳ A profile is already running.")
+        return
+
+    await message.answer(f"🔬 Profiling for {seconds}s...")
+    text = await watchdog.profile_loop(seconds)
+    if len(text) > MAX_TEXT:
+        text = text[: MAX_TEXT - 1] + "…"
+    await message.answer(text)
+
+
+# ✅ /runtime [tracemalloc on|off | objects] — engine ichki holatining snapshot'i
+@router.message(Command("runtime"))
+async def cmd_runtime(message: Message):
+    from bot import runtime  # tracemalloc va engine ichki modullari faqat shu yerda kerak
+
+    parts = (message.text or "").lower().split()
+    if len(parts) >= 2 and parts[1] == "objects":
+        # ✅ butun heap aylanadi: bot shu vaqt ichida javob bermasligi mumkin
+        await message.answer("⚠️ Walking the whole heap — the bot may stall for a few seconds...")
+        text = "\n".join(await asyncio.to_thread(runtime.gc_objects))
+        if len(text) > MAX_TEXT:
+            text = text[: MAX_TEXT - 1] + "…"
+        await message.answer(text)
+        return
+    if len(parts) >= 2 and parts[1] == "tracemalloc":
+        if len(parts) < 3 or parts[2] not in ("on", "off"):
+            await message.answer("Use: /runtime tracemalloc on|off")
+            return
+        runtime.set_tracemalloc(parts[2] == "on")
+        await message.answer(f"✅ tracemalloc {parts[2]}")
+        return
+
+    text = runtime.snapshot()
+    if len(text) > MAX_TEXT:
+        text = text[: MAX_TEXT - 1] + "…"
+    await message.answer(text)
+
+
+# ✅ /maintenance — DB maintenance'ni hozir ishga tushiradi (off-peak kutmasdan)
+@router.message(Command("maintenance"))
+async def cmd_maintenance(message: Message):
+    from bot import maintenance
+
+    await message.answer("🧹 Running DB maintenance...")
+    report = await maintenance.run_heavy()
+    await message.answer(maintenance.format_report(report))
+
+
+# ✅ /backup — online backup'ni hozir oladi (analytics yoqilgan bo‘lsa snapshot ham yangilanadi)
+@router.message(Command("backup"))
+async def cmd_backup(message: Message, config: Optional[Config] = None):
+    from bot import backup
+
+    backup_dir = config.backup_dir if config else "backups"
+    await message.answer("💾 Backing up the database...")
+    report = await backup.snapshot(
+        backup_dir,
+        keep=config.backup_keep if config else 7,
+        step_pages=config.backup_step_pages if config else 1024,
+        step_sleep=config.backup_step_sleep if config else 0.01,
+    )
+    if config and config.analytics_snapshot:
+        await backup.use_latest(backup_dir)
+    await message.answer(backup.format_report(report))
+
+
+# ✅ /report — eng faol quizlar (ANALYTICS_SNAPSHOT=1 bo‘lsa oxirgi snapshot'dan)
+@router.message(Command("report"))
+async def cmd_report(message: Message):
+    from bot import db
+
+    rows = await top_quizzes_report(20)
+    if not rows:
+        await message.answer("No published quizzes yet.")
+        return
+
+    source = "snapshot" if db.ANALYTICS_PATH else "live DB"
+    out = [f"📈 Top quizzes ({source})", ""]
+    for idx, (code, title, owner, questions, answers, correct) in enumerate(rows, start=1):
+        rate = f"{round(100 * correct / answers)}%" if answers else "-"
+        out.append(f"{idx}. {title} · {code} · {questions} q · {answers} answers · ✅ {rate} · owner {owner}")
+
+    text = "\n".join(out)
+    if len(text) > MAX_TEXT:
+        text = text[: MAX_TEXT - 1] + "…"
+    await message.answer(text)
@@ -1,23 +1,33 @@
+import asyncio
+import os
+import tempfile
+from typing import Optional
+
 from aiogram import Router, F, Bot
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
+from bot.config import Config
 from bot.states import CreateQuiz
 from bot.keyboards import (
     quiz_build_kb,
     quiz_created_kb,
+    near_duplicates_kb,
     kb_cancel,
     kb_cancel_skip,
     kb_cancel_done,
     kb_remove,
 )
 from bot.utils_parser import parse_quiz_text
+from bot import dedup
 from bot.db import (
     create_quiz_draft,
     update_quiz_description,
     delete_quiz,
     add_question,
+    add_questions_bulk,
+    load_owner_minhashes,
     publish_quiz,
     count_questions,
     get_quiz_brief,
@@ -229,8 +239,33 @@ async def cq_add_one(cb: CallbackQuery, state: FSMContext):
 
 # -------------------- TXT IMPORT --------------------
 
+DEFAULT_MAX_IMPORT_MB = 20.0
+NEAR_SAMPLE = 10  # import xabarida ko‘rsatiladigan o‘xshash savollar
+
+
+def _short(text: str, limit: int = 60) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def _fingerprinted(questions):
+    return [(q, *dedup.fingerprint(q)) for q in questions]
+
+
+def _read_txt(path: str) -> str:
+    with open(path, "rb") as f:
+        content = f.read()
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        try:
+            return content.decode("cp1251")
+        except UnicodeDecodeError:
+            return content.decode("latin-1", errors="replace")
+
+
 @router.message(CreateQuiz.waiting_questions, F.document)
-async def import_txt_file(message: Message, state: FSMContext, bot: Bot):
+async def import_txt_file(message: Message, state: FSMContext, bot: Bot, config: Optional[Config] = None):
     doc = message.document
     if not doc:
         return
@@ -246,17 +281,27 @@ async def import_txt_file(message: Message, state: FSMContext, bot: Bot):
         await message.answer("No draft quiz found. Use /create_quiz first.", reply_markup=kb_remove())
         return
 
-    file = await bot.get_file(doc.file_id)
-    file_bytes = await bot.download_file(file.file_path)
-    content = file_bytes.read()
+    max_mb = config.max_import_mb if config else DEFAULT_MAX_IMPORT_MB
+    max_bytes = int(max_mb * 1024 * 1024)
+    if doc.file_size and doc.file_size > max_bytes:
+        await message.answer(f"❌ File is too large (max {max_mb:g} MB).", reply_markup=kb_cancel_done())
+        return
 
+    # ✅ faylni xotiraga emas, vaqtinchalik faylga chunk'lab yuklaymiz
+    file = await bot.get_file(doc.file_id)
+    fd, tmp_path = tempfile.mkstemp(prefix="quiz_import_", suffix=".txt")
+    os.close(fd)
     try:
-        text = content.decode("utf-8")
-    except UnicodeDecodeError:
+        await bot.download_file(file.file_path, destination=tmp_path)
+        if os.path.getsize(tmp_path) > max_bytes:
+            await message.answer(f"❌ File is too large (max {max_mb:g} MB).", reply_markup=kb_cancel_done())
+            return
+        text = await asyncio.to_thread(_read_txt, tmp_path)
+    finally:
         try:
-            text = content.decode("cp1251")
-        except UnicodeDecodeError:
-            text = content.decode("latin-1", errors="replace")
+            os.unlink(tmp_path)
+        except OSError:
+            pass
 
     questions, errors = parse_quiz_text(text)
     if errors:
@@ -270,21 +315,63 @@ async def import_txt_file(message: Message, state: FSMContext, bot: Bot):
         await message.answer("❌ No questions found in the file.", reply_markup=kb_cancel_done())
         return
 
-    added = 0
-    for q in questions:
-        await add_question(
-            quiz_id=quiz_id,
-            q_text=q["q_text"],
-            opt_a=q["opt_a"],
-            opt_b=q["opt_b"],
-            opt_c=q["opt_c"],
-            opt_d=q["opt_d"],
-            correct=q["correct"],
-            explanation=q["explanation"],
+    # ✅ Dedup: aynan takrorlar (savol, variantlar va to‘g‘ri javob bir xil) tashlanadi,
+    # o‘xshashlari esa qo‘shilmay turadi — owner tugma bilan hal qiladi
+    owner_id = message.from_user.id
+    index = dedup.build_index(await load_owner_minhashes(owner_id))
+    fresh, duplicates, near = await asyncio.to_thread(dedup.split_duplicates, questions, index)
+
+    added = await add_questions_bulk(quiz_id, owner_id, fresh)
+
+    msg = f"✅ Imported {added} questions from .txt"
+    if duplicates:
+        in_file = sum(1 for _, existing in duplicates if existing is None)
+        msg += (
+            f"\n♻️ Skipped {len(duplicates)} exact duplicates "
+            f"({len(duplicates) - in_file} already in your quizzes, {in_file} repeated in this file)."
         )
-        added += 1
+        sample = ", ".join(f"#{pos + 1}" for pos, _ in duplicates[:10])
+        msg += f"\nSkipped: {sample}" + (" …" if len(duplicates) > 10 else "")
+    await message.answer(msg, reply_markup=kb_cancel_done())
+
+    await state.update_data(near_pending=[questions[pos] for pos, _, _ in near] or None)
+    if near:
+        lines = [
+            f"⚠️ {len(near)} questions look similar to ones you already have, but are not identical "
+            f"(e.g. a different number or answer). They were NOT added yet:"
+        ]
+        for pos, existing, sim in near[:NEAR_SAMPLE]:
+            where = "this file" if existing is None else "your quizzes"
+            lines.append(f"#{pos + 1} ({sim:.0%} similar to a question in {where}): {_short(questions[pos]['q_text'])}")
+        if len(near) > NEAR_SAMPLE:
+            lines.append(f"…and {len(near) - NEAR_SAMPLE} more.")
+        await message.answer("\n".join(lines), reply_markup=near_duplicates_kb(len(near)))
+
+
+@router.callback_query(F.data == "cq_near_add")
+async def cq_near_add(cb: CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    quiz_id, pending = data.get("draft_quiz_id"), data.get("near_pending")
+    if not quiz_id or not pending:
+        await cb.answer("Nothing to add.", show_alert=True)
+        return
+
+    items = await asyncio.to_thread(_fingerprinted, pending)
+    added = await add_questions_bulk(quiz_id, cb.from_user.id, items)
+    await state.update_data(near_pending=None)
+    await cb.answer()
+    await cb.message.edit_reply_markup(reply_markup=None)
+    await cb.message.answer(f"✅ Added {added} similar questions.", reply_markup=kb_cancel_done())
+
 
-    await message.answer(f"✅ Imported {added} questions from .txt", reply_markup=kb_cancel_done())
+@router.callback_query(F.data == "cq_near_skip")
+async def cq_near_skip(cb: CallbackQuery, state: FSMContext):
+    pending = (await state.get_data()).get("near_pending")
+    await state.update_data(near_pending=None)
+    await cb.answer()
+    await cb.message.edit_reply_markup(reply_markup=None)
+    if pending:
+        await cb.message.answer(f"🗑 Skipped {len(pending)} similar questions.", reply_markup=kb_cancel_done())
 
 
 # -------------------- 1-BY-1 QUESTION FLOW --------------------
@@ -365,6 +452,7 @@ async def skip_expl(message: Message, state: FSMContext):
         await state.clear()
         return
 
+    sig, exact = dedup.fingerprint(data)
     await add_question(
         quiz_id=quiz_id,
         q_text=data["q_text"],
@@ -374,6 +462,8 @@ async def skip_expl(message: Message, state: FSMContext):
         opt_d=data["opt_d"],
         correct=data["correct"],
         explanation=None,
+        minhash=sig,
+        exact=exact,
     )
 
     await state.set_state(CreateQuiz.waiting_questions)
@@ -391,6 +481,7 @@ async def expl(message: Message, state: FSMContext):
         await state.clear()
         return
 
+    sig, exact = dedup.fingerprint(data)
     await add_question(
         quiz_id=quiz_id,
         q_text=data["q_text"],
@@ -400,6 +491,8 @@ async def expl(message: Message, state: FSMContext):
         opt_d=data["opt_d"],
         correct=data["correct"],
         explanation=explanation,
+        minhash=sig,
+        exact=exact,
     )
 
     await state.set_state(CreateQuiz.waiting_questions)
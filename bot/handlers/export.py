@@ -0,0 +1,79 @@
+import logging
+import os
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import FSInputFile, Message
+
+from bot.db import count_export_rows, get_owned_quiz_by_code
+
+router = Router()
+
+PROGRESS_ROWS = 100_000  # shundan katta eksportlarda progress xabari ko‘rsatiladi
+USAGE = (
+    "Use: /export <code> [results|answers] [csv|jsonl]\n"
+    "results — one row per player per game, answers — every single answer\n"
+    "Example: /export sfPlk answers csv"
+)
+
+
+# ✅ /export <code> [results|answers] [csv|jsonl] — faqat quiz egasi uchun
+@router.message(Command("export"))
+async def cmd_export(message: Message):
+    from bot import export  # csv/jsonl yozuvchi faqat /export da kerak
+
+    parts = (message.text or "").split()[1:]
+    if not parts:
+        await message.answer(USAGE)
+        return
+
+    code = parts[0].strip()
+    if code.startswith("quiz_"):
+        code = code.replace("quiz_", "", 1).strip()
+    kind, fmt = "results", "csv"
+    for p in (x.lower() for x in parts[1:]):
+        if p in export.KINDS:
+            kind = p
+        elif p in export.FORMATS:
+            fmt = p
+        else:
+            await message.answer(USAGE)
+            return
+
+    quiz = await get_owned_quiz_by_code(code, message.from_user.id)
+    if not quiz:
+        await message.answer("❌ Quiz not found (or you are not the owner).")
+        return
+
+    quiz_id, title = quiz
+    total = await count_export_rows(quiz_id, kind)
+    if total == 0:
+        await message.answer("ℹ️ Nothing to export yet: this quiz has no finished games.")
+        return
+
+    progress = status = None
+    if total > PROGRESS_ROWS:
+        status = await message.answer(f"⏳ Exporting {total:,} rows…")
+
+        async def progress(rows: int) -> None:
+            try:
+                await status.edit_text(f"⏳ Exporting… {rows:,} / {total:,} rows ({rows * 100 // total}%)")
+            except Exception:
+                pass  # progress ixtiyoriy: xabar o‘chirilgan/o‘zgarmagan bo‘lsa eksport davom etadi
+
+    result = await export.export_results(quiz_id, kind, fmt, progress)
+    try:
+        await message.answer_document(
+            FSInputFile(result.path, filename=result.filename),
+            caption=f"📤 {title} — {kind}, {result.rows:,} rows",
+        )
+    finally:
+        try:
+            os.remove(result.path)
+        except OSError:
+            logging.warning("Could not remove export file %s", result.path)
+    if status is not None:
+        try:
+            await status.delete()
+        except Exception:
+            pass
@@ -1,3 +1,7 @@
+import time
+from collections import OrderedDict
+from typing import Any, List, Tuple
+
 from aiogram import Router
 from aiogram.types import (
     InlineQuery,
@@ -5,29 +9,101 @@ from aiogram.types import (
     InputTextMessageContent,
 )
 
+from bot.db import search_published_quizzes
+
 router = Router()
 
+PAGE_SIZE = 20
+
+# Telegram tomonidagi kesh: natijalar hamma uchun bir xil (is_personal=False)
+SEARCH_CACHE_TIME = 60
+AUTOSTART_CACHE_TIME = 300
+
+# ✅ Mashhur prefikslar uchun in-memory kesh: (normalized_query, offset) -> (expires_at, rows)
+# LRU: tez-tez yoziladigan prefikslar ("mat", "math", ...) keshda qoladi, qolganlari chiqib ketadi.
+_CACHE_MAX = 512
+_CACHE_TTL = 30.0
+_search_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Any]]]" = OrderedDict()
+CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def _normalize_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+
+async def _cached_search(query: str, offset: int) -> List[Any]:
+    key = (_normalize_query(query), offset)
+    now = time.monotonic()
+
+    item = _search_cache.get(key)
+    if item and item[0] > now:
+        _search_cache.move_to_end(key)
+        CACHE_STATS["hits"] += 1
+        return item[1]
+
+    CACHE_STATS["misses"] += 1
+    # bitta ortiqcha qator: keyingi sahifa bor-yo‘qligini bilish uchun
+    rows = await search_published_quizzes(key[0], limit=PAGE_SIZE + 1, offset=offset)
+
+    _search_cache[key] = (now + _CACHE_TTL, rows)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > _CACHE_MAX:
+        _search_cache.popitem(last=False)
+    return rows
+
+
+def _autostart_result(public_code: str, title: str, description: str) -> InlineQueryResultArticle:
+    # ✅ AUTOSTART: xabar yuborilishi bilan CommandStart(deep_link) ishga tushadi
+    # Biz groupga /start quiz_CODE yuboramiz
+    return InlineQueryResultArticle(
+        id=f"autostart_{public_code}",
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(message_text=f"/start quiz_{public_code}"),
+    )
+
+
 @router.inline_query()
 async def inline_quiz(iq: InlineQuery):
     q = (iq.query or "").strip()
-    if not q.startswith("quiz_"):
-        await iq.answer([], cache_time=1)
+    if not q:
+        await iq.answer([], cache_time=SEARCH_CACHE_TIME, is_personal=False)
         return
 
-    public_code = q.replace("quiz_", "", 1).strip()
-    if not public_code:
-        await iq.answer([], cache_time=1)
+    # ✅ "Start Quiz in Group" tugmasi: quiz_<code>
+    if q.startswith("quiz_"):
+        public_code = q.replace("quiz_", "", 1).strip()
+        if not public_code:
+            await iq.answer([], cache_time=1)
+            return
+
+        result = _autostart_result(
+            public_code,
+            "Start Quiz in this Group",
+            "Send to group and it will start instantly",
+        )
+        await iq.answer([result], cache_time=AUTOSTART_CACHE_TIME, is_personal=False)
         return
 
-    # ✅ AUTOSTART: xabar yuborilishi bilan poll_quiz.py dagi CommandStart(deep_link=True) ishga tushadi
-    # Biz groupga /start quiz_CODE yuboramiz
-    msg_text = f"/start quiz_{public_code}"
+    # ✅ Qidiruv: title / description / savol matni bo‘yicha, offset bilan sahifalash
+    try:
+        offset = max(0, int(iq.offset or 0))
+    except ValueError:
+        offset = 0
 
-    result = InlineQueryResultArticle(
-        id=f"autostart_{public_code}",
-        title=f"Start Quiz in this Group",
-        description="Send to group and it will start instantly",
-        input_message_content=InputTextMessageContent(message_text=msg_text),
-    )
+    rows = await _cached_search(q, offset)
+    has_more = len(rows) > PAGE_SIZE
+
+    results = []
+    for _, title, description, public_code, total in rows[:PAGE_SIZE]:
+        desc = f"{total} questions"
+        if description:
+            desc += f" · {description}"
+        results.append(_autostart_result(public_code, title, desc[:200]))
 
-    await iq.answer([result], cache_time=0)
+    await iq.answer(
+        results,
+        cache_time=SEARCH_CACHE_TIME,
+        is_personal=False,
+        next_offset=str(offset + PAGE_SIZE) if has_more else "",
+    )
@@ -2,20 +2,24 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import time
 from dataclasses import dataclass, field
-from typing import Dict, Tuple, List, Any, Optional, Union
+from typing import Dict, Tuple, List, Any, Optional, Set, Union
 
 from aiogram import Router, Bot, F
 from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, PollAnswer, CallbackQuery
 from aiogram.enums import PollType
+from aiogram.methods import SendPoll
 
 from bot.db import (
     get_published_quiz_by_code,
-    get_questions_for_quiz,
     get_user_settings,
+    save_attempt,
 )
+from bot import metrics, question_stats, tournament
+from bot.clock import get_clock
+from bot.question_source import QuestionSource
+from bot.shuffle import IDENTITY, OptionOrder, new_seed, option_order
 
 router = Router()
 
@@ -32,17 +36,38 @@ POLL_INDEX: Dict[str, Tuple[SessionKey, int, int]] = {}
 class Session:
     quiz_id: int
     title: str
-    questions: List[Tuple[Any, ...]]  # (id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation)
+    # ✅ butun quiz emas — keyset bo‘yicha oldindan o‘qiladigan kichik oyna
+    source: QuestionSource
 
     q_index: int = 0
     seconds: int = 30
     step_id: int = 0  # har savol yuborilganda +1
 
+    # ✅ natijalar bazasi (attempts) uchun: sessiya boshlangan vaqt va chat
+    chat_id: int = 0
+    started_at: float = 0.0
+
+    # ✅ joriy poll yopiladigan vaqt (clock.now() bo‘yicha), keyingi savol shu paytda yuboriladi
+    deadline: float = 0.0
+
+    # ✅ shuffle: savollar/variantlar tartibi shu seed dan hisoblanadi (None — asl tartib)
+    seed: Optional[int] = None
+
+    # ✅ manbadan olingan, lekin hali yuborilmagan savol (tayyorlash yiqilsa qayta shu olinadi)
+    pending: Optional[tuple] = None
+
+    # ✅ o‘yin yozuvi (leaderboard va natijalar bazasi uchun), variantlar asl tartibda (A..D = 0..3):
     # step_id -> {user_id: chosen_idx}
     answers: Dict[int, Dict[int, int]] = field(default_factory=dict)
 
-    # step_id -> correct_idx (0..3)
-    correct_by_step: Dict[int, int] = field(default_factory=dict)
+    # step_id -> (question_id, correct_idx)
+    key_by_step: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    # ✅ faqat joriy va oldingi savol uchun (eskilari _forget_steps bilan o‘chiriladi):
+    # step_id -> poll_id / poll yuborilgan vaqt / variantlar tartibi (shuffle bo‘lsa)
+    poll_by_step: Dict[int, str] = field(default_factory=dict)
+    sent_at_by_step: Dict[int, float] = field(default_factory=dict)
+    order_by_step: Dict[int, OptionOrder] = field(default_factory=dict)
 
     # user timing
     first_seen: Dict[int, float] = field(default_factory=dict)
@@ -51,9 +76,30 @@ class Session:
     # user display name (username/fullname)
     display: Dict[int, str] = field(default_factory=dict)
 
+    # ✅ user_id -> to‘g‘ri javoblar (javob kelganda oshiriladi, turnir top-K shundan)
+    score: Dict[int, int] = field(default_factory=dict)
+    tournament: Optional[tournament.Tournament] = None
+    board: int = -1
+
 
 SESSIONS: Dict[SessionKey, Session] = {}
 
+# ✅ hali ishlamagan "keyingi savol" taymerlari
+PENDING_TIMERS: Set[asyncio.Task] = set()
+
+# ✅ DB dan quiz yuklanayotgan (hali SESSIONS ga tushmagan) sessiyalar
+STARTING: Set[SessionKey] = set()
+
+# ✅ keyingi savol yuborilmasa (tarmoq xatosi) shuncha kutib bir marta qayta uriniladi
+SEND_RETRY_DELAY = 2.0
+
+# path: "prepared" — poll ochiqligida tayyorlangan, "inline" — deadline'da tayyorlangan
+QUESTION_GAP = metrics.histogram(
+    "quizbot_question_gap_seconds",
+    "Time from a poll's close deadline until the next poll is sent",
+    ("path",),
+)
+
 
 # Telegram limitlari:
 # - Poll question: 1..300
@@ -72,6 +118,12 @@ def _session_key(chat_type: str, chat_id: int, user_id: int) -> SessionKey:
     return ("p", chat_id, user_id)
 
 
+def session_busy(chat_type: str, chat_id: int, user_id: int) -> bool:
+    """Shu joyda quiz ishlayaptimi yoki boshlanyaptimi (DB siz tekshiruv)."""
+    s_key = _session_key(chat_type, chat_id, user_id)
+    return s_key in SESSIONS or s_key in STARTING
+
+
 def _clamp_open_period(seconds: int) -> int:
     # Telegram open_period: 5..600
     if seconds < 5:
@@ -88,15 +140,16 @@ def _fmt_duration(sec: float) -> str:
 
 
 def _build_leaderboard_text(session: Session) -> str:
-    total_q = len(session.questions)
+    total_q = session.source.total
 
     # user_id -> correct_count
     score: Dict[int, int] = {}
 
     for step_id, user_map in session.answers.items():
-        correct_idx = session.correct_by_step.get(step_id)
-        if correct_idx is None:
+        key = session.key_by_step.get(step_id)
+        if key is None:
             continue
+        correct_idx = key[1]
 
         for uid, chosen_idx in user_map.items():
             # init
@@ -136,17 +189,13 @@ def _build_leaderboard_text(session: Session) -> str:
     return "\n".join(out)
 
 
-def _to_options(q_row) -> Tuple[str, List[str], int, Optional[str]]:
+def _to_options(q_row, order: OptionOrder = IDENTITY) -> Tuple[str, List[str], int, Optional[str]]:
     # Question
     q_text = _truncate((q_row[1] or ""), 300)
 
     # Options (prefix A/B/C/D qo‘shamiz, shuning uchun avval 97 gacha kesamiz)
-    raw_opts = [
-        _truncate((q_row[2] or ""), 97),
-        _truncate((q_row[3] or ""), 97),
-        _truncate((q_row[4] or ""), 97),
-        _truncate((q_row[5] or ""), 97),
-    ]
+    # order[j] — j-o‘rinda ko‘rsatiladigan asl variant (q_row ning o‘zi o‘zgarmaydi)
+    raw_opts = [_truncate((q_row[2 + i] or ""), 97) for i in order]
 
     # bo‘sh bo‘lsa "-" bilan to‘ldiramiz
     raw_opts = [o if o else "-" for o in raw_opts]
@@ -154,11 +203,11 @@ def _to_options(q_row) -> Tuple[str, List[str], int, Optional[str]]:
     letters = ["A) ", "B) ", "C) ", "D) "]
     opts = [letters[i] + raw_opts[i] for i in range(4)]
 
-    # Correct (A/B/C/D)
+    # Correct (A/B/C/D) -> ko‘rsatilgan tartibdagi indeks
     correct_letter = (q_row[6] or "A").strip().upper()
     letter_to_idx = {"A": 0, "B": 1, "C": 2, "D": 3}
     correct_idx = letter_to_idx.get(correct_letter, 0)
-    correct_idx = max(0, min(3, correct_idx))
+    correct_idx = order.index(max(0, min(3, correct_idx)))
 
     # Explanation
     explanation = _truncate((q_row[7] or ""), 200).strip()
@@ -171,72 +220,229 @@ def _to_options(q_row) -> Tuple[str, List[str], int, Optional[str]]:
     return q_text, opts, correct_idx, explanation
 
 
-async def _schedule_next(bot: Bot, s_key: SessionKey, step_id: int, seconds: int):
-    """Har savol uchun: seconds tugagandan keyin keyingi savol yuboriladi (javoblar bo‘lsa ham)."""
-    await asyncio.sleep(seconds)
-    try:
-        session = SESSIONS.get(s_key)
-        if not session:
-            return
+@dataclass
+class PreparedPoll:
+    """Keyingi savol: poll ochiq turganda tayyorlanadi, deadline'da faqat yuboriladi."""
+    question_id: int
+    order: OptionOrder
+    correct_idx: int
+    method: SendPoll  # pydantic tekshiruvidan o‘tgan tayyor so‘rov
+
+
+async def _prepare_poll(chat_id: int, session: Session, q_index: int) -> Optional[PreparedPoll]:
+    """Savolni manbadan olib, payload'ni yig‘adi. Return: None — savollar tugagan."""
+    q = session.pending
+    if q is None:
+        q = await session.source.next()
+        if q is None:
+            return None
+        # source allaqachon oldinga surildi: poll yuborilguncha savol shu yerda turadi
+        session.pending = q
+    order = IDENTITY if session.seed is None else option_order(session.seed, int(q[0]))
+    q_text, opts, correct_idx, explanation = _to_options(q, order)
+
+    method = SendPoll(
+        chat_id=chat_id,
+        question=_truncate(f"{q_index + 1}. {q_text}", 300),
+        options=opts,
+        is_anonymous=False,
+        type=PollType.QUIZ,           # ✅ QUIZ MODE
+        correct_option_id=correct_idx,
+        explanation=explanation,      # ✅ None bo‘lsa yubormaydi
+        allows_multiple_answers=False,
+        open_period=_clamp_open_period(int(session.seconds)),  # ✅ tugagach o‘zi yopiladi
+    )
+    return PreparedPoll(int(q[0]), order, correct_idx, method)
 
-        if session.step_id != step_id:
-            return
 
-        await _send_next_or_finish(bot, s_key)
+async def _schedule_next(bot: Bot, s_key: SessionKey, step_id: int, deadline: float):
+    """
+    Poll ochiq turganda keyingi savolni tayyorlab qo‘yadi, deadline'da (poll yopilganda) yuboradi
+    (javoblar bo‘lsa ham). Tayyorlash muvaffaqiyatsiz bo‘lsa deadline'da odatdagidek qayta uriniladi;
+    yuborish muvaffaqiyatsiz bo‘lsa SEND_RETRY_DELAY dan keyin yana bir marta, keyin sessiya to‘xtatiladi.
+    """
+    clock = get_clock()
+    prepared = None
+    session = SESSIONS.get(s_key)
+    if session is not None and session.q_index + 1 < session.source.total:
+        try:
+            prepared = await _prepare_poll(s_key[1], session, session.q_index + 1)
+        except Exception as e:
+            logging.warning("prepare next question failed for %s: %r", s_key, e)
 
+    await clock.sleep(max(0.0, deadline - clock.now()))
+    session = SESSIONS.get(s_key)
+    if not session or session.step_id != step_id:
+        return
+
+    q_index = session.q_index
+    for attempt in (1, 2):
+        try:
+            # qayta urinish: birinchisi oshirib ulgurgan indeksni qaytaramiz (savol session.pending da)
+            session.q_index = q_index
+            await _send_next_or_finish(bot, s_key, prepared)
+            return
+        except Exception as e:
+            if attempt == 1:
+                logging.warning("schedule_next failed for %s, retrying: %r", s_key, e)
+                await clock.sleep(SEND_RETRY_DELAY)
+                if SESSIONS.get(s_key) is not session or session.step_id != step_id:
+                    return  # shu orada /stop_quiz
+            else:
+                logging.exception("schedule_next failed for %s: %s", s_key, e)
+
+    # ✅ savol yuborilmadi — sessiya endi davom etmaydi: "osilib" qolmasin (chat band, turnirda live),
+    # lekin shu paytgacha natijalar chatga ko‘rsatiladi va saqlanadi
+    await _abort_session(bot, s_key, session)
+
+
+async def _abort_session(bot: Bot, s_key: SessionKey, session: Session) -> None:
+    _drop_session(s_key, session)
+    try:
+        await bot.send_message(
+            s_key[1],
+            "⚠️ Quiz stopped because of a Telegram error.\n\n" + _build_leaderboard_text(session),
+        )
     except Exception as e:
-        logging.exception("schedule_next failed: %s", e)
+        logging.warning("Could not notify chat %s about the stopped quiz: %r", s_key[1], e)
+    await _save_attempt(session, stopped=True)
+
+
+def _push_tournament(session: Session, finished: bool = False) -> None:
+    """Savol yopilganda: sessiyaning top-K ro‘yxati turnirdagi o‘z joyini almashtiradi."""
+    if session.tournament is None:
+        return
+    board = tournament.session_top(session.score, session.first_seen, session.last_seen, session.display)
+    session.tournament.push(session.board, board, len(session.score), finished)
+
+
+def _forget_steps(session: Session, before: Optional[int] = None) -> None:
+    """`before` dan oldingi (None — hamma) savollarning poll ma’lumotlari va POLL_INDEX yozuvlari."""
+    for step_id in [k for k in session.poll_by_step if before is None or k < before]:
+        POLL_INDEX.pop(session.poll_by_step.pop(step_id), None)
+        session.sent_at_by_step.pop(step_id, None)
+        session.order_by_step.pop(step_id, None)
+
+
+def _drop_session(s_key: SessionKey, session: Session) -> None:
+    """Sessiya xato bilan to‘xtaganda: SESSIONS dan olinadi, manba va turnir taxtasi yopiladi."""
+    if SESSIONS.get(s_key) is session:
+        del SESSIONS[s_key]
+    session.step_id += 1  # qolgan taymer/javoblar eski step'ga tegishli bo‘lib qoladi
+    session.source.close()
+    _forget_steps(session)
+    _push_tournament(session, finished=True)
+
+
+async def _save_attempt(session: Session, stopped: bool = False) -> None:
+    """Tugagan sessiyani natijalar bazasiga yozadi (/export shu yerdan o‘qiydi)."""
+    if not session.answers:
+        return
+    players = []
+    for uid, correct in session.score.items():
+        t0 = session.first_seen.get(uid, 0.0)
+        t1 = session.last_seen.get(uid, t0)
+        answered = sum(1 for user_map in session.answers.values() if uid in user_map)
+        players.append((uid, session.display.get(uid, str(uid)), correct, answered, t1 - t0))
+
+    answers = []
+    for step_id, user_map in session.answers.items():
+        question_id, correct_idx = session.key_by_step[step_id]
+        for uid, chosen in user_map.items():
+            if 0 <= chosen < 4:
+                answers.append((uid, step_id, question_id, "ABCD"[chosen], int(chosen == correct_idx)))
+
+    try:
+        await save_attempt(
+            {
+                "quiz_id": session.quiz_id,
+                "chat_id": session.chat_id,
+                "tournament": session.tournament.id if session.tournament else None,
+                "started_at": int(session.started_at),
+                "finished_at": int(get_clock().now()),
+                "questions": len(session.key_by_step),  # haqiqatda yuborilgan savollar
+                "stopped": int(stopped),
+            },
+            players,
+            answers,
+        )
+    except Exception:
+        logging.exception("Saving attempt of quiz %s failed", session.quiz_id)
 
 
-async def _send_next_or_finish(bot: Bot, s_key: SessionKey):
+async def _send_next_or_finish(bot: Bot, s_key: SessionKey, prepared: Optional[PreparedPoll] = None):
     session = SESSIONS.get(s_key)
     if not session:
         return
 
-    chat_id = s_key[1]  # ("g", chat_id) yoki ("p", chat_id, user_id)
-    total = len(session.questions)
-
     session.q_index += 1
 
-    if session.q_index >= total:
-        # ✅ Leaderboard yuboramiz (guruhda ham, private’da ham ishlaydi)
-        await bot.send_message(chat_id, _build_leaderboard_text(session))
-        SESSIONS.pop(s_key, None)
+    if session.q_index >= session.source.total:
+        await _finish(bot, s_key, session)
         return
 
-    await send_poll_question(bot, s_key, session)
+    _push_tournament(session)
+    await send_poll_question(bot, s_key, session, prepared)
 
 
-async def send_poll_question(bot: Bot, s_key: SessionKey, session: Session):
-    chat_id = s_key[1]
+async def _finish(bot: Bot, s_key: SessionKey, session: Session):
+    # ✅ Leaderboard yuboramiz (guruhda ham, private’da ham ishlaydi)
+    chat_id = s_key[1]  # ("g", chat_id) yoki ("p", chat_id, user_id)
+    session.source.close()
+    _forget_steps(session)
+    _push_tournament(session, finished=True)
+    await bot.send_message(chat_id, _build_leaderboard_text(session))
+    SESSIONS.pop(s_key, None)
+    await _save_attempt(session)
 
-    q = session.questions[session.q_index]
-    q_text, opts, correct_idx, explanation = _to_options(q)
 
-    seconds = _clamp_open_period(int(session.seconds))
-    question_title = _truncate(f"{session.q_index + 1}. {q_text}", 300)
+async def send_poll_question(
+    bot: Bot,
+    s_key: SessionKey,
+    session: Session,
+    prepared: Optional[PreparedPoll] = None,
+):
+    clock = get_clock()
+    path = "prepared"
+    if prepared is None:
+        # birinchi savol yoki oldindan tayyorlab bo‘lmadi
+        path = "inline"
+        prepared = await _prepare_poll(s_key[1], session, session.q_index)
+        if prepared is None:
+            # quiz davomida savollar o‘chirilgan bo‘lsa — borlari bilan yakunlaymiz
+            await _finish(bot, s_key, session)
+            return
 
-    msg = await bot.send_poll(
-        chat_id=chat_id,
-        question=question_title,
-        options=opts,
-        is_anonymous=False,
-        type=PollType.QUIZ,           # ✅ QUIZ MODE
-        correct_option_id=correct_idx,
-        explanation=explanation,      # ✅ None bo‘lsa yubormaydi
-        allows_multiple_answers=False,
-        open_period=seconds,          # ✅ 30s tugagach o‘zi yopiladi
-    )
+    msg = await bot(prepared.method)
+    session.pending = None
+
+    now = clock.now()
+    if session.deadline:
+        # ✅ oldingi poll yopilgandan shu poll chiqquncha o‘tgan vaqt
+        QUESTION_GAP.observe(max(0.0, now - session.deadline), path)
+    seconds = prepared.method.open_period
+    session.deadline = now + seconds
 
     session.step_id += 1
     step_id = session.step_id
 
-    # ✅ har savolning to'g'ri javobini step_id bo‘yicha saqlaymiz
-    session.correct_by_step[step_id] = correct_idx
+    # ✅ har savolning to'g'ri javobini (asl tartibda) step_id bo‘yicha saqlaymiz
+    session.key_by_step[step_id] = (prepared.question_id, prepared.order[prepared.correct_idx])
+    session.poll_by_step[step_id] = msg.poll.id
+    session.sent_at_by_step[step_id] = now
+    if prepared.order is not IDENTITY:
+        session.order_by_step[step_id] = prepared.order
+    _forget_steps(session, step_id - 1)
 
     POLL_INDEX[msg.poll.id] = (s_key, msg.message_id, step_id)
 
-    asyncio.create_task(_schedule_next(bot, s_key, step_id, seconds))
+    # ✅ taymer taskiga havola saqlaymiz (GC yig‘ib ketmasin, metrikada ham ko‘rinadi)
+    task = asyncio.create_task(_schedule_next(bot, s_key, step_id, session.deadline))
+    PENDING_TIMERS.add(task)
+    task.add_done_callback(PENDING_TIMERS.discard)
+
+    # ✅ poll ochiq turganda keyingi oynani oldindan o‘qib qo‘yamiz
+    session.source.prefetch()
 
 
 async def _start_session(
@@ -246,49 +452,76 @@ async def _start_session(
     user_id: int,
     public_code: str,
     reply_to: Optional[Message] = None,
+    tournament_id: Optional[str] = None,
 ):
-    quiz = await get_published_quiz_by_code(public_code)
-    if not quiz:
-        text = "❌ Quiz not found or not published."
-        if reply_to:
-            await reply_to.answer(text)
-        else:
-            await bot.send_message(chat_id, text)
-        return
-
-    quiz_id, title = quiz
-    questions = await get_questions_for_quiz(quiz_id)
-    if not questions:
-        text = "❌ This quiz has no questions."
-        if reply_to:
-            await reply_to.answer(text)
-        else:
-            await bot.send_message(chat_id, text)
-        return
-
-    s = await get_user_settings(user_id)
-    seconds = int(s.get("time_limit", 30))
-
     s_key = _session_key(chat_type, chat_id, user_id)
 
-    if s_key in SESSIONS:
+    # ✅ DB ga tegishdan oldin: bu yerda quiz allaqachon ishlayotgan (yoki boshlanayotgan) bo‘lsa
+    if s_key in SESSIONS or s_key in STARTING:
         await bot.send_message(chat_id, "⚠️ A quiz is already running here. Please wait for it to finish.")
         return
 
-    SESSIONS[s_key] = Session(quiz_id=quiz_id, title=title, questions=questions, seconds=seconds)
-
-    await bot.send_message(chat_id, f"▶ Starting: {title}\n⏳ Each question: {seconds} sec")
-    await send_poll_question(bot, s_key, SESSIONS[s_key])
+    STARTING.add(s_key)
+    try:
+        quiz = await get_published_quiz_by_code(public_code)
+        if not quiz:
+            text = "❌ Quiz not found or not published."
+            if reply_to:
+                await reply_to.answer(text)
+            else:
+                await bot.send_message(chat_id, text)
+            return
 
+        quiz_id, title = quiz
+        s = await get_user_settings(user_id)
+        seconds = int(s.get("time_limit", 30))
+        seed = new_seed() if s.get("shuffle", True) else None
+
+        source = QuestionSource(quiz_id, seed=seed)
+        if not await source.start():
+            text = "❌ This quiz has no questions."
+            if reply_to:
+                await reply_to.answer(text)
+            else:
+                await bot.send_message(chat_id, text)
+            return
 
-# ✅ Private deep-link: /start quiz_xxxxx
-    parts = (message.text or "").split(maxsplit=1)
-    payload = parts[1].strip() if len(parts) == 2 else ""
-    if not payload.startswith("quiz_"):
-        return
+        # ✅ turnirga quiz tekshiruvlaridan keyin qo‘shilamiz: boshlanmagan o‘yin reytingda qolmasin
+        cup = None
+        if tournament_id:
+            cup = tournament.join(tournament_id, quiz_id, title)
+            if cup is None:
+                source.close()
+                text = f"❌ Tournament «{tournament_id}» is played with another quiz."
+                if reply_to:
+                    await reply_to.answer(text)
+                else:
+                    await bot.send_message(chat_id, text)
+                return
+
+        if seed is not None:
+            # ✅ seed + savollar to‘plami tartibni to‘liq belgilaydi (restartdan keyin ham)
+            logging.info("Quiz %s in %s: shuffle seed %d", quiz_id, s_key, seed)
+        SESSIONS[s_key] = Session(
+            quiz_id=quiz_id, title=title, source=source, seconds=seconds, seed=seed,
+            chat_id=chat_id, started_at=get_clock().now(),
+            tournament=cup, board=cup.add_board(chat_id) if cup else -1,
+        )
+    finally:
+        STARTING.discard(s_key)
 
-    public_code = payload.replace("quiz_", "", 1).strip()
-    await _start_session(bot, message.chat.type, message.chat.id, message.from_user.id, public_code, reply_to=message)
+    text = f"▶ Starting: {title}\n⏳ Each question: {seconds} sec"
+    if cup is not None:
+        text += f"\n🏆 Tournament: {cup.id} — /tournament {cup.id}"
+    session = SESSIONS[s_key]
+    try:
+        await bot.send_message(chat_id, text)
+        await send_poll_question(bot, s_key, session)
+    except Exception:
+        # ✅ bot chatdan chiqarilgan / yozolmaydi: sessiya chatni "band" qilib qolmasin
+        # (chaqiruvchi — /quiz yoki scheduler — xatoni o‘zi ko‘radi)
+        _drop_session(s_key, session)
+        raise
 
 
 # ✅ "Start this Quiz" callback (private chat)
@@ -302,16 +535,22 @@ async def start_poll_from_button(cb: CallbackQuery, bot: Bot):
 # ✅ GROUP START: /quiz <code>
 @router.message(Command("quiz"))
 async def start_quiz_in_group(message: Message, bot: Bot):
-    parts = (message.text or "").split(maxsplit=1)
-    if len(parts) < 2:
-        await message.answer("Use: /quiz <code>\nExample: /quiz sfPlk")
+    parts = (message.text or "").split()
+    if len(parts) not in (2, 3) or (len(parts) == 3 and not tournament.ID_RE.fullmatch(parts[2])):
+        await message.answer(
+            "Use: /quiz <code> [tournament]\nExample: /quiz sfPlk\n"
+            "Tournament (same quiz in many groups): /quiz sfPlk cup1"
+        )
         return
 
     code = parts[1].strip()
     if code.startswith("quiz_"):
         code = code.replace("quiz_", "", 1).strip()
 
-    await _start_session(bot, message.chat.type, message.chat.id, message.from_user.id, code, reply_to=message)
+    await _start_session(
+        bot, message.chat.type, message.chat.id, message.from_user.id, code,
+        reply_to=message, tournament_id=parts[2] if len(parts) == 3 else None,
+    )
 
 
 @router.poll_answer()
@@ -332,11 +571,25 @@ async def on_poll_answer(poll_answer: PollAnswer, bot: Bot):
     user_id = poll_answer.user.id
     chosen = poll_answer.option_ids[0] if poll_answer.option_ids else -1
 
-    session.answers.setdefault(step_id, {})
-    session.answers[step_id][user_id] = chosen
+    now = get_clock().now()
+    # ✅ ko‘rsatilgan variant -> asl variant (A..D): o‘yin yozuvi shuffle'ga bog‘liq bo‘lmasin
+    order = session.order_by_step.get(step_id, IDENTITY)
+    if 0 <= chosen < len(order):
+        chosen = order[chosen]
+    step_answers = session.answers.setdefault(step_id, {})
+    if user_id not in step_answers and chosen >= 0:
+        # ✅ savol statistikasi (xotirada yig‘iladi, DB ga taymer bilan yoziladi)
+        question_id, correct_idx = session.key_by_step[step_id]
+        question_stats.record_answer(
+            question_id=question_id,
+            chosen_idx=chosen,
+            is_correct=chosen == correct_idx,
+            latency=now - session.sent_at_by_step.get(step_id, now),
+        )
+        session.score[user_id] = session.score.get(user_id, 0) + (chosen == correct_idx)
+    step_answers[user_id] = chosen
 
     # ✅ vaqt + display name yig'amiz
-    now = time.time()
     u = poll_answer.user
     name = f"@{u.username}" if getattr(u, "username", None) else (u.full_name or "User")
     session.display[user_id] = name
@@ -378,4 +631,8 @@ async def stop_quiz(message: Message):
         return
 
     session.step_id += 1
+    session.source.close()
+    _forget_steps(session)
+    _push_tournament(session, finished=True)
     await message.answer("🛑 Quiz stopped.")
+    await _save_attempt(session, stopped=True)
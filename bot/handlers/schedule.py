@@ -0,0 +1,111 @@
+import time
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from aiogram import Bot, Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot import quiz_scheduler
+from bot.config import Config
+from bot.db import add_quiz_job, delete_quiz_job, get_published_quiz_by_code, list_quiz_jobs
+
+router = Router()
+
+MAX_JOBS_PER_CHAT = 10
+USAGE = (
+    "Use: /schedule <code> <time> [daily|weekly]\n"
+    "Examples:\n"
+    "/schedule sfPlk 09:00 daily\n"
+    "/schedule sfPlk 2026-03-08 18:30"
+)
+
+
+def _tz(config: Optional[Config]) -> ZoneInfo:
+    return ZoneInfo(config.schedule_tz if config else "UTC")
+
+
+async def _can_manage(message: Message, bot: Bot) -> bool:
+    """Guruhda faqat adminlar rejalashtiradi; private chatda — foydalanuvchining o‘zi."""
+    if message.chat.type not in ("group", "supergroup"):
+        return True
+    member = await bot.get_chat_member(message.chat.id, message.from_user.id)
+    return member.status in ("creator", "administrator")
+
+
+# ✅ /schedule <code> <time> [daily|weekly]
+@router.message(Command("schedule"))
+async def cmd_schedule(message: Message, bot: Bot, config: Optional[Config] = None):
+    parts = (message.text or "").split()[1:]
+    repeat = None
+    if parts and parts[-1].lower() in quiz_scheduler.REPEATS:
+        repeat = parts.pop().lower()
+    if len(parts) < 2:
+        await message.answer(USAGE)
+        return
+
+    code = parts[0].strip()
+    if code.startswith("quiz_"):
+        code = code.replace("quiz_", "", 1).strip()
+
+    tz = _tz(config)
+    try:
+        run_at = quiz_scheduler.parse_when(" ".join(parts[1:]), time.time(), tz)
+    except ValueError:
+        await message.answer("❌ Bad or past time.\n\n" + USAGE)
+        return
+
+    if not await _can_manage(message, bot):
+        await message.answer("⛔ Only group admins can schedule quizzes.")
+        return
+    quiz = await get_published_quiz_by_code(code)
+    if not quiz:
+        await message.answer("❌ Quiz not found or not published.")
+        return
+    if len(await list_quiz_jobs(message.chat.id)) >= MAX_JOBS_PER_CHAT:
+        await message.answer(f"⚠️ This chat already has {MAX_JOBS_PER_CHAT} scheduled quizzes. See /schedules")
+        return
+
+    job_id = await add_quiz_job(message.chat.id, message.chat.type, message.from_user.id, code, run_at, repeat)
+    quiz_scheduler.wake()
+
+    every = f", {repeat}" if repeat else ""
+    await message.answer(
+        f"⏰ Scheduled #{job_id}: {quiz[1]}\n"
+        f"Next run: {quiz_scheduler.format_run(run_at, tz)} ({tz.key}{every})\n"
+        f"Cancel: /unschedule {job_id}"
+    )
+
+
+# ✅ /schedules — shu chatdagi rejalashtirilgan quizlar
+@router.message(Command("schedules"))
+async def cmd_schedules(message: Message, config: Optional[Config] = None):
+    rows = await list_quiz_jobs(message.chat.id)
+    if not rows:
+        await message.answer("ℹ️ No scheduled quizzes here.\n\n" + USAGE)
+        return
+
+    tz = _tz(config)
+    lines = [f"⏰ Scheduled quizzes ({tz.key})", ""]
+    for job_id, code, next_run, repeat, _ in rows:
+        lines.append(f"#{job_id} · {code} · {quiz_scheduler.format_run(next_run, tz)}" + (f" · {repeat}" if repeat else ""))
+    lines.append("")
+    lines.append("Cancel: /unschedule <id>")
+    await message.answer("\n".join(lines))
+
+
+# ✅ /unschedule <id>
+@router.message(Command("unschedule"))
+async def cmd_unschedule(message: Message, bot: Bot):
+    parts = (message.text or "").split()
+    if len(parts) != 2 or not parts[1].lstrip("#").isdigit():
+        await message.answer("Use: /unschedule <id>  (see /schedules)")
+        return
+
+    if not await _can_manage(message, bot):
+        await message.answer("⛔ Only group admins can cancel scheduled quizzes.")
+        return
+    if await delete_quiz_job(int(parts[1].lstrip("#")), message.chat.id):
+        await message.answer("✅ Scheduled quiz cancelled.")
+    else:
+        await message.answer("❌ No such scheduled quiz in this chat.")
@@ -3,28 +3,34 @@ from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from bot.db import get_user_settings, set_user_time_limit
+from bot.db import get_user_settings, set_user_shuffle, set_user_time_limit
 
 router = Router()
 
 
-def settings_kb(time_limit: int):
+def _on_off(value: bool) -> str:
+    return "On" if value else "Off"
+
+
+def settings_kb(time_limit: int, shuffle: bool = True):
     kb = InlineKeyboardBuilder()
     kb.button(text=f"⏰ Time Limit : {time_limit} sec", callback_data="set_time")
+    kb.button(text=f"🔀 Shuffle : {_on_off(shuffle)}", callback_data="set_shuffle")
     kb.button(text="❌ Close Settings", callback_data="set_close_settings")
-    kb.adjust(1, 1)
+    kb.adjust(1, 1, 1)
     return kb.as_markup()
 
 
 async def send_settings(message: Message):
     s = await get_user_settings(message.from_user.id)
     tl = int(s.get("time_limit", 30))
+    shuffle = bool(s.get("shuffle", True))
 
     text = (
         "⚙ Config Bot Settings\n\n"
         f"⏰ Time Limit : {tl} sec"
     )
-    await message.answer(text, reply_markup=settings_kb(tl))
+    await message.answer(text, reply_markup=settings_kb(tl, shuffle))
 
 
 # ✅ /settings komandasi ishlashi uchun
@@ -53,7 +59,18 @@ async def cb_set_time(cb: CallbackQuery):
     await set_user_time_limit(cb.from_user.id, tl)
 
     # faqat knopkalarni yangilaymiz
-    await cb.message.edit_reply_markup(reply_markup=settings_kb(tl))
+    await cb.message.edit_reply_markup(reply_markup=settings_kb(tl, bool(s.get("shuffle", True))))
+
+
+@router.callback_query(F.data == "set_shuffle")
+async def cb_set_shuffle(cb: CallbackQuery):
+    await cb.answer()
+
+    s = await get_user_settings(cb.from_user.id)
+    shuffle = not bool(s.get("shuffle", True))
+    await set_user_shuffle(cb.from_user.id, shuffle)
+
+    await cb.message.edit_reply_markup(reply_markup=settings_kb(int(s.get("time_limit", 30)), shuffle))
 
 
 @router.callback_query(F.data == "set_close_settings")
@@ -1,20 +1,16 @@
-from aiogram import Router
+from aiogram import Bot, Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message
 
 from bot.keyboards import start_kb
 from bot.db import ensure_user
-
-# ✅ poll_quiz ichidagi start funksiyani import qilamiz
-from bot.handlers.poll_quiz import _start_session
+from bot.handlers.poll_quiz import _start_session, session_busy
 
 router = Router()
 
 
 @router.message(CommandStart())
 async def cmd_start(message: Message):
-    await ensure_user(message.from_user.id)
-
     # ✅ 1) payloadni tekshiramiz: /start quiz_xxx
     parts = (message.text or "").split(maxsplit=1)
     payload = parts[1].strip() if len(parts) == 2 else ""
@@ -22,8 +18,10 @@ async def cmd_start(message: Message):
     if payload.startswith("quiz_"):
         public_code = payload.replace("quiz_", "", 1).strip()
         # ✅ Agar guruh bo‘lsa ham, private bo‘lsa ham shu ishlaydi
-        from aiogram import Bot
         bot: Bot = message.bot
+        # quiz allaqachon ishlayotgan bo‘lsa ensure_user ham kerak emas — _start_session DB siz rad etadi
+        if not session_busy(message.chat.type, message.chat.id, message.from_user.id):
+            await ensure_user(message.from_user.id)
         await _start_session(
             bot=bot,
             chat_type=message.chat.type,
@@ -35,6 +33,7 @@ async def cmd_start(message: Message):
         return
 
     # ✅ 2) payload bo'lmasa — oddiy welcome
+    await ensure_user(message.from_user.id)
     text = (
         "Hello! I'm a Quiz Bot.\n\n"
         "I'm here to help you test and expand your knowledge. You can "
@@ -0,0 +1,75 @@
+import logging
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot import jsoncodec, question_stats
+from bot.db import get_owned_quiz_by_code, get_quiz_question_stats
+
+router = Router()
+
+MAX_TEXT = 4000
+
+
+def _short(text: str, max_len: int = 60) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= max_len else text[: max_len - 1] + "…"
+
+
+# ✅ /stats <code> — faqat quiz egasi uchun, tayyor aggregatlardan o‘qiydi
+@router.message(Command("stats"))
+async def cmd_stats(message: Message):
+    parts = (message.text or "").split(maxsplit=1)
+    if len(parts) < 2:
+        await message.answer("Use: /stats <code>\nExample: /stats sfPlk")
+        return
+
+    code = parts[1].strip()
+    if code.startswith("quiz_"):
+        code = code.replace("quiz_", "", 1).strip()
+
+    quiz = await get_owned_quiz_by_code(code, message.from_user.id)
+    if not quiz:
+        await message.answer("❌ Quiz not found (or you are not the owner).")
+        return
+
+    # xotirada turgan oxirgi javoblarni ham hisobga olamiz (xato bo‘lsa — bazadagisi bilan)
+    try:
+        await question_stats.flush()
+    except Exception as e:
+        logging.exception("question stats flush failed: %s", e)
+
+    quiz_id, title = quiz
+    rows = await get_quiz_question_stats(quiz_id)
+    if not rows:
+        await message.answer("❌ This quiz has no questions.")
+        return
+
+    total_attempts = sum(r[3] for r in rows)
+    out = [f"📊 Stats: {title}", f"Questions: {len(rows)} · Answers: {total_attempts}", ""]
+
+    for idx, (_, q_text, correct, attempts, correct_count, a, b, c, d, hist_json) in enumerate(rows, start=1):
+        try:
+            hist = jsoncodec.loads(hist_json or "[]")
+        except Exception:
+            hist = []
+
+        if attempts <= 0:
+            out.append(f"{idx}. {_short(q_text)}\n   — no answers yet")
+            continue
+
+        rate = round(100 * correct_count / attempts)
+        median = question_stats.median_latency(hist)
+        label = question_stats.difficulty_label(attempts, correct_count)
+        line = (
+            f"{idx}. {_short(q_text)} {label}".rstrip() + "\n"
+            f"   ✅ {rate}% of {attempts} (correct: {correct}) · ⏱ ≤{median if median is not None else '-'}s\n"
+            f"   {question_stats.option_shares([a, b, c, d], attempts)}"
+        )
+        out.append(line)
+
+    text = "\n".join(out)
+    if len(text) > MAX_TEXT:
+        text = text[: MAX_TEXT - 1] + "…"
+    await message.answer(text)
@@ -0,0 +1,46 @@
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot import tournament
+from bot.handlers.poll_quiz import _fmt_duration
+
+router = Router()
+
+SHOW = 15
+
+
+def format_standings(t: tournament.Tournament, limit: int = SHOW) -> str:
+    rows = t.standings(limit)
+    out = [
+        f"🏆 Tournament «{t.id}» — {t.title}",
+        f"Groups: {t.groups} ({t.live_groups} live) · Players: {t.participants}",
+        "",
+    ]
+    if not rows:
+        out.append("Пока нет ответов 😅")
+        return "\n".join(out)
+
+    medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+    for idx, (neg_correct, duration, _, name) in enumerate(rows, start=1):
+        prefix = medals.get(idx, f"{idx}.")
+        out.append(f"{prefix} {name} — {-neg_correct} ({_fmt_duration(duration)})")
+    return "\n".join(out)
+
+
+# ✅ /tournament <id> — barcha guruhlar bo‘yicha umumiy reyting
+@router.message(Command("tournament"))
+async def cmd_tournament(message: Message):
+    parts = (message.text or "").split()
+    if len(parts) != 2:
+        await message.answer(
+            "Use: /tournament <id>\n"
+            "Start it in every group with the same quiz: /quiz <code> <id>"
+        )
+        return
+
+    t = tournament.TOURNAMENTS.get(parts[1])
+    if t is None:
+        await message.answer("❌ No such tournament (or it has expired).")
+        return
+    await message.answer(format_standings(t))
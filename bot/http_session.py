@@ -0,0 +1,37 @@
+"""
+Bot API uchun sozlangan aiohttp session: pool hajmi, keep-alive, timeoutlar va
+(ixtiyoriy) self-hosted Bot API server (BOT_API_BASE).
+"""
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+
+from bot import jsoncodec
+from bot.config import Config
+
+
+class TunedAiohttpSession(AiohttpSession):
+    def __init__(self, limit: int = 100, keepalive_timeout: float = 30.0, **kwargs) -> None:
+        super().__init__(limit=limit, **kwargs)
+        # ✅ hamma so‘rovlar bitta hostga ketadi: per-host limit ham umumiy limitga teng
+        self._connector_init.update(
+            limit_per_host=limit,
+            keepalive_timeout=keepalive_timeout,
+        )
+
+
+def build_api_server(cfg: Config) -> TelegramAPIServer:
+    if not cfg.bot_api_base:
+        return PRODUCTION
+    # local mode: server fayllarni diskda saqlaydi, download_file ularni to‘g‘ridan-to‘g‘ri o‘qiydi
+    return TelegramAPIServer.from_base(cfg.bot_api_base, is_local=cfg.bot_api_local)
+
+
+def build_session(cfg: Config) -> AiohttpSession:
+    return TunedAiohttpSession(
+        limit=cfg.http_pool_limit,
+        keepalive_timeout=cfg.http_keepalive,
+        api=build_api_server(cfg),
+        timeout=cfg.http_timeout,
+        json_loads=jsoncodec.loads,
+        json_dumps=jsoncodec.dumps,
+    )
@@ -0,0 +1,55 @@
+"""
+Yagona JSON codec: sozlamalar, statistikalar, eksportlar va aiogram session shu orqali ishlaydi.
+
+Default — stdlib json. Fast runtime (FAST_RUNTIME=1) yoqilganda va orjson o‘rnatilgan bo‘lsa — orjson.
+Ikkala backend ham bir xil ixcham, UTF-8 (ensure_ascii=False) matn chiqaradi,
+shuning uchun DB dagi qiymatlar backend almashganda ham o‘qiladi.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # ixtiyoriy dependency
+    orjson = None
+
+BACKEND = "json"
+
+
+def _std_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _std_dumps_bytes(obj: Any) -> bytes:
+    return _std_dumps(obj).encode("utf-8")
+
+
+_dumps = _std_dumps
+_dumps_bytes = _std_dumps_bytes
+_loads = json.loads
+
+
+def configure(fast: bool) -> str:
+    """fast=True va orjson bor bo‘lsa orjson ga o‘tadi. Return: tanlangan backend nomi."""
+    global BACKEND, _dumps, _dumps_bytes, _loads
+    if fast and orjson is not None:
+        _dumps_bytes = orjson.dumps
+        _dumps = lambda obj: orjson.dumps(obj).decode("utf-8")  # noqa: E731
+        _loads = orjson.loads
+        BACKEND = "orjson"
+    else:
+        _dumps, _dumps_bytes, _loads = _std_dumps, _std_dumps_bytes, json.loads
+        BACKEND = "json"
+    return BACKEND
+
+
+def dumps(obj: Any) -> str:
+    return _dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return _dumps_bytes(obj)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    return _loads(data)
@@ -26,6 +26,15 @@ def quiz_build_kb() -> InlineKeyboardMarkup:
     return kb.as_markup()
 
 
+def near_duplicates_kb(count: int) -> InlineKeyboardMarkup:
+    """Import'da ushlab turilgan o‘xshash savollar: owner qo‘shadimi yoki tashlaydimi."""
+    kb = InlineKeyboardBuilder()
+    kb.button(text=f"➕ Add {count} anyway", callback_data="cq_near_add")
+    kb.button(text="🗑 Skip them", callback_data="cq_near_skip")
+    kb.adjust(2)
+    return kb.as_markup()
+
+
 def quiz_created_kb(bot_username: str, public_code: str) -> InlineKeyboardMarkup:
     """
     ✅ Quiz created successfully! xabaridan keyin chiqadigan 3 ta tugma:
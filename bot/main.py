@@ -3,22 +3,133 @@ import logging
 
 from aiogram import Bot, Dispatcher
 
-from bot.config import load_config
+from bot.config import Config, load_config
 from bot.db import init_db
 from bot.handlers import setup_routers
+from bot import (
+    dbtrace, dispatch_index, draft_reaper, fastruntime, maintenance, metrics, question_stats, quiz_scheduler,
+    throttle,
+)
+from bot.http_session import build_session
+from bot.handlers.poll_quiz import POLL_INDEX, SESSIONS, PENDING_TIMERS
 
-async def main():
-    logging.basicConfig(level=logging.INFO)
-    cfg = load_config()
+async def main(cfg: Config):
+    if cfg.db_trace:
+        dbtrace.enable(cfg.db_trace_file, cfg.db_trace_slow_ms)
     await init_db()
 
-    bot = Bot(token=cfg.bot_token)  # parse_mode hozircha yo‘q
+    # ✅ sozlangan session: pool, keep-alive, timeout, BOT_API_BASE, umumiy JSON codec
+    bot = Bot(token=cfg.bot_token, session=build_session(cfg))  # parse_mode hozircha yo‘q
+    if cfg.bot_api_base:
+        logging.info("Bot API server: %s (local=%s)", cfg.bot_api_base, cfg.bot_api_local)
+
+    dp = Dispatcher(config=cfg)  # handler/filterlarga `config` sifatida keladi
+    setup_routers(dp, admin=bool(cfg.admin_ids))
+
+    # ✅ bir xil buyruq/prefiks ikki marta ro‘yxatdan o‘tgan bo‘lsa startup'da ko‘rinadi
+    for problem in dispatch_index.audit(dp):
+        logging.warning("Routing: %s", problem)
+    if cfg.dispatch_index:
+        dispatch_index.install(dp)
+
+    # ✅ spam /start, /quiz, pq_start: — handler va DB ga yetmasdan tashlanadi
+    if cfg.throttle_rate > 0:
+        throttle.setup_throttling(
+            dp,
+            user_rate=cfg.throttle_rate,
+            user_burst=cfg.throttle_burst,
+            chat_rate=cfg.throttle_chat_rate,
+            chat_burst=cfg.throttle_chat_burst,
+        )
+
+    # ✅ metrikalar: handler / DB / Bot API latency + engine gauge'lari
+    metrics.setup_metrics(dp, bot)
+    metrics.gauge("quizbot_sessions", "Active quiz sessions", lambda: len(SESSIONS))
+    metrics.gauge("quizbot_poll_index", "Open polls tracked in POLL_INDEX", lambda: len(POLL_INDEX))
+    metrics.gauge("quizbot_pending_timers", "Scheduled next-question timers", lambda: len(PENDING_TIMERS))
+    metrics_runner = await metrics.start_metrics_server(cfg.metrics_host, cfg.metrics_port)
+
+    # ✅ savol statistikasini fon rejimida DB ga yozib turamiz
+    stats_task = asyncio.create_task(question_stats.run_flusher())
 
-    dp = Dispatcher()
-    setup_routers(dp)
+    # ✅ SQLite maintenance: checkpoint har interval, og‘ir ishlar off-peak va sessiyalar yo‘q paytda
+    maintenance_task = None
+    if cfg.maintenance_interval > 0:
+        maintenance_task = asyncio.create_task(maintenance.run_scheduler(
+            interval=cfg.maintenance_interval,
+            off_peak=maintenance.parse_hours(cfg.maintenance_hours),
+            wal_truncate_bytes=int(cfg.wal_truncate_mb * 1024 * 1024),
+            is_idle=lambda: not SESSIONS,
+        ))
+
+    # ✅ tashlab ketilgan draftlarni (va ularning FSM holatini) tozalab turamiz
+    reaper_task = None
+    if cfg.draft_reaper_interval > 0:
+        reaper_task = asyncio.create_task(draft_reaper.run_reaper(
+            dp, bot,
+            max_age=cfg.draft_max_age_hours * 3600,
+            interval=cfg.draft_reaper_interval,
+            batch=cfg.draft_reaper_batch,
+        ))
+
+    # ✅ online backup (gzip snapshot'lar, rotatsiya); hisobotlar kerak bo‘lsa snapshot'dan o‘qiladi
+    backup_task = None
+    if cfg.backup_interval > 0 or cfg.analytics_snapshot:
+        from bot import backup
+        if cfg.analytics_snapshot and await backup.use_latest(cfg.backup_dir) is None:
+            logging.info("No DB snapshot yet in %s: analytics use the live DB", cfg.backup_dir)
+        if cfg.backup_interval > 0:
+            backup_task = asyncio.create_task(backup.run_scheduler(
+                cfg.backup_dir,
+                interval=cfg.backup_interval,
+                keep=cfg.backup_keep,
+                step_pages=cfg.backup_step_pages,
+                step_sleep=cfg.backup_step_sleep,
+                analytics=cfg.analytics_snapshot,
+            ))
+
+    # ✅ /schedule: restartdan keyin ham quiz_jobs jadvalidan davom etadi
+    schedule_task = None
+    if cfg.schedule_concurrency > 0:
+        schedule_task = asyncio.create_task(quiz_scheduler.run_scheduler(
+            bot,
+            tz_name=cfg.schedule_tz,
+            concurrency=cfg.schedule_concurrency,
+            misfire_grace=cfg.schedule_misfire_grace,
+        ))
+
+    # ✅ event-loop bloklanishini kuzatamiz (stack logga yoziladi)
+    watchdog_task = None
+    if cfg.loop_lag_threshold_ms > 0:
+        from bot.watchdog import LoopWatchdog
+        watchdog_task = asyncio.create_task(LoopWatchdog(cfg.loop_lag_threshold_ms / 1000).run())
 
     logging.info("Bot started. Polling...")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        stats_task.cancel()
+        if watchdog_task is not None:
+            watchdog_task.cancel()
+        if maintenance_task is not None:
+            maintenance_task.cancel()
+        if reaper_task is not None:
+            reaper_task.cancel()
+        if backup_task is not None:
+            backup_task.cancel()
+        if schedule_task is not None:
+            schedule_task.cancel()
+        await question_stats.flush()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+
+def run() -> None:
+    logging.basicConfig(level=logging.INFO)
+    cfg = load_config()
+    # ✅ uvloop policy asyncio.run dan oldin o‘rnatilishi kerak
+    profile = fastruntime.apply(cfg.fast_runtime)
+    logging.info("Runtime: %s", profile)
+    asyncio.run(main(cfg))
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
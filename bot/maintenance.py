@@ -0,0 +1,117 @@
+"""
+SQLite fon maintenance'i.
+
+Har `interval` da (yengil):
+- WAL checkpoint: WAL kichik bo‘lsa PASSIVE (hech kimni kutmaydi), katta bo‘lsa TRUNCATE
+  (WAL faylini nolga qisqartiradi).
+
+Off-peak soatlarda kuniga bir marta, faol quiz sessiyalari bo‘lmaganda (og‘ir):
+- o‘chirilgan quizlardan qolgan savollar/statistika/imzolarni tozalash;
+- PRAGMA optimize (statistika hali yo‘q bo‘lsa — to‘liq ANALYZE);
+- incremental_vacuum (auto_vacuum=INCREMENTAL migration 2 da yoqilgan);
+- TRUNCATE checkpoint va qaytarib olingan joy haqida hisobot.
+"""
+import asyncio
+import datetime
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from bot import db, metrics
+
+log = logging.getLogger("quizbot.maintenance")
+
+RECLAIMED_BYTES = metrics.counter("quizbot_db_reclaimed_bytes_total", "Bytes reclaimed by DB maintenance")
+LAST_RUN = {"light": 0.0, "heavy": 0.0}
+metrics.gauge("quizbot_db_maintenance_last_heavy", "Unix time of the last heavy maintenance run",
+              lambda: LAST_RUN["heavy"])
+
+
+def parse_hours(spec: str) -> Tuple[int, int]:
+    """"3-6" -> (3, 6): [3:00, 6:00). "22-4" kabi yarim tundan o‘tuvchi oraliq ham bo‘ladi."""
+    start, _, end = spec.partition("-")
+    return int(start) % 24, int(end or start) % 24
+
+
+def in_window(hour: int, window: Tuple[int, int]) -> bool:
+    start, end = window
+    if start == end:
+        return True
+    if start < end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+async def checkpoint(wal_truncate_bytes: int) -> Dict[str, int]:
+    space = await db.db_space()
+    mode = "TRUNCATE" if space["wal_bytes"] >= wal_truncate_bytes else "PASSIVE"
+    busy, frames, done = await db.wal_checkpoint(mode)
+    LAST_RUN["light"] = time.time()
+    return {"mode": mode, "busy": busy, "wal_frames": frames, "checkpointed": done,
+            "wal_bytes": space["wal_bytes"]}
+
+
+async def run_heavy(vacuum_pages: int = 0) -> Dict[str, object]:
+    before = await db.db_space()
+    orphans = await db.purge_orphans()
+    await db.optimize(full_analyze=not await db.has_analyze_stats())
+    await db.incremental_vacuum(vacuum_pages)
+    busy, _, _ = await db.wal_checkpoint("TRUNCATE")
+    after = await db.db_space()
+
+    reclaimed = max(0, before["db_bytes"] - after["db_bytes"]) + max(0, before["wal_bytes"] - after["wal_bytes"])
+    RECLAIMED_BYTES.inc(amount=reclaimed)
+    LAST_RUN["heavy"] = time.time()
+    return {
+        "orphans": orphans,
+        "db_before": before["db_bytes"],
+        "db_after": after["db_bytes"],
+        "wal_before": before["wal_bytes"],
+        "wal_after": after["wal_bytes"],
+        "free_after": after["free_bytes"],
+        "reclaimed": reclaimed,
+        "checkpoint_busy": busy,
+    }
+
+
+def format_report(report: Dict[str, object]) -> str:
+    mb = lambda n: f"{n / (1024 * 1024):.2f} MB"  # noqa: E731
+    o = report["orphans"]
+    return (
+        f"🧹 DB maintenance\n"
+        f"DB: {mb(report['db_before'])} → {mb(report['db_after'])}\n"
+        f"WAL: {mb(report['wal_before'])} → {mb(report['wal_after'])}"
+        f"{' (checkpoint busy)' if report['checkpoint_busy'] else ''}\n"
+        f"Reclaimed: {mb(report['reclaimed'])} · still free: {mb(report['free_after'])}\n"
+        f"Orphans removed: {o['questions']} questions, {o['question_stats']} stats, "
+        f"{o['question_minhash']} signatures, {o.get('text_blobs', 0)} texts"
+    )
+
+
+async def run_scheduler(
+    interval: float = 900.0,
+    off_peak: Tuple[int, int] = (3, 6),
+    wal_truncate_bytes: int = 64 * 1024 * 1024,
+    is_idle: Optional[Callable[[], bool]] = None,
+) -> None:
+    last_heavy_day = None
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            cp = await checkpoint(wal_truncate_bytes)
+            if cp["mode"] == "TRUNCATE" or cp["busy"]:
+                log.info("WAL checkpoint %s: %s", cp["mode"], cp)
+
+            now = datetime.datetime.now()
+            if (
+                in_window(now.hour, off_peak)
+                and last_heavy_day != now.date()
+                and (is_idle is None or is_idle())
+            ):
+                report = await run_heavy()
+                last_heavy_day = now.date()
+                log.info(format_report(report).replace("\n", " · "))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("DB maintenance failed")
@@ -0,0 +1,277 @@
+"""
+Yengil metrikalar: Counter / Histogram / Gauge va Prometheus text formatida /metrics endpoint.
+
+- handlerlar: update turi bo‘yicha (outer middleware) va har bir handler bo‘yicha (inner middleware)
+- DB: bot/db.py dagi har bir funksiya @timed_query bilan o‘ralgan
+- Bot API: session request middleware (method bo‘yicha latency + xatolar)
+- gauge'lar: SESSIONS, POLL_INDEX, kutayotgan taymerlar (scrape paytida hisoblanadi)
+"""
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_float(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self._values.items()):
+            out.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_float(v)}")
+        return out
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = [0] * (len(self.buckets) + 1)
+            self._counts[labels] = counts
+            self._sums[labels] = 0.0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def total(self, *labels: str) -> float:
+        return self._sums.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels in sorted(self._counts):
+            counts = self._counts[labels]
+            acc = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                acc += n
+                le = f'le="{_fmt_float(bound)}"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {acc}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {self._sums[labels]}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {acc}")
+        return out
+
+
+class Gauge:
+    """Qiymati scrape paytida callback orqali olinadi."""
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float]) -> None:
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            value = float(self.fn())
+        except Exception:
+            logging.exception("gauge %s failed", self.name)
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_fmt_float(value)}"]
+
+
+_REGISTRY: List[Any] = []
+
+
+def _register(metric):
+    _REGISTRY.append(metric)
+    return metric
+
+
+def gauge(name: str, help_text: str, fn: Callable[[], float]) -> Gauge:
+    for m in _REGISTRY:
+        if isinstance(m, Gauge) and m.name == name:
+            m.fn = fn
+            return m
+    return _register(Gauge(name, help_text, fn))
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, help_text, labelnames))
+
+
+def histogram(name: str, help_text: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, labelnames, buckets))
+
+
+def render() -> str:
+    lines: List[str] = []
+    for m in _REGISTRY:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+UPDATE_SECONDS = _register(Histogram(
+    "quizbot_update_seconds", "Time to process one update (filters + handler)", ("event",),
+))
+HANDLER_SECONDS = _register(Histogram(
+    "quizbot_handler_seconds", "Handler latency", ("handler",),
+))
+HANDLER_ERRORS = _register(Counter(
+    "quizbot_handler_errors_total", "Handler exceptions", ("handler",),
+))
+DB_SECONDS = _register(Histogram(
+    "quizbot_db_query_seconds", "bot/db.py function latency", ("query",),
+))
+DB_ERRORS = _register(Counter(
+    "quizbot_db_errors_total", "bot/db.py function exceptions", ("query",),
+))
+API_SECONDS = _register(Histogram(
+    "quizbot_bot_api_seconds", "Bot API call latency", ("method",),
+))
+API_ERRORS = _register(Counter(
+    "quizbot_bot_api_errors_total", "Bot API call errors", ("method", "error"),
+))
+
+
+# -------------------- DB --------------------
+
+def timed_query(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(name)
+            raise
+        finally:
+            DB_SECONDS.observe(time.perf_counter() - t0, name)
+
+    return wrapper
+
+
+# -------------------- aiogram --------------------
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """dp.update.outer_middleware: butun update (filtrlar + handler) vaqti."""
+
+    async def __call__(self, handler, event, data: Dict[str, Any]) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            UPDATE_SECONDS.observe(time.perf_counter() - t0, getattr(event, "event_type", "unknown"))
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: aiogram data["handler"] ni beradi — handler nomi bo‘yicha latency."""
+
+    async def __call__(self, handler, event, data: Dict[str, Any]) -> Any:
+        obj = data.get("handler")
+        callback = getattr(obj, "callback", None)
+        name = getattr(callback, "__qualname__", None) or getattr(callback, "__name__", "unknown")
+        module = getattr(callback, "__module__", "") or ""
+        label = f"{module.rsplit('.', 1)[-1]}.{name}" if module else name
+
+        t0 = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(label)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - t0, label)
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """bot.session.middleware(...): har bir Bot API chaqiruvi."""
+
+    async def __call__(self, make_request, bot, method):
+        name = type(method).__name__
+        t0 = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            API_ERRORS.inc(name, type(e).__name__)
+            raise
+        finally:
+            API_SECONDS.observe(time.perf_counter() - t0, name)
+
+
+HANDLER_EVENTS = ("message", "callback_query", "poll_answer", "inline_query")
+
+
+def setup_metrics(dp, bot) -> None:
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    handler_mw = HandlerMetricsMiddleware()
+    for event in HANDLER_EVENTS:
+        dp.observers[event].middleware(handler_mw)
+    bot.session.middleware(BotApiMetricsMiddleware())
+
+
+# -------------------- HTTP --------------------
+
+async def start_metrics_server(host: str, port: int) -> Optional[Any]:
+    """Kichik aiohttp app: GET /metrics. Return: AppRunner (to‘xtatish uchun) yoki None."""
+    if not port:
+        return None
+
+    from aiohttp import web
+
+    async def handle(_request):
+        return web.Response(text=render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logging.info("Metrics: http://%s:%s/metrics", host, port)
+    return runner
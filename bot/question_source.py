@@ -0,0 +1,139 @@
+"""
+Poll rejimi uchun savollar manbai: butun quiz emas, kichik oyna (window) xotirada turadi.
+
+Savollar (quiz_id, id) keyset bo‘yicha `window` tadan o‘qiladi. Oynada `low_water` tadan kam
+savol qolganda keyingi oyna fon task'ida oldindan o‘qiladi (joriy poll ochiq turgan paytda),
+shuning uchun keyingi savolni yuborish DB ni kutmaydi. Sessiya xotirasi quiz hajmiga bog‘liq emas.
+
+Shuffle (`seed` berilganda): tartib `bot.shuffle.Permutation` dan indeks bo‘yicha olinadi. Buning uchun
+quizning savol id lari ixcham `array('q')` da turadi va bir xil quizdagi barcha sessiyalar uchun
+umumiy (faqat o‘qiladi, aralashtirilmaydi); oxirgi sessiya yopilganda kesh o‘zi bo‘shaydi.
+"""
+import asyncio
+import logging
+import weakref
+from array import array
+from collections import deque
+from typing import Any, Deque, Optional, Tuple
+
+from bot.db import (
+    count_questions,
+    get_question_fingerprint,
+    get_question_ids,
+    get_questions_by_ids,
+    get_questions_window,
+)
+from bot.shuffle import Permutation
+
+# (id, q_text, opt_a, opt_b, opt_c, opt_d, correct, explanation)
+QuestionRow = Tuple[Any, ...]
+
+DEFAULT_WINDOW = 8
+
+# (quiz_id, count, max_id) -> savol id lari; sessiyalar kuchli havola saqlaydi
+_ID_INDEX: "weakref.WeakValueDictionary[Tuple[int, int, int], array]" = weakref.WeakValueDictionary()
+
+
+async def _question_ids(quiz_id: int) -> array:
+    count, max_id = await get_question_fingerprint(quiz_id)
+    key = (quiz_id, count, max_id)
+    ids = _ID_INDEX.get(key)
+    if ids is None:
+        ids = array("q", await get_question_ids(quiz_id))
+        _ID_INDEX[key] = ids
+    return ids
+
+
+class QuestionSource:
+    def __init__(
+        self,
+        quiz_id: int,
+        window: int = DEFAULT_WINDOW,
+        low_water: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.quiz_id = quiz_id
+        self.seed = seed
+        self.window = max(1, window)
+        self.low_water = max(1, self.window // 2) if low_water is None else low_water
+        self.total = 0
+        self._buffer: Deque[QuestionRow] = deque()
+        self._last_id = 0
+        self._exhausted = False
+        self._fetch: Optional[asyncio.Task] = None
+        # shuffle rejimi: umumiy id lar + permutatsiya, _pos — keyingi tartib raqami
+        self._ids: Optional[array] = None
+        self._order: Optional[Permutation] = None
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    async def start(self) -> int:
+        """Savollar sonini va birinchi oynani o‘qiydi. Return: total (0 — savol yo‘q)."""
+        if self.seed is None:
+            self.total = await count_questions(self.quiz_id)
+        else:
+            self._ids = await _question_ids(self.quiz_id)
+            self.total = len(self._ids)
+            self._order = Permutation(self.total, self.seed)
+        if self.total:
+            await self._load()
+        return self.total
+
+    async def _load(self) -> None:
+        if self._order is not None:
+            await self._load_shuffled()
+            return
+        rows = await get_questions_window(self.quiz_id, self._last_id, self.window)
+        if rows:
+            self._last_id = int(rows[-1][0])
+            self._buffer.extend(rows)
+        if len(rows) < self.window:
+            self._exhausted = True
+
+    async def _load_shuffled(self) -> None:
+        end = min(self.total, self._pos + self.window)
+        wanted = [self._ids[self._order[k]] for k in range(self._pos, end)]
+        rows = {row[0]: row for row in await get_questions_by_ids(self.quiz_id, wanted)}
+        # o‘chirilgan savollar tushib qoladi, qolganlari permutatsiya tartibida
+        self._buffer.extend(rows[i] for i in wanted if i in rows)
+        self._pos = end
+        if end >= self.total:
+            self._exhausted = True
+
+    def prefetch(self) -> None:
+        """Oyna tugab borayotgan bo‘lsa keyingisini fonda o‘qiy boshlaydi (kutmaydi)."""
+        if self._exhausted or self._fetch is not None or len(self._buffer) > self.low_water:
+            return
+        self._fetch = asyncio.create_task(self._load())
+        self._fetch.add_done_callback(self._fetch_done)
+
+    def _fetch_done(self, task: asyncio.Task) -> None:
+        self._fetch = None
+        if not task.cancelled() and task.exception() is not None:
+            # keyingi next() qayta urinib ko‘radi
+            logging.warning("Question prefetch failed for quiz %s: %r", self.quiz_id, task.exception())
+
+    async def next(self) -> Optional[QuestionRow]:
+        """Keyingi savol; savollar tugagan (yoki quizdan o‘chirilgan) bo‘lsa None."""
+        if not self._buffer and self._fetch is not None:
+            try:
+                await asyncio.shield(self._fetch)
+            except Exception:
+                pass  # _fetch_done logga yozdi, pastda qayta o‘qiymiz
+        while not self._buffer and not self._exhausted:
+            await self._load()
+        if not self._buffer:
+            return None
+        return self._buffer.popleft()
+
+    def close(self) -> None:
+        if self._fetch is not None:
+            self._fetch.cancel()
+        self._buffer.clear()
+        self._ids = None
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Sequence
+
+from bot.db import flush_question_stats
+
+# Javob berish vaqti (sekund) gistogramma chegaralari.
+# Oxirgi bucket: > 600 sek (Telegram open_period maksimumi).
+LATENCY_BUCKETS = (1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+
+FLUSH_INTERVAL = 10.0
+
+# question_id -> [attempts, correct, [a, b, c, d], [latency buckets...]]
+_PENDING: Dict[int, list] = {}
+
+
+def _bucket(latency: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if latency <= bound:
+            return i
+    return len(LATENCY_BUCKETS)
+
+
+def record_answer(question_id: int, chosen_idx: int, is_correct: bool, latency: float) -> None:
+    """on_poll_answer dan chaqiriladi: faqat xotirada yig‘amiz, DB ga taymer yozadi."""
+    item = _PENDING.get(question_id)
+    if item is None:
+        item = [0, 0, [0, 0, 0, 0], [0] * (len(LATENCY_BUCKETS) + 1)]
+        _PENDING[question_id] = item
+
+    item[0] += 1
+    if is_correct:
+        item[1] += 1
+    if 0 <= chosen_idx <= 3:
+        item[2][chosen_idx] += 1
+    item[3][_bucket(max(0.0, latency))] += 1
+
+
+async def flush() -> int:
+    """Yig‘ilgan deltalarni DB ga yozadi. Return: nechta savol yangilandi."""
+    global _PENDING
+    if not _PENDING:
+        return 0
+
+    batch, _PENDING = _PENDING, {}
+    try:
+        await flush_question_stats(batch)
+    except Exception:
+        # yozilmay qolgan deltalarni qaytarib qo‘yamiz (keyingi flushda yana urinadi)
+        for qid, (attempts, correct, opts, hist) in batch.items():
+            item = _PENDING.setdefault(qid, [0, 0, [0, 0, 0, 0], [0] * len(hist)])
+            item[0] += attempts
+            item[1] += correct
+            item[2] = [x + y for x, y in zip(item[2], opts)]
+            item[3] = [x + y for x, y in zip(item[3], hist)]
+        raise
+    return len(batch)
+
+
+async def run_flusher(interval: float = FLUSH_INTERVAL) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush()
+        except Exception as e:
+            logging.exception("question stats flush failed: %s", e)
+
+
+def median_latency(hist: Sequence[int]) -> Optional[int]:
+    """Gistogrammadan mediana (bucket yuqori chegarasi, sekund). Javob bo‘lmasa None."""
+    total = sum(hist)
+    if total <= 0:
+        return None
+
+    half = (total + 1) // 2
+    acc = 0
+    for i, n in enumerate(hist):
+        acc += n
+        if acc >= half:
+            return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1] + 1
+    return None
+
+
+def difficulty_label(attempts: int, correct: int) -> str:
+    if attempts < 5:
+        return ""
+    rate = correct / attempts
+    if rate >= 0.9:
+        return "🟢 easy"
+    if rate <= 0.3:
+        return "🔴 hard"
+    return ""
+
+
+def option_shares(counts: List[int], attempts: int) -> str:
+    if attempts <= 0:
+        return "A 0% · B 0% · C 0% · D 0%"
+    letters = "ABCD"
+    return " · ".join(f"{letters[i]} {round(100 * counts[i] / attempts)}%" for i in range(4))
@@ -0,0 +1,182 @@
+"""
+Rejalashtirilgan (va takrorlanuvchi) quizlar: "/schedule <code> 09:00 daily".
+
+Vazifalar `quiz_jobs` jadvalida (next_run bo‘yicha indeks), shuning uchun restartdan keyin ham
+saqlanadi. Har bir vazifa uchun alohida uxlab yotgan task yo‘q: bitta loop eng yaqin next_run
+gacha uxlaydi (yangi vazifa undan oldin bo‘lsa `wake()` uni uyg‘otadi), muddati kelganlarni
+batch qilib oladi va `concurrency` ta slotli semafor orqali boshlaydi — 09:00 dagi yuzlab
+guruh Bot API ga bir vaqtda yopirilmaydi.
+
+- vazifa boshlashdan OLDIN qayta rejalashtiriladi / o‘chiriladi (at-most-once: crash bo‘lsa
+  takror yuborilmaydi);
+- bot o‘chiq turgan paytda o‘tib ketgan ishga tushirishlar `misfire_grace` dan kech bo‘lsa
+  o‘tkazib yuboriladi (kechki 15:00 da "kun savoli" kerak emas), takrorlanuvchilari keyingi
+  vaqtga suriladi;
+- daily/weekly mahalliy vaqt (SCHEDULE_TZ) bo‘yicha hisoblanadi: DST bo‘lsa ham 09:00 — 09:00.
+"""
+import asyncio
+import datetime
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+
+from bot import db, metrics
+
+log = logging.getLogger("quizbot.schedule")
+
+REPEATS = {"daily": 1, "weekly": 7}  # kunlarda
+MAX_SLEEP = 300.0  # soat o‘zgarsa ham (NTP, suspend) loop shu vaqtdan ko‘p uxlamaydi
+
+STARTS = metrics.counter(
+    "quizbot_scheduled_starts_total", "Scheduled quiz runs by outcome", ("result",),
+)
+START_LAG = metrics.histogram(
+    "quizbot_scheduled_start_lag_seconds", "Delay between a job's run time and its quiz start",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+_WAKE: Optional[asyncio.Event] = None
+
+
+def wake() -> None:
+    """Yangi vazifa qo‘shilganda: loop hozirgi uyqusidan chiqib next_run ni qayta o‘qiydi."""
+    if _WAKE is not None:
+        _WAKE.set()
+
+
+# -------------------- vaqt --------------------
+
+def parse_when(text: str, now: float, tz: datetime.tzinfo) -> int:
+    """
+    "HH:MM" — bugun (o‘tib ketgan bo‘lsa ertaga) shu vaqt; "YYYY-MM-DD HH:MM" — aniq sana.
+    Return: unix sekund. Xato yoki o‘tib ketgan sana -> ValueError.
+    """
+    text = " ".join(text.replace("T", " ").split())
+    local_now = datetime.datetime.fromtimestamp(now, tz)
+    if " " in text:
+        wall = datetime.datetime.strptime(text, "%Y-%m-%d %H:%M")
+    else:
+        t = datetime.datetime.strptime(text, "%H:%M").time()
+        wall = datetime.datetime.combine(local_now.date(), t)
+        if _timestamp(wall, tz) <= now:
+            wall += datetime.timedelta(days=1)
+    ts = _timestamp(wall, tz)
+    if ts <= now:
+        raise ValueError("time is in the past")
+    return ts
+
+
+def _timestamp(wall: datetime.datetime, tz: datetime.tzinfo) -> int:
+    return int(wall.replace(tzinfo=tz).timestamp())
+
+
+def next_occurrence(run_at: int, repeat: str, now: float, tz: datetime.tzinfo) -> int:
+    """run_at dan keyingi, now dan katta birinchi takror (mahalliy devor soati bo‘yicha)."""
+    step = datetime.timedelta(days=REPEATS[repeat])
+    wall = datetime.datetime.fromtimestamp(run_at, tz).replace(tzinfo=None)
+    # uzoq to‘xtab qolgan bo‘lsa: sikl o‘rniga kerakli qadamlar soniga sakraymiz
+    missed = int(max(0.0, now - run_at) // step.total_seconds())
+    wall += step * missed
+    while True:
+        wall += step
+        ts = _timestamp(wall, tz)
+        if ts > now:
+            return ts
+
+
+def format_run(ts: int, tz: datetime.tzinfo) -> str:
+    return datetime.datetime.fromtimestamp(ts, tz).strftime("%Y-%m-%d %H:%M")
+
+
+# -------------------- loop --------------------
+
+def plan(
+    jobs: Iterable[tuple], now: float, tz: datetime.tzinfo, misfire_grace: float,
+) -> Tuple[List[tuple], List[Tuple[int, int]], List[int]]:
+    """Return: (ishga tushiriladiganlar, [(id, yangi next_run)], [o‘chiriladigan id])."""
+    run: List[tuple] = []
+    rescheduled: List[Tuple[int, int]] = []
+    finished: List[int] = []
+    for job in jobs:
+        job_id, next_run, repeat = job[0], job[5], job[6]
+        if now - next_run <= misfire_grace:
+            run.append(job)
+        else:
+            STARTS.inc("missed")
+        if repeat in REPEATS:
+            rescheduled.append((job_id, next_occurrence(next_run, repeat, now, tz)))
+        else:
+            finished.append(job_id)
+    return run, rescheduled, finished
+
+
+async def _start(bot: Bot, job: tuple, slots: asyncio.Semaphore) -> None:
+    from bot.handlers.poll_quiz import _start_session, session_busy
+
+    job_id, chat_id, chat_type, created_by, code, next_run, _ = job
+    async with slots:
+        try:
+            if session_busy(chat_type, chat_id, created_by):
+                STARTS.inc("busy")
+                return
+            if await db.get_published_quiz_by_code(code) is None:
+                # quiz o‘chirilgan yoki unpublish qilingan — vazifa endi ma’nosiz
+                await db.delete_quiz_job(job_id, chat_id)
+                STARTS.inc("gone")
+                return
+            START_LAG.observe(max(0.0, time.time() - next_run))
+            await _start_session(bot, chat_type, chat_id, created_by, code)
+            STARTS.inc("started")
+        except TelegramForbiddenError:
+            # bot guruhdan chiqarilgan / bloklangan: shu chatning hamma vazifalari o‘chiriladi
+            removed = await db.delete_chat_quiz_jobs(chat_id)
+            log.info("Chat %s is gone: removed %d scheduled quizzes", chat_id, removed)
+            STARTS.inc("forbidden")
+        except Exception:
+            log.exception("Scheduled quiz %s in chat %s failed", job_id, chat_id)
+            STARTS.inc("failed")
+
+
+async def run_due(bot: Bot, tz: datetime.tzinfo, slots: asyncio.Semaphore,
+                  misfire_grace: float = 900.0, batch: int = 500) -> int:
+    """Muddati kelgan hamma vazifalarni (batch'lab) boshlaydi. Return: ko‘rib chiqilganlar soni."""
+    total = 0
+    while True:
+        now = time.time()
+        jobs = await db.get_due_quiz_jobs(int(now), batch)
+        if not jobs:
+            return total
+        total += len(jobs)
+        run, rescheduled, finished = plan(jobs, now, tz, misfire_grace)
+        await db.advance_quiz_jobs(rescheduled, finished)
+        await asyncio.gather(*(_start(bot, job, slots) for job in run))
+        if len(jobs) < batch:
+            return total
+
+
+async def run_scheduler(bot: Bot, tz_name: str = "UTC", concurrency: int = 8,
+                        misfire_grace: float = 900.0, batch: int = 500) -> None:
+    global _WAKE
+    _WAKE = asyncio.Event()
+    tz = ZoneInfo(tz_name)
+    slots = asyncio.Semaphore(max(1, concurrency))
+    while True:
+        _WAKE.clear()
+        timeout = MAX_SLEEP
+        try:
+            await run_due(bot, tz, slots, misfire_grace, batch)
+            next_run = await db.next_quiz_job_run()
+            if next_run is not None:
+                timeout = min(MAX_SLEEP, max(0.0, next_run - time.time()))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Quiz scheduler failed")
+        try:
+            await asyncio.wait_for(_WAKE.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,116 @@
+"""
+Ishlab turgan engine holatining snapshot'i (admin /runtime uchun):
+sessiyalar, ishtirokchilar, POLL_INDEX, taymerlar, cache'lar, DB ulanishlari, xotira.
+
+snapshot() faqat arzon (O(1)) hisoblagichlarni o‘qiydi. Butun heap'ni aylanadigan
+gc.get_objects() alohida — gc_objects(), /runtime objects orqali, ogohlantirish bilan.
+"""
+import collections
+import gc
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from typing import List
+
+from bot import db, question_stats, tournament
+from bot.handlers import inline, poll_quiz
+
+TRACEMALLOC_FRAMES = 5
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    # Linux: ru_maxrss KB da
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _mb(n: float) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def _rate(hits: int, misses: int) -> str:
+    total = hits + misses
+    return f"{hits / total * 100:.1f}% ({hits}/{total})" if total else "—"
+
+
+def set_tracemalloc(enabled: bool) -> None:
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def tracemalloc_top(limit: int = 10) -> List[str]:
+    if not tracemalloc.is_tracing():
+        return ["tracemalloc: off (/runtime tracemalloc on)"]
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    out = [f"tracemalloc: {_mb(current)} traced · peak {_mb(peak)}"]
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        filename = frame.filename.replace("\\", "/").rsplit("/", 2)
+        out.append(f"  {stat.size / 1024:>8.1f} KB {stat.count:>7}x  {'/'.join(filename[-2:])}:{frame.lineno}")
+    return out
+
+
+def snapshot(with_tracemalloc: bool = True) -> str:
+    sessions = poll_quiz.SESSIONS
+    private = sum(1 for k in sessions if k[0] == "p")
+    group = len(sessions) - private
+    participants = sum(len(s.display) for s in sessions.values())
+    stuck = sum(1 for s in sessions.values() if s.q_index >= s.source.total)
+    buffered = sum(s.source.buffered for s in sessions.values())
+
+    lines = [
+        "🩺 Runtime",
+        "",
+        f"Sessions: {len(sessions)} (private {private} · group {group})",
+        f"Participants tracked: {participants}",
+        f"Finished but not cleaned up: {stuck}",
+        f"Buffered questions: {buffered}",
+        f"POLL_INDEX: {len(poll_quiz.POLL_INDEX)}",
+        f"Pending timers: {len(poll_quiz.PENDING_TIMERS)}",
+        f"Tournaments: {len(tournament.TOURNAMENTS)}",
+        "",
+        f"Inline search cache: {_rate(inline.CACHE_STATS['hits'], inline.CACHE_STATS['misses'])}"
+        f" · entries {len(inline._search_cache)}",
+        f"Question stats buffer: {len(question_stats._PENDING)} questions",
+        "",
+        f"DB connections: in-flight {db.CONN_STATS['in_flight']} · peak {db.CONN_STATS['peak']}"
+        f" · opened {db.CONN_STATS['opened']}",
+        f"Threads: {threading.active_count()}",
+        "",
+        f"RSS: {_mb(rss_bytes())} · peak {_mb(peak_rss_bytes())}",
+        f"Allocated blocks: {sys.getallocatedblocks():,} · GC gen counts {gc.get_count()}",
+    ]
+    if with_tracemalloc:
+        lines.append("")
+        lines.extend(tracemalloc_top())
+    return "\n".join(lines)
+
+
+def gc_objects(limit: int = 15) -> List[str]:
+    """
+    GC kuzatadigan obyektlar soni turlar bo‘yicha. gc.get_objects() butun heap'ni GIL ostida
+    aylanadi: katta jarayonda bu bir necha sekund event-loop'ni (polling'ni) to‘xtatadi.
+    """
+    t0 = time.perf_counter()
+    objects = gc.get_objects()
+    by_type = collections.Counter(type(o).__name__ for o in objects)
+    total = len(objects)
+    del objects
+    out = [f"GC objects: {total:,} ({(time.perf_counter() - t0) * 1000:.0f} ms)"]
+    out.extend(f"  {n:>10,}  {name}" for name, n in by_type.most_common(limit))
+    return out
@@ -0,0 +1,73 @@
+"""
+Seed asosidagi aralashtirish (shuffle): sessiyada faqat bitta son — seed — saqlanadi.
+
+- savollar tartibi: `Permutation(n, seed)[k]` — k-chi yuboriladigan savolning asl o‘rni.
+  Feistel tarmog‘i + cycle-walking, ro‘yxat yaratilmaydi va hech narsa ko‘chirilmaydi (O(1) xotira);
+- variantlar tartibi: `option_order(seed, question_id)` — 24 ta tayyor permutatsiyadan biri,
+  to‘g‘ri javob indeksi `order.index(correct)` bilan qayta hisoblanadi.
+
+Hammasi blake2b ga tayangan (Python `hash()` yoki `random` holatiga emas), shuning uchun bir xil
+seed va bir xil savollar restartdan keyin ham aynan shu tartibni beradi.
+"""
+import hashlib
+import itertools
+import secrets
+from typing import Tuple
+
+OptionOrder = Tuple[int, int, int, int]
+
+IDENTITY: OptionOrder = (0, 1, 2, 3)
+_OPTION_ORDERS: Tuple[OptionOrder, ...] = tuple(itertools.permutations(range(4)))  # type: ignore[assignment]
+
+ROUNDS = 4
+_OPTIONS_SALT = 255
+
+
+def new_seed() -> int:
+    return secrets.randbits(63)
+
+
+def _key(seed: int) -> bytes:
+    return (seed & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "little")
+
+
+def _prf(key: bytes, salt: int, x: int) -> int:
+    digest = hashlib.blake2b(x.to_bytes(8, "little"), digest_size=8, key=key, salt=bytes((salt,)))
+    return int.from_bytes(digest.digest(), "little")
+
+
+class Permutation:
+    """[0, n) ustidagi bijeksiya. Indeks bo‘yicha hisoblanadi, ichida ro‘yxat yo‘q."""
+
+    __slots__ = ("n", "_key", "_half", "_mask")
+
+    def __init__(self, n: int, seed: int) -> None:
+        self.n = n
+        self._key = _key(seed)
+        bits = max(2, (n - 1).bit_length())
+        bits += bits & 1  # teng ikki yarim
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self._half, x & self._mask
+        for r in range(ROUNDS):
+            left, right = right, left ^ (_prf(self._key, r, right) & self._mask)
+        return (left << self._half) | right
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        # domen 4^h < 4n: [0, n) dan tashqariga chiqsa o‘sha sikl bo‘yicha davom etamiz
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+
+def option_order(seed: int, question_id: int) -> OptionOrder:
+    """Savol uchun variantlar tartibi: ko‘rsatiladigan j-variant = asl `order[j]` variant."""
+    return _OPTION_ORDERS[_prf(_key(seed), _OPTIONS_SALT, question_id) % len(_OPTION_ORDERS)]
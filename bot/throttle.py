@@ -0,0 +1,140 @@
+"""
+Kiruvchi update'lar uchun throttling (token bucket).
+
+Faqat quiz boshlaydigan (DB + Bot API ga qimmat) update'lar sanaladi: /start, /quiz buyruqlari
+va "pq_start:" callback'i. Oddiy xabarlar (masalan, create_quiz da ketma-ket yuboriladigan savol
+va variantlar) limitga tushmaydi — ular yo‘qolib ketmasin.
+
+Har bir user (va guruh chat) uchun bucket: `rate` token/sek to‘ladi, `burst` tagacha yig‘iladi,
+har update bitta token oladi. Token bo‘lmasa update handlerlarga (va DB ga) yetmasdan tashlanadi;
+callback'larga spinner qolmasligi uchun qisqa javob, private chatda xabarga ogohlantirish
+beriladi (guruhda javob yozilmaydi — spamni ko‘paytirmaslik uchun).
+
+Bucket'lar `{id: (tokens, last_ts)}` ko‘rinishida saqlanadi. `burst / rate` sekund tinch turgan
+bucket baribir to‘la — u o‘chiriladi (idle eviction), shuning uchun xotira faqat faol userlarga
+proporsional.
+
+poll_answer throttling qilinmaydi: u arzon (DB siz) va quiz natijasiga ta’sir qiladi.
+inline_query ham: har bir harf alohida query, ularni inline keshi yutadi.
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import CallbackQuery, Message
+
+from bot import metrics
+
+THROTTLED = metrics.counter("quizbot_throttled_total", "Updates dropped by the rate limiter", ("event", "scope"))
+
+THROTTLED_EVENTS = ("message", "callback_query")
+THROTTLED_COMMANDS = frozenset({"start", "quiz"})
+THROTTLED_CALLBACKS = ("pq_start:",)
+REJECTED_TEXT = "⏳ Too many requests, slow down."
+
+
+def is_throttled(event: Any) -> bool:
+    """Limit faqat quiz boshlovchi buyruq/callback'larga qo‘llanadi."""
+    if isinstance(event, Message):
+        text = event.text or ""
+        if not text.startswith("/"):
+            return False
+        command = text.split(maxsplit=1)[0][1:].split("@", 1)[0].lower()
+        return command in THROTTLED_COMMANDS
+    if isinstance(event, CallbackQuery):
+        return (event.data or "").startswith(THROTTLED_CALLBACKS)
+    return False
+
+
+class TokenBuckets:
+    def __init__(self, rate: float, burst: float, sweep_every: float = 60.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        # shuncha vaqt tinch turgan bucket to‘lib bo‘lgan — saqlashga hojat yo‘q
+        self.idle_after = burst / rate
+        self.sweep_every = sweep_every
+        self._buckets: Dict[int, Tuple[float, float]] = {}
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, key: int, now: Optional[float] = None, cost: float = 1.0) -> bool:
+        if now is None:
+            now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        item = self._buckets.get(key)
+        if item is None:
+            tokens = self.burst
+        else:
+            tokens = min(self.burst, item[0] + (now - item[1]) * self.rate)
+
+        if tokens < cost:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - cost, now)
+        return True
+
+    def _sweep(self, now: float) -> None:
+        cutoff = now - self.idle_after
+        stale = [k for k, (_, ts) in self._buckets.items() if ts <= cutoff]
+        for k in stale:
+            del self._buckets[k]
+        self._next_sweep = now + self.sweep_every
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Outer middleware (filtrlar va handlerlardan oldin): avval user, keyin guruh chat bucket'i."""
+
+    def __init__(self, event: str, user: TokenBuckets, chat: Optional[TokenBuckets] = None) -> None:
+        self.event = event
+        self.user = user
+        self.chat = chat
+
+    async def __call__(self, handler, event, data: Dict[str, Any]) -> Any:
+        if not is_throttled(event):
+            return await handler(event, data)
+
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        now = time.monotonic()
+
+        scope = None
+        if user is not None and not self.user.allow(user.id, now):
+            scope = "user"
+        elif (
+            self.chat is not None
+            and chat is not None
+            and chat.type != "private"
+            and not self.chat.allow(chat.id, now)
+        ):
+            scope = "chat"
+
+        if scope is None:
+            return await handler(event, data)
+
+        THROTTLED.inc(self.event, scope)
+        if isinstance(event, CallbackQuery):
+            await event.answer(REJECTED_TEXT)
+        elif isinstance(event, Message) and event.chat.type == "private":
+            await event.answer(REJECTED_TEXT)
+        return None
+
+
+def setup_throttling(
+    dp: Dispatcher,
+    user_rate: float = 1.0,
+    user_burst: float = 5.0,
+    chat_rate: float = 3.0,
+    chat_burst: float = 15.0,
+) -> Optional[Tuple[TokenBuckets, Optional[TokenBuckets]]]:
+    """user_rate <= 0 bo‘lsa throttling o‘chirilgan. Bucket'lar barcha event turlari uchun umumiy."""
+    if user_rate <= 0:
+        return None
+    user = TokenBuckets(user_rate, user_burst)
+    chat = TokenBuckets(chat_rate, chat_burst) if chat_rate > 0 else None
+    for event in THROTTLED_EVENTS:
+        dp.observers[event].outer_middleware(ThrottlingMiddleware(event, user, chat))
+    return user, chat
@@ -0,0 +1,129 @@
+"""
+Guruhlararo turnir: bir xil quiz bir nechta guruhda `/quiz <code> <turnir>` bilan o‘ynaladi,
+`/tournament <turnir>` esa umumiy reytingni ko‘rsatadi.
+
+Umumiy reyting har safar barcha guruhlarning javoblarini qayta sanamaydi:
+- sessiya o‘z ballarini javob kelganda oshirib boradi (poll_quiz.Session.score);
+- har savol yopilganda sessiya o‘zining top-K ro‘yxatini (`session_top`, O(P log K)) turnirga
+  yuboradi — `push` faqat shu sessiyaning kichik ro‘yxatini almashtiradi;
+- `standings` sessiyalarning saralangan top-K ro‘yxatlarini heapq.merge bilan birlashtiradi
+  (O(S·K log S)), natija keyingi push gacha keshlanadi.
+
+User bir nechta guruhda o‘ynasa eng yaxshi natijasi olinadi. Shu sababli top-K lar birlashmasi
+aniq: global top-K dagi har bir user o‘z sessiyasining top-K ida albatta bor.
+Turnirlar, sessiyalar kabi, faqat xotirada yashaydi.
+"""
+import heapq
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+TOP_K = 50
+TTL = 6 * 3600  # oxirgi yangilanishdan keyin shuncha vaqt o‘tsa turnir unutiladi
+
+ID_RE = re.compile(r"[A-Za-z0-9_-]{1,32}")
+
+# (-correct, duration, user_id, name): oddiy tuple taqqoslash = reyting tartibi
+Entry = Tuple[int, float, int, str]
+
+
+@dataclass
+class Tournament:
+    id: str
+    quiz_id: int
+    title: str
+    updated: float = field(default_factory=time.time)
+    # board (har bir o‘yin: guruh + start) -> saralangan top-K / ishtirokchilar soni / chat
+    boards: Dict[int, List[Entry]] = field(default_factory=dict)
+    players: Dict[int, int] = field(default_factory=dict)
+    chats: Dict[int, int] = field(default_factory=dict)
+    live: Set[int] = field(default_factory=set)
+    _version: int = 0
+    _cached: Tuple[int, List[Entry]] = (-1, [])
+
+    @property
+    def participants(self) -> int:
+        """Guruhlar bo‘yicha yig‘indi (bir user ikki guruhda bo‘lsa ikki marta sanaladi)."""
+        return sum(self.players.values())
+
+    @property
+    def groups(self) -> int:
+        """Turnirda o‘ynagan chatlar (bir guruh qayta o‘ynasa ham bitta)."""
+        return len(set(self.chats.values()))
+
+    @property
+    def live_groups(self) -> int:
+        return len({self.chats[key] for key in self.live})
+
+    def add_board(self, chat_id: int) -> int:
+        """Yangi o‘yin uchun joy (shu guruh turnirni qayta o‘ynasa ham avvalgi natija qoladi)."""
+        key = len(self.boards)
+        self.chats[key] = chat_id
+        self.push(key, [], 0)
+        return key
+
+    def push(self, key: int, board: List[Entry], players: int, finished: bool = False) -> None:
+        self.boards[key] = board
+        self.players[key] = players
+        if finished:
+            self.live.discard(key)
+        else:
+            self.live.add(key)
+        self.updated = time.time()
+        self._version += 1
+
+    def standings(self, k: int = TOP_K) -> List[Entry]:
+        version, cached = self._cached
+        if version != self._version:
+            cached = list(_unique(heapq.merge(*self.boards.values()), TOP_K))
+            self._cached = (self._version, cached)
+        return cached[:k]
+
+
+def _unique(entries: Iterator[Entry], k: int) -> Iterator[Entry]:
+    seen: Set[int] = set()
+    for entry in entries:
+        if entry[2] in seen:
+            continue  # shu userning yaxshiroq natijasi allaqachon chiqdi
+        seen.add(entry[2])
+        yield entry
+        if len(seen) >= k:
+            return
+
+
+TOURNAMENTS: Dict[str, Tournament] = {}
+
+
+def _expire(now: float) -> None:
+    for tid in [tid for tid, t in TOURNAMENTS.items() if not t.live and now - t.updated > TTL]:
+        del TOURNAMENTS[tid]
+
+
+def join(tid: str, quiz_id: int, title: str) -> Optional[Tournament]:
+    """Turnirni topadi (yo‘q bo‘lsa yaratadi). Return: None — turnir boshqa quiz uchun."""
+    _expire(time.time())
+    t = TOURNAMENTS.get(tid)
+    if t is None:
+        t = TOURNAMENTS[tid] = Tournament(id=tid, quiz_id=quiz_id, title=title)
+    elif t.quiz_id != quiz_id:
+        return None
+    return t
+
+
+def session_top(
+    score: Mapping[int, int],
+    first_seen: Mapping[int, float],
+    last_seen: Mapping[int, float],
+    display: Mapping[int, str],
+    k: int = TOP_K,
+) -> List[Entry]:
+    """Bitta sessiyaning saralangan top-K (leaderboard bilan bir xil tartib: ko‘p to‘g‘ri, keyin tezroq)."""
+    def entries() -> Iterator[Entry]:
+        for uid, correct in score.items():
+            t0 = first_seen.get(uid)
+            t1 = last_seen.get(uid)
+            duration = (t1 - t0) if (t0 is not None and t1 is not None) else 10**9
+            yield (-correct, duration, uid, display.get(uid, str(uid)))
+
+    return heapq.nsmallest(k, entries())
@@ -0,0 +1,149 @@
+"""
+Event-loop lag watchdog va on-demand sampling profiler.
+
+LoopWatchdog:
+- loop ichidagi heartbeat task har `interval` da uyg‘onadi va kechikishni (lag) o‘lchaydi;
+- alohida daemon thread heartbeat to‘xtab qolganini ko‘rsa (lag > threshold),
+  loop thread'ining joriy stack'ini logga yozadi — ya’ni aynan bloklayotgan kodni.
+  Bo‘sh paytda: bitta sleep + bitta Event.wait, boshqa xarajat yo‘q.
+
+profile_loop:
+- /profile paytida loop thread'ida cProfile vaqt bilan cheklangan holda yoqiladi;
+  qolgan paytda profiler umuman ishlamaydi.
+"""
+import asyncio
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from bot import metrics
+
+log = logging.getLogger("quizbot.watchdog")
+
+LOOP_LAG = metrics.histogram(
+    "quizbot_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS = metrics.counter("quizbot_loop_stalls_total", "Loop stalls over the watchdog threshold")
+
+
+def format_thread_stack(thread_id: int, limit: int = 30) -> str:
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return "<thread not found>"
+    return "".join(traceback.format_stack(frame, limit=limit))
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = 0.25, interval: float = 0.25, dump_cooldown: float = 30.0) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.dump_cooldown = dump_cooldown
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_dump = 0.0
+
+    async def run(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                t0 = time.monotonic()
+                self._beat = t0
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - t0 - self.interval)
+                LOOP_LAG.observe(lag)
+                if lag > self.max_lag:
+                    self.max_lag = lag
+        finally:
+            self._stop.set()
+
+    def _monitor(self) -> None:
+        dumped_for = None
+        # Event.wait: thread deyarli hamma vaqt uxlaydi
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked <= self.threshold or dumped_for == beat:
+                continue
+            dumped_for = beat  # bitta stall uchun bitta yozuv
+            self.stalls += 1
+            LOOP_STALLS.inc()
+            now = time.monotonic()
+            if now - self._last_dump < self.dump_cooldown:
+                continue
+            self._last_dump = now
+            log.warning(
+                "Event loop blocked for %.0f ms (threshold %.0f ms). Loop thread stack:\n%s",
+                blocked * 1000, self.threshold * 1000, format_thread_stack(self._loop_thread),
+            )
+
+
+# -------------------- profiler --------------------
+
+_profile_lock = asyncio.Lock()
+
+
+def profile_running() -> bool:
+    return _profile_lock.locked()
+
+
+async def profile_loop(seconds: float, top: int = 15) -> str:
+    """
+    Loop thread'ida cProfile ni seconds davomida yoqadi va top funksiyalarni qaytaradi.
+    (Boshqa thread'dan stack sampling GIL sababli loop'ni "bo‘sh" deb ko‘rsatib qo‘yadi:
+    sampler GIL ni asosan loop select() da kutganda oladi.)
+    """
+    async with _profile_lock:
+        profiler = cProfile.Profile()
+        started = time.monotonic()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        elapsed = time.monotonic() - started
+
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, name), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append((tt, ct, nc, filename, lineno, name))
+
+    # epoll/select ichida o‘tgan vaqt — loop bo‘sh kutgan vaqt
+    idle = sum(r[0] for r in rows if r[3] == "~" and "'select." in r[5])
+    busy = sum(r[0] for r in rows) - idle
+    lines = [f"🔬 Profile: {elapsed:.1f}s · busy on loop thread: {busy:.2f}s ({busy / elapsed * 100:.1f}%)"]
+    if not rows:
+        lines.append("Nothing ran on the loop thread.")
+        return "\n".join(lines)
+
+    def fmt(r) -> str:
+        tt, ct, nc, filename, lineno, name = r
+        where = f"{_short_path(filename)}:{lineno}" if lineno else filename
+        return f"{tt * 1000:8.1f} {ct * 1000:8.1f} {nc:7d}  {name} ({where})"
+
+    header = f"{'self ms':>8} {'cum ms':>8} {'calls':>7}  function"
+    lines += ["", "Top (self time):", header]
+    lines += [fmt(r) for r in sorted(rows, key=lambda r: r[0], reverse=True)[:top]]
+    lines += ["", "Top (cumulative):", header]
+    lines += [fmt(r) for r in sorted(rows, key=lambda r: r[1], reverse=True)[:top]]
+    return "\n".join(lines)
+
+
+def _short_path(filename: str) -> str:
+    parts = filename.replace("\\", "/").split("/")
+    for marker in ("site-packages", "bot", "bench"):
+        if marker in parts:
+            return "/".join(parts[parts.index(marker) + (marker == "site-packages"):])
+    return "/".join(parts[-2:])